@@ -16,6 +16,9 @@ def main() -> None:
     menu:Menu = Menu(hero)
     menu.init_from_file("menu.yaml")
 
+    # ships put to work keep going while the menu waits on us
+    hero.start_fleet_loop()
+
     try:
         while menu.query_user():
             pass
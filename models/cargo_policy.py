@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from enum import Enum
+from math import dist
+from models.ship import Ship, ShipCargoItem
+from models.market_cache import MarketCache
+from models.universe import Universe
+from models.navigation import fuel_purchase_cost
+from models.jump_graph import system_of
+
+class CargoAction(Enum):
+    KEEP = 1      # needed for a contract
+    HAUL = 2      # worth carrying to a market
+    JETTISON = 3  # not worth the room it takes
+
+@dataclass
+class CargoDecision:
+    """ What to do with one good in the hold """
+    symbol:str
+    units:int
+    action:CargoAction
+    value_per_unit:float
+    market:str|None
+
+class CargoPolicy:
+    """
+    Decides what to keep, haul or jettison when a hold fills up.
+    A good is worth its best sell price minus the fuel of the round trip
+    to that market spread over the hold. Only markets of the system the
+    ship is in or flying to count, x and y mean nothing across systems.
+    Goods worth less than
+    min_value_per_unit, or less than junk_ratio of the most valuable good
+    in the hold, are jettisoned so the room goes to better ore. Goods
+    no known market buys are hauled, junk needs a price to prove it.
+    Everything comes from the caches, no requests are made.
+    """
+    def __init__(self, markets:MarketCache, universe:Universe, min_value_per_unit:float=1.0, junk_ratio:float=0.2, default_fuel_price:int=72) -> None:
+        self.markets:MarketCache = markets
+        self.universe:Universe = universe
+        self.min_value_per_unit:float = min_value_per_unit
+        self.junk_ratio:float = junk_ratio
+        self.default_fuel_price:int = default_fuel_price
+
+    def __str__(self) -> str:
+        return f"CargoPolicy(min_value_per_unit: {self.min_value_per_unit}, junk_ratio: {self.junk_ratio})"
+
+    def decide(self, ship:Ship, contract_needs:dict[str, int]={}) -> list[CargoDecision]:
+        """ One decision per good in the hold, a good can be split between keep and the rest """
+        position:tuple[int, int] = (ship.nav.route.destination.x, ship.nav.route.destination.y)
+        system:str = ship.nav.route.destination.system
+        fuel:tuple[str, int]|None = self.markets.cheapest_purchase("FUEL")
+        fuel_price:int = fuel[1] if fuel is not None else self.default_fuel_price
+
+        decisions:list[CargoDecision] = []
+        item:ShipCargoItem
+        for item in ship.cargo.inventory:
+            units:int = item.units
+            needed:int = min(contract_needs.get(item.symbol, 0), units)
+            if needed > 0:
+                decisions.append(CargoDecision(item.symbol, needed, CargoAction.KEEP, 0.0, None))
+                units -= needed
+            if units > 0:
+                value, market = self._best_value(item.symbol, system, position, ship.cargo.capacity, fuel_price)
+                decisions.append(CargoDecision(item.symbol, units, CargoAction.HAUL, value, market))
+
+        best:float = max((d.value_per_unit for d in decisions if d.action == CargoAction.HAUL and d.market is not None), default=0.0)
+        for decision in decisions:
+            if decision.action == CargoAction.HAUL and decision.market is not None and (decision.value_per_unit < self.min_value_per_unit or decision.value_per_unit < best * self.junk_ratio):
+                decision.action = CargoAction.JETTISON
+        return decisions
+
+    # Helper Methods
+
+    def _best_value(self, good:str, system:str, position:tuple[int, int], capacity:int, fuel_price:int) -> tuple[float, str|None]:
+        """ Best net value per unit of a good and the market of the system paying it, no market when nobody there is known to buy it """
+        best_value:float = float("-inf")
+        best_market:str|None = None
+        for market, price in self.markets.sell_prices_by_good.get(good, {}).items():
+            if system_of(market) != system:
+                continue
+            coordinates:tuple[int, int]|None = self.universe.coordinates(market)
+            # unknown position, assume it is close rather than ignore the price
+            distance:float = dist(position, coordinates) if coordinates is not None else 0.0
+            value:float = price - fuel_purchase_cost(2 * round(distance), fuel_price) / max(capacity, 1)
+            if value > best_value:
+                best_value = value
+                best_market = market
+        if best_market is None:
+            return (0.0, None)
+        return (best_value, best_market)
@@ -0,0 +1,68 @@
+from datetime import datetime as dt, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import time
+
+class ServerClock:
+    """
+    Estimates the offset between the server clock and the local clock.
+    Every response carries a Date header, truncated to the second, that was
+    stamped somewhere between sending the request and receiving the response.
+    That gives an interval the true offset must be in; intersecting those
+    intervals and smoothing toward the midpoint narrows it well below a second.
+    """
+    def __init__(self, smoothing:float=0.2) -> None:
+        self.smoothing:float = smoothing
+        self.offset:float = 0.0         # seconds to add to local time to get server time
+        self.round_trip:float = 0.0     # smoothed round trip in seconds
+        self.samples:int = 0
+        self.lower:float = float("-inf")
+        self.upper:float = float("inf")
+        self._lock:Lock = Lock()
+
+    def __str__(self) -> str:
+        return f"ServerClock(offset: {self.offset:.3f}, round_trip: {self.round_trip:.3f}, samples: {self.samples}, lower: {self.lower:.3f}, upper: {self.upper:.3f})"
+
+    def observe(self, date_header:str|None, sent_at:float, received_at:float) -> None:
+        """ Update the estimate from a response Date header and the local send and receive times """
+        if not date_header:
+            return
+        try:
+            server:float = parsedate_to_datetime(date_header).timestamp()
+        except (TypeError, ValueError):
+            return
+
+        low:float = server - received_at
+        high:float = server + 1.0 - sent_at
+        with self._lock:
+            self.lower = max(self.lower, low)
+            self.upper = min(self.upper, high)
+            if self.lower > self.upper:
+                # local clock jumped or drifted, start over from this sample
+                self.lower = low
+                self.upper = high
+            sample:float = (self.lower + self.upper) / 2
+            if self.samples == 0:
+                self.offset = sample
+                self.round_trip = received_at - sent_at
+            else:
+                self.offset += self.smoothing * (sample - self.offset)
+                self.round_trip += self.smoothing * ((received_at - sent_at) - self.round_trip)
+            self.offset = min(max(self.offset, self.lower), self.upper)
+            self.samples += 1
+
+    def timestamp(self) -> float:
+        """ Current server time as a unix timestamp """
+        return time() + self.offset
+
+    def now(self) -> dt:
+        """ Current server time as a timezone aware datetime """
+        return dt.fromtimestamp(self.timestamp(), timezone.utc)
+
+    def seconds_until(self, when:dt) -> float:
+        """ Seconds from now (server time) until the given server timestamp, negative if passed """
+        return when.timestamp() - self.timestamp()
+
+    def has_passed(self, when:dt) -> bool:
+        """ Whether the given server timestamp is in the past """
+        return self.seconds_until(when) <= 0
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from json import dumps, loads
+from threading import Lock
+import gzip
+import re
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    # optional, install the fast extra for quicker decoding
+    orjson = None
+
+ACCEPT_ENCODING:str = "gzip, deflate"
+
+class JsonCodec:
+    """ Standard library json, always there """
+    name:str = "json"
+
+    def loads(self, raw:bytes) -> object:
+        return loads(raw)
+
+    def dumps(self, obj:object) -> bytes:
+        return dumps(obj).encode("utf8")
+
+class OrjsonCodec(JsonCodec):
+    """ orjson, several times quicker at decoding big pages """
+    name:str = "orjson"
+
+    def loads(self, raw:bytes) -> object:
+        return orjson.loads(raw)
+
+    def dumps(self, obj:object) -> bytes:
+        return orjson.dumps(obj)
+
+def get_codec(name:str="auto") -> JsonCodec:
+    """ Codec by name, auto picks the fastest one installed """
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name == "orjson":
+        if orjson is not None:
+            return OrjsonCodec()
+        print("orjson is not installed, using json")
+    elif name != "json":
+        print(f"Unknown json codec {name}, using json")
+    return JsonCodec()
+
+def decompress(body:bytes, content_encoding:str|None) -> bytes:
+    """ Undo the Content-Encoding of a response """
+    match (content_encoding or "identity").strip().lower():
+        case "gzip":
+            return gzip.decompress(body)
+        case "deflate":
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                # some servers send raw deflate without the zlib header
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+        case _:
+            return body
+
+@dataclass
+class EndpointStats:
+    """ What one endpoint cost on the wire and to decode """
+    requests:int = 0
+    wire_bytes:int = 0
+    decoded_bytes:int = 0
+    decode_seconds:float = 0.0
+
+    def compression_ratio(self) -> float:
+        return self.decoded_bytes / self.wire_bytes if self.wire_bytes > 0 else 1.0
+
+class WireStats:
+    """
+    Bytes received and decode time per endpoint. Endpoints are paths with
+    symbols and ids replaced, so every ship's navigate adds up together.
+    """
+    STATIC_SEGMENT = re.compile(r"[a-z.-]+")
+
+    def __init__(self) -> None:
+        self.by_endpoint:dict[str, EndpointStats] = {}
+        self._lock:Lock = Lock()
+
+    def __str__(self) -> str:
+        total:EndpointStats = self.total()
+        return f"WireStats(endpoints: {len(self.by_endpoint)}, requests: {total.requests}, wire: {total.wire_bytes}, decoded: {total.decoded_bytes})"
+
+    @staticmethod
+    def endpoint(method:str, path:str) -> str:
+        segments:list[str] = path.split("?")[0].strip("/").split("/")
+        return f"{method} " + "/".join(s if WireStats.STATIC_SEGMENT.fullmatch(s) else "{id}" for s in segments)
+
+    def record(self, method:str, path:str, wire_bytes:int, decoded_bytes:int, decode_seconds:float) -> None:
+        key:str = WireStats.endpoint(method, path)
+        with self._lock:
+            stats:EndpointStats = self.by_endpoint.setdefault(key, EndpointStats())
+            stats.requests += 1
+            stats.wire_bytes += wire_bytes
+            stats.decoded_bytes += decoded_bytes
+            stats.decode_seconds += decode_seconds
+
+    def total(self) -> EndpointStats:
+        total:EndpointStats = EndpointStats()
+        with self._lock:
+            for stats in self.by_endpoint.values():
+                total.requests += stats.requests
+                total.wire_bytes += stats.wire_bytes
+                total.decoded_bytes += stats.decoded_bytes
+                total.decode_seconds += stats.decode_seconds
+        return total
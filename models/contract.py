@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime as dt
+from functools import cached_property
 
 @dataclass
 class ContractDelivery:
@@ -18,18 +19,29 @@ class ContractTerm:
     deliveries:list[ContractDelivery]
 
 class Contract:
-    """ Represents a contract """
+    """ Represents a contract, terms and deadlines are parsed on first use """
     def __init__(self, cont:dict) -> None:
+        self.raw:dict = cont
         self.id:str = cont["id"]
         self.faction:str = cont["factionSymbol"]
         self.type:str = cont["type"]
-        self.terms:ContractTerm = ContractTerm(dt.fromisoformat(cont["terms"]["deadline"]),
-                                               cont["terms"]["payment"]["onAccepted"],
-                                               cont["terms"]["payment"]["onFulfilled"],
-                                               list(map(lambda d: ContractDelivery(d["tradeSymbol"], d["destinationSymbol"], d["unitsRequired"], d["unitsFulfilled"]), cont.get("terms", {}).get("deliver", []))))
         self.accepted:bool = cont["accepted"]
         self.fulfilled:bool = cont["fulfilled"]
-        self.deadline_to_accept:dt = dt.fromisoformat(cont["deadlineToAccept"])
+
+    @cached_property
+    def terms(self) -> ContractTerm:
+        return ContractTerm(dt.fromisoformat(self.raw["terms"]["deadline"]),
+                            self.raw["terms"]["payment"]["onAccepted"],
+                            self.raw["terms"]["payment"]["onFulfilled"],
+                            list(map(lambda d: ContractDelivery(d["tradeSymbol"], d["destinationSymbol"], d["unitsRequired"], d["unitsFulfilled"]), self.raw.get("terms", {}).get("deliver", []))))
+
+    @cached_property
+    def deadline_to_accept(self) -> dt:
+        return dt.fromisoformat(self.raw["deadlineToAccept"])
+
+    def is_complete(self) -> bool:
+        """ Everything has been delivered, the contract can be fulfilled """
+        return all(d.units_fulfilled >= d.units_required for d in self.terms.deliveries)
 
     def __str__(self) -> str:
         return f"Contract(id: {self.id}, faction: {self.faction}, type: {self.type}, terms: {self.terms}, accepted: {self.accepted}, fulfilled: {self.fulfilled}, deadline_to_accept: {self.deadline_to_accept})"
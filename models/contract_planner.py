@@ -0,0 +1,182 @@
+from dataclasses import dataclass, field
+from datetime import datetime as dt
+from enum import Enum
+from math import ceil
+from models.ship import Ship
+from models.contract import Contract, ContractDelivery
+from models.fleet import FleetIndex
+from models.market_cache import MarketCache
+from models.extraction_log import ExtractionLog, ExtractionRate
+from models.navigation import Navigator, fuel_purchase_cost
+
+class ContractSource(Enum):
+    BUY = 1   # buy the goods at a market
+    MINE = 2  # extract them at an asteroid
+
+@dataclass
+class DeliveryPlan:
+    """ What one ship does for one delivery of a contract """
+    ship_symbol:str
+    source:ContractSource
+    trade:str
+    pickup:str          # market to buy at or asteroid to mine at
+    destination:str
+    units:int = 0
+    trips:int = 0
+    seconds:int = 0
+
+@dataclass
+class ContractEstimate:
+    """ Cost, time and plan to see a contract through """
+    contract_id:str
+    revenue:int
+    cost:int = 0
+    seconds:int = 0
+    feasible:bool = True
+    reason:str = ""
+    deliveries:list[DeliveryPlan] = field(default_factory=list)
+
+    def profit(self) -> int:
+        return self.revenue - self.cost
+
+    def profit_per_hour(self) -> float:
+        return self.profit() * 3600 / max(self.seconds, 1)
+
+class ContractPlanner:
+    """
+    Estimates what contracts are worth from what we already know:
+    cached market prices, waypoint positions, the fleet's holds and the
+    extraction log. Each delivery is either bought at the cheapest market
+    or mined where that good comes up the most, whichever costs less once
+    mining time is valued at what the fleet makes per hour mining anyway.
+    Trips go to the ship that would finish them first, so the estimated
+    time is when the last ship is done. No requests are made.
+    """
+    def __init__(self, fleet:FleetIndex, markets:MarketCache, navigator:Navigator, extractions:ExtractionLog, default_fuel_price:int=72, min_profit_per_hour:float=0.0) -> None:
+        self.fleet:FleetIndex = fleet
+        self.markets:MarketCache = markets
+        self.navigator:Navigator = navigator
+        self.extractions:ExtractionLog = extractions
+        self.default_fuel_price:int = default_fuel_price
+        self.min_profit_per_hour:float = min_profit_per_hour
+
+    def __str__(self) -> str:
+        return f"ContractPlanner(min_profit_per_hour: {self.min_profit_per_hour})"
+
+    def estimate(self, contract:Contract, now:dt) -> ContractEstimate:
+        """ Estimate a contract and plan who delivers what """
+        revenue:int = contract.terms.payment_on_fulfilled
+        if not contract.accepted:
+            revenue += contract.terms.payment_on_accepted
+        estimate:ContractEstimate = ContractEstimate(contract.id, revenue)
+        if contract.fulfilled:
+            return self._infeasible(estimate, "already fulfilled")
+
+        ships:list[Ship] = [s for s in self.fleet.ships_by_symbol.values() if s.cargo.capacity > 0]
+        if len(ships) == 0:
+            return self._infeasible(estimate, "no ship can carry cargo")
+        busy:dict[str, int] = {s.symbol: 0 for s in ships}
+        position:dict[str, str] = {s.symbol: s.nav.waypoint.waypoint for s in ships}
+        fuel:tuple[str, int]|None = self.markets.cheapest_purchase("FUEL")
+        fuel_price:int = fuel[1] if fuel is not None else self.default_fuel_price
+        mining_rates:dict[str, dict[str, float]] = self._mining_rates()
+        credits_per_hour:float = self._credits_per_hour()
+
+        delivery:ContractDelivery
+        for delivery in contract.terms.deliveries:
+            remaining:int = delivery.units_required - delivery.units_fulfilled
+            if remaining <= 0:
+                continue
+            source:tuple[ContractSource, str, float]|None = self._choose_source(delivery.trade, remaining, ships, mining_rates, credits_per_hour)
+            if source is None:
+                return self._infeasible(estimate, f"no known market or asteroid for {delivery.trade}")
+            kind, pickup, rate = source
+            candidates:list[Ship] = ships if kind == ContractSource.BUY else [s for s in ships if s.mining_strength() > 0]
+            plans:dict[str, DeliveryPlan] = {}
+            while remaining > 0:
+                # give the trip to whoever would be done with it first
+                best:tuple[int, Ship, int, int]|None = None
+                for ship in candidates:
+                    load:int = min(remaining, ship.cargo.capacity)
+                    seconds:int = self._trip_seconds(ship, position[ship.symbol], pickup, delivery.destination, load, rate)
+                    if best is None or busy[ship.symbol] + seconds < best[0]:
+                        best = (busy[ship.symbol] + seconds, ship, load, seconds)
+                done_at, ship, load, seconds = best
+                plan:DeliveryPlan = plans.setdefault(ship.symbol, DeliveryPlan(ship.symbol, kind, delivery.trade, pickup, delivery.destination))
+                plan.units += load
+                plan.trips += 1
+                plan.seconds += seconds
+                fuel_units:int = self.navigator.fuel_cost(position[ship.symbol], pickup) + self.navigator.fuel_cost(pickup, delivery.destination)
+                estimate.cost += fuel_purchase_cost(fuel_units, fuel_price)
+                if kind == ContractSource.BUY:
+                    estimate.cost += load * self.markets.purchase_prices_by_good[delivery.trade][pickup]
+                busy[ship.symbol] = done_at
+                position[ship.symbol] = delivery.destination
+                remaining -= load
+            estimate.deliveries.extend(plans.values())
+
+        estimate.seconds = max(busy.values())
+        if now.timestamp() + estimate.seconds > contract.terms.deadline.timestamp():
+            return self._infeasible(estimate, "would miss the deadline")
+        return estimate
+
+    def rank(self, contracts:list[Contract], now:dt) -> list[ContractEstimate]:
+        """ Estimates of every contract, feasible ones first, best profit per hour first """
+        estimates:list[ContractEstimate] = [self.estimate(c, now) for c in contracts]
+        return sorted(estimates, key=lambda e: (not e.feasible, -e.profit_per_hour()))
+
+    def worthwhile(self, contracts:list[Contract], now:dt) -> list[ContractEstimate]:
+        """ Estimates of contracts not accepted yet that are worth accepting """
+        waiting:list[Contract] = [c for c in contracts if not c.accepted and c.deadline_to_accept.timestamp() > now.timestamp()]
+        return [e for e in self.rank(waiting, now) if e.feasible and e.profit() > 0 and e.profit_per_hour() >= self.min_profit_per_hour]
+
+    # Helper Methods
+
+    def _infeasible(self, estimate:ContractEstimate, reason:str) -> ContractEstimate:
+        estimate.feasible = False
+        estimate.reason = reason
+        return estimate
+
+    def _mining_rates(self) -> dict[str, dict[str, float]]:
+        """ good -> asteroid -> units of it a ship extracts per second """
+        units:dict[tuple[str, str], int] = {}
+        for record in self.extractions.records:
+            key:tuple[str, str] = (record.yield_symbol, record.waypoint)
+            units[key] = units.get(key, 0) + record.yield_units
+        rates:dict[str, dict[str, float]] = {}
+        # time spent at an asteroid counts against every good found there
+        waypoint_rates:dict[object, ExtractionRate] = self.extractions.rates_by_waypoint()
+        for (good, waypoint), total in units.items():
+            seconds:int = waypoint_rates[waypoint].seconds
+            if seconds > 0:
+                rates.setdefault(good, {})[waypoint] = total / seconds
+        return rates
+
+    def _credits_per_hour(self) -> float:
+        """ What a ship makes per hour mining, the cost of keeping it busy otherwise """
+        rate:ExtractionRate|None = self.extractions.rates_by(lambda r: None).get(None, None)
+        return rate.credits_per_hour() if rate is not None else 0.0
+
+    def _choose_source(self, good:str, units:int, ships:list[Ship], mining_rates:dict[str, dict[str, float]], credits_per_hour:float) -> tuple[ContractSource, str, float]|None:
+        """ Cheapest of buying or mining good, with where and the mining rate """
+        options:list[tuple[float, ContractSource, str, float]] = []
+        purchase:tuple[str, int]|None = self.markets.cheapest_purchase(good)
+        if purchase is not None:
+            options.append((purchase[1] * units, ContractSource.BUY, purchase[0], 0.0))
+        miners:int = sum(1 for s in ships if s.mining_strength() > 0)
+        rates:dict[str, float] = mining_rates.get(good, {})
+        if miners > 0 and len(rates) > 0:
+            asteroid:str = max(rates, key=rates.get)
+            hours:float = units / (rates[asteroid] * miners) / 3600
+            options.append((hours * credits_per_hour * miners, ContractSource.MINE, asteroid, rates[asteroid]))
+        if len(options) == 0:
+            return None
+        _, kind, pickup, rate = min(options, key=lambda o: o[0])
+        return (kind, pickup, rate)
+
+    def _trip_seconds(self, ship:Ship, start:str, pickup:str, destination:str, load:int, rate:float) -> int:
+        """ Fly to pickup, fill up, fly to destination """
+        seconds:int = self.navigator.travel_time(ship, start, pickup) + self.navigator.travel_time(ship, pickup, destination)
+        if rate > 0:
+            seconds += ceil(load / rate)
+        return seconds
@@ -0,0 +1,91 @@
+from dataclasses import dataclass, field
+from datetime import datetime as dt
+from models.ship import Ship
+from models.contract import Contract
+
+@dataclass(order=True)
+class ContractTask:
+    """ Units of one good still to bring somewhere for a contract, ordered by deadline """
+    deadline:dt
+    contract_id:str = field(compare=False)
+    trade:str = field(compare=False)
+    destination:str = field(compare=False)
+    remaining:int = field(compare=False)
+    reserved:int = field(default=0, compare=False)  # units ships are already bringing
+
+    def unreserved(self) -> int:
+        return max(self.remaining - self.reserved, 0)
+
+class ContractScheduler:
+    """
+    Earliest deadline first across the fleet. A ship holding contract goods
+    takes the most urgent delivery it can serve, once its hold is full or it
+    carries all that delivery still needs. Units on their way are reserved
+    so two ships never bring the same units.
+    """
+    def __init__(self) -> None:
+        self.tasks:list[ContractTask] = []
+        self.assigned:dict[str, tuple[ContractTask, int]] = {}  # ship -> task and units it brings
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def __str__(self) -> str:
+        return f"ContractScheduler(tasks: {len(self)}, assigned: {len(self.assigned)})"
+
+    def refresh(self, contracts:list[Contract], now:dt) -> None:
+        """ Rebuild the tasks from accepted contracts still open, keeping what ships are bringing """
+        reserved:dict[tuple[str, str, str], int] = {}
+        for task, units in self.assigned.values():
+            key:tuple[str, str, str] = (task.contract_id, task.trade, task.destination)
+            reserved[key] = reserved.get(key, 0) + units
+
+        tasks_by_key:dict[tuple[str, str, str], ContractTask] = {}
+        for c in contracts:
+            if not c.accepted or c.fulfilled or c.terms.deadline.timestamp() <= now.timestamp():
+                continue
+            for d in c.terms.deliveries:
+                remaining:int = d.units_required - d.units_fulfilled
+                if remaining > 0:
+                    key:tuple[str, str, str] = (c.id, d.trade, d.destination)
+                    tasks_by_key[key] = ContractTask(c.terms.deadline, c.id, d.trade, d.destination, remaining, reserved.get(key, 0))
+        self.tasks = sorted(tasks_by_key.values())
+        for ship_symbol, (task, units) in list(self.assigned.items()):
+            key:tuple[str, str, str] = (task.contract_id, task.trade, task.destination)
+            if key in tasks_by_key:
+                self.assigned[ship_symbol] = (tasks_by_key[key], units)
+            else:
+                # contract gone, the ship has nothing to bring anymore
+                del self.assigned[ship_symbol]
+
+    def wanted(self) -> set[str]:
+        """ Goods still needed and not on their way """
+        return {t.trade for t in self.tasks if t.unreserved() > 0}
+
+    def take(self, ship:Ship) -> ContractTask|None:
+        """ Most urgent delivery the ship should leave for now, None to keep mining """
+        if ship.symbol in self.assigned:
+            return self.assigned[ship.symbol][0]
+        held:dict[str, int] = {i.symbol: i.units for i in ship.cargo.inventory}
+        for task in self.tasks:
+            units:int = min(held.get(task.trade, 0), task.unreserved())
+            if units > 0 and (ship.cargo_is_full() or units == task.unreserved()):
+                task.reserved += units
+                self.assigned[ship.symbol] = (task, units)
+                return task
+        return None
+
+    def assignment(self, ship_symbol:str) -> tuple[ContractTask, int]|None:
+        """ Task and units the ship is bringing """
+        return self.assigned.get(ship_symbol, None)
+
+    def release(self, ship_symbol:str, delivered:int) -> None:
+        """ The ship is done with its task, delivered units count against it """
+        assignment:tuple[ContractTask, int]|None = self.assigned.pop(ship_symbol, None)
+        if assignment is None:
+            return
+        task, units = assignment
+        task.reserved = max(task.reserved - units, 0)
+        task.remaining = max(task.remaining - delivered, 0)
+        if task.remaining == 0:
+            self.tasks.remove(task)
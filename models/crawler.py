@@ -0,0 +1,160 @@
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from dataclasses import dataclass, field
+from math import ceil
+from time import monotonic
+from typing import Callable
+from models.spacetrader import Spacetrader
+from models.universe_store import UniverseStore
+
+@dataclass
+class CrawlProgress:
+    """ How far a crawl phase got and how fast """
+    phase:str
+    total:int
+    done:int = 0
+    failed:int = 0
+    requests:int = 0
+    started_at:float = field(default_factory=monotonic)
+
+    def requests_per_second(self) -> float:
+        return self.requests / max(monotonic() - self.started_at, 1e-9)
+
+    def __str__(self) -> str:
+        return f"{self.phase}: {self.done}/{self.total} done, {self.failed} failed, {self.requests} requests, {self.requests_per_second():.2f} req/s"
+
+class GalaxyCrawler:
+    """
+    Walks every system, its waypoints, marketplaces and shipyards into the
+    universe store. Pages are fetched by a pool of workers that all go
+    through the API rate limiter, so more workers only hide latency.
+    Every finished page, system or listing is checkpointed, so a crawl
+    that gets interrupted starts again where it stopped.
+    """
+    def __init__(self, api:Spacetrader, store:UniverseStore, workers:int=4, limit:int=20, report_every:float=10.0) -> None:
+        self.api:Spacetrader = api
+        self.store:UniverseStore = store
+        self.workers:int = workers
+        self.limit:int = limit
+        self.report_every:float = report_every
+        self.progress:list[CrawlProgress] = []
+
+    def __str__(self) -> str:
+        return f"GalaxyCrawler(workers: {self.workers}, store: {self.store})"
+
+    def crawl(self, markets:bool=True, shipyards:bool=True, jump_gates:bool=True) -> list[CrawlProgress]:
+        """ Crawl everything not crawled yet """
+        self.progress = []
+        self.crawl_systems()
+        self.crawl_waypoints()
+        if markets:
+            self.crawl_listings("MARKETPLACE", "market", self.store.add_market)
+        if shipyards:
+            self.crawl_listings("SHIPYARD", "shipyard", self.store.add_shipyard)
+        if jump_gates:
+            self.crawl_jump_gates()
+        return self.progress
+
+    def crawl_systems(self) -> CrawlProgress:
+        """ Every page of the systems listing """
+        first:dict = self._get(f"systems?page=1&limit={self.limit}")
+        total:int = first.get("meta", {}).get("total", 0)
+        pages:int = ceil(total / self.limit)
+        progress:CrawlProgress = self._start("systems", pages)
+        progress.requests += 1
+        if "data" in first and self.store.get_checkpoint("systems:1") is None:
+            self.store.add_systems(first["data"])
+            self.store.set_checkpoint("systems:1")
+        done:set[str] = self.store.checkpoints("systems:")
+        progress.done = len(done)
+        todo:list[int] = [p for p in range(2, pages + 1) if f"systems:{p}" not in done]
+
+        def fetch(page:int) -> int:
+            resp:dict = self._get(f"systems?page={page}&limit={self.limit}")
+            if "data" not in resp:
+                raise RuntimeError(f"systems page {page}: {resp.get('error', resp)}")
+            self.store.add_systems(resp["data"])
+            self.store.set_checkpoint(f"systems:{page}")
+            return 1
+        self._run(progress, fetch, todo)
+        return progress
+
+    def crawl_waypoints(self) -> CrawlProgress:
+        """ Every waypoint of every system, with traits """
+        done:set[str] = self.store.checkpoints("waypoints:")
+        systems:list[str] = self.store.system_symbols()
+        progress:CrawlProgress = self._start("waypoints", len(systems))
+        progress.done = len(done)
+
+        def fetch(system:str) -> int:
+            page:int = 1
+            requests:int = 0
+            while True:
+                resp:dict = self._get(f"systems/{system}/waypoints?page={page}&limit={self.limit}")
+                requests += 1
+                if "data" not in resp:
+                    raise RuntimeError(f"waypoints of {system}: {resp.get('error', resp)}")
+                self.store.add_waypoints(resp["data"])
+                if len(resp["data"]) < self.limit or page * self.limit >= resp.get("meta", {}).get("total", 0):
+                    break
+                page += 1
+            self.store.set_checkpoint(f"waypoints:{system}")
+            return requests
+        self._run(progress, fetch, [s for s in systems if f"waypoints:{s}" not in done])
+        return progress
+
+    def crawl_listings(self, trait:str, endpoint:str, add:Callable[[str, dict, str], None]) -> CrawlProgress:
+        """ Market or shipyard of every waypoint with the trait """
+        return self._crawl_endpoint(self.store.waypoints_with_trait(trait), endpoint, add)
+
+    def crawl_jump_gates(self) -> CrawlProgress:
+        """ Connections of every jump gate """
+        return self._crawl_endpoint(self.store.waypoints_of_type("JUMP_GATE"), "jump-gate",
+                                    lambda waypoint, raw, at: self.store.add_jump_gate(waypoint, raw["connections"]))
+
+    # Helper Methods
+
+    def _crawl_endpoint(self, waypoints:list[str], endpoint:str, add:Callable[[str, dict, str], None]) -> CrawlProgress:
+        """ One listing per waypoint, like its market or shipyard """
+        done:set[str] = self.store.checkpoints(f"{endpoint}:")
+        progress:CrawlProgress = self._start(endpoint, len(waypoints))
+        progress.done = len(done)
+
+        def fetch(waypoint:str) -> int:
+            system:str = "-".join(waypoint.split("-")[0:2])
+            resp:dict = self._get(f"systems/{system}/waypoints/{waypoint}/{endpoint}")
+            if "data" not in resp:
+                raise RuntimeError(f"{endpoint} of {waypoint}: {resp.get('error', resp)}")
+            add(waypoint, resp["data"], self.api.clock.now().isoformat())
+            self.store.set_checkpoint(f"{endpoint}:{waypoint}")
+            return 1
+        self._run(progress, fetch, [w for w in waypoints if f"{endpoint}:{w}" not in done])
+        return progress
+
+    def _get(self, path:str) -> dict:
+        return self.api.get_auth(path)
+
+    def _start(self, phase:str, total:int) -> CrawlProgress:
+        progress:CrawlProgress = CrawlProgress(phase, total)
+        self.progress.append(progress)
+        return progress
+
+    def _run(self, progress:CrawlProgress, fetch:Callable[[object], int], items:list) -> None:
+        """ Fetch items on the worker pool, reporting as it goes """
+        reported_at:float = monotonic()
+        executor:ThreadPoolExecutor = ThreadPoolExecutor(self.workers)
+        try:
+            futures:list[Future] = [executor.submit(fetch, item) for item in items]
+            for future in as_completed(futures):
+                try:
+                    progress.requests += future.result()
+                    progress.done += 1
+                except Exception as e:
+                    progress.failed += 1
+                    print(e)
+                if monotonic() - reported_at >= self.report_every:
+                    print(progress)
+                    reported_at = monotonic()
+        finally:
+            # on interrupt drop what has not started, checkpoints cover the rest
+            executor.shutdown(wait=True, cancel_futures=True)
+        print(progress)
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from datetime import datetime as dt
+from typing import Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from models.ship import Ship, ShipNav, ShipCargo, ShipFuel, ShipCooldown, ShipExtraction, Market
+    from models.survey import Survey
+    from models.contract import Contract
+    from models.shipyard import Shipyard
+
+@dataclass
+class ShipEvent:
+    """ Base for anything that happened to a ship """
+    ship_symbol:str
+
+@dataclass
+class ShipAdded(ShipEvent):
+    """ Ship joined the fleet """
+    ship:Ship
+
+@dataclass
+class ShipRemoved(ShipEvent):
+    """ Ship is no longer in the fleet """
+
+@dataclass
+class ShipUpdated(ShipEvent):
+    """ Refresh found changes, fields names what changed """
+    fields:list[str]
+
+@dataclass
+class ShipNavChanged(ShipEvent):
+    """ Ship nav changed, orbit, dock, flight mode """
+    nav:ShipNav
+
+@dataclass
+class ShipDeparted(ShipEvent):
+    """ Ship started flying to a destination """
+    destination:str
+    arrival_at:dt
+
+@dataclass
+class ShipArrived(ShipEvent):
+    """ Ship reached its destination """
+    waypoint:str
+
+@dataclass
+class CooldownStarted(ShipEvent):
+    """ Ship went on cooldown after an action """
+    cooldown:ShipCooldown
+
+@dataclass
+class CooldownEnded(ShipEvent):
+    """ Ship is ready for its next action """
+
+@dataclass
+class CargoChanged(ShipEvent):
+    """ Ship cargo changed """
+    cargo:ShipCargo
+
+@dataclass
+class CargoFull(ShipEvent):
+    """ Ship cargo hold is full """
+    cargo:ShipCargo
+
+@dataclass
+class FuelChanged(ShipEvent):
+    """ Ship fuel changed """
+    fuel:ShipFuel
+
+@dataclass
+class ExtractionCompleted(ShipEvent):
+    """ Ship extracted resources """
+    extraction:ShipExtraction
+    cooldown:ShipCooldown|None
+    survey:str|None
+
+@dataclass
+class SurveysCreated(ShipEvent):
+    """ Ship surveyed its waypoint """
+    surveys:list[Survey]
+
+@dataclass
+class SurveyExhausted:
+    """ Survey can no longer be used, exhausted or expired """
+    signature:str
+
+@dataclass
+class MiningStopped(ShipEvent):
+    """ Ship gave up extracting after failing again and again """
+    reason:str
+
+@dataclass
+class MarketUpdated:
+    """ Market was looked at """
+    market:Market
+
+@dataclass
+class ShipyardUpdated:
+    """ Shipyard was looked at """
+    shipyard:Shipyard
+
+@dataclass
+class ContractChanged:
+    """ Contract was received, accepted, delivered to or fulfilled """
+    contract:Contract
+
+class EventBus:
+    """
+    In-process publish/subscribe.
+    Handlers subscribed to a base class get every subclass of it too,
+    so subscribing to ShipEvent sees everything that happens to ships.
+    """
+    def __init__(self, debug:bool=False) -> None:
+        self.debug:bool = debug
+        self.handlers_by_type:dict[type, list[Callable]] = {}
+        self._dispatch:dict[type, list[Callable]] = {}
+
+    def subscribe(self, event_type:type, handler:Callable) -> Callable[[], None]:
+        """ Call handler(event) for every event of event_type, returns a function to unsubscribe """
+        self.handlers_by_type.setdefault(event_type, []).append(handler)
+        self._dispatch.clear()
+
+        def unsubscribe() -> None:
+            handlers:list[Callable] = self.handlers_by_type.get(event_type, [])
+            if handler in handlers:
+                handlers.remove(handler)
+                self._dispatch.clear()
+        return unsubscribe
+
+    def publish(self, event:object) -> None:
+        """ Hand the event to every interested handler, right away """
+        handlers:list[Callable]|None = self._dispatch.get(type(event), None)
+        if handlers is None:
+            handlers = []
+            for event_type in type(event).__mro__:
+                handlers.extend(self.handlers_by_type.get(event_type, []))
+            self._dispatch[type(event)] = handlers
+        if self.debug:
+            print(event)
+        for handler in list(handlers):
+            try:
+                handler(event)
+            except Exception as e:
+                # one bad subscriber should not stop the others
+                print(e)
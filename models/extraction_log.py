@@ -0,0 +1,97 @@
+from dataclasses import dataclass, asdict
+from datetime import datetime as dt
+from json import dumps, loads
+from os.path import exists
+from typing import Callable
+
+@dataclass
+class ExtractionRecord:
+    """ One extraction, with what did it and where """
+    ship_symbol:str
+    waypoint:str
+    frame:str
+    mounts:list[str]
+    mining_strength:int
+    survey:str|None
+    yield_symbol:str
+    yield_units:int
+    cooldown_seconds:int
+    credits:int
+    extracted_at:dt
+
+@dataclass
+class ExtractionRate:
+    """ Aggregated yield of a group of extractions """
+    extractions:int = 0
+    units:int = 0
+    credits:int = 0
+    seconds:int = 0
+
+    def units_per_hour(self) -> float:
+        return self.units * 3600 / self.seconds if self.seconds > 0 else 0.0
+
+    def credits_per_hour(self) -> float:
+        return self.credits * 3600 / self.seconds if self.seconds > 0 else 0.0
+
+class ExtractionLog:
+    """
+    Every extraction the fleet made, optionally appended to a json lines file.
+    Rates are measured against the cooldown each extraction cost,
+    that being the time the ship could not extract again.
+    """
+    def __init__(self, filename:str="") -> None:
+        self.filename:str = filename
+        self.records:list[ExtractionRecord] = []
+        if filename and exists(filename):
+            self.load(filename)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __str__(self) -> str:
+        return f"ExtractionLog(filename: {self.filename}, records: {len(self)})"
+
+    def record(self, record:ExtractionRecord) -> None:
+        """ Add an extraction """
+        self.records.append(record)
+        if self.filename:
+            with open(self.filename, "a") as stream:
+                row:dict = asdict(record)
+                row["extracted_at"] = record.extracted_at.isoformat()
+                stream.write(dumps(row) + "\n")
+
+    def load(self, filename:str) -> None:
+        """ Read previously recorded extractions """
+        with open(filename, "r") as stream:
+            for line in stream:
+                if line.strip():
+                    row:dict = loads(line)
+                    row["extracted_at"] = dt.fromisoformat(row["extracted_at"])
+                    self.records.append(ExtractionRecord(**row))
+
+    def rates_by(self, key:Callable[[ExtractionRecord], object]) -> dict[object, ExtractionRate]:
+        """ Aggregate rates grouped by key(record) """
+        rates:dict[object, ExtractionRate] = {}
+        for record in self.records:
+            rate:ExtractionRate = rates.setdefault(key(record), ExtractionRate())
+            rate.extractions += 1
+            rate.units += record.yield_units
+            rate.credits += record.credits
+            rate.seconds += record.cooldown_seconds
+        return rates
+
+    def rates_by_waypoint(self) -> dict[object, ExtractionRate]:
+        """ Rates per asteroid field """
+        return self.rates_by(lambda r: r.waypoint)
+
+    def rates_by_frame(self) -> dict[object, ExtractionRate]:
+        """ Rates per ship frame """
+        return self.rates_by(lambda r: r.frame)
+
+    def rates_by_mining_strength(self) -> dict[object, ExtractionRate]:
+        """ Rates per total strength of mining mounts """
+        return self.rates_by(lambda r: r.mining_strength)
+
+    def rates_by_ship(self) -> dict[object, ExtractionRate]:
+        """ Rates per ship """
+        return self.rates_by(lambda r: r.ship_symbol)
@@ -0,0 +1,107 @@
+from enum import Enum
+from models.ship import Ship
+from models.events import EventBus, ShipEvent, ShipAdded, ShipRemoved, ShipUpdated, ShipNavChanged, CargoChanged
+
+class CargoFullness(Enum):
+    EMPTY = 1
+    PARTIAL = 2
+    FULL = 3
+
+    @staticmethod
+    def of(ship:Ship) -> CargoFullness:
+        """ How full the ship's hold is """
+        if ship.cargo.units == 0:
+            return CargoFullness.EMPTY
+        if ship.cargo.is_full():
+            return CargoFullness.FULL
+        return CargoFullness.PARTIAL
+
+class FleetIndex:
+    """
+    Secondary indexes over the fleet by waypoint, system, nav status, role
+    and cargo fullness. Kept current from ship events, so lookups never
+    have to walk the whole fleet.
+    """
+    def __init__(self) -> None:
+        self.ships_by_symbol:dict[str, Ship] = {}
+        self.by_waypoint:dict[str, set[str]] = {}
+        self.by_system:dict[str, set[str]] = {}
+        self.by_status:dict[str, set[str]] = {}
+        self.by_role:dict[str, set[str]] = {}
+        self.by_fullness:dict[CargoFullness, set[str]] = {}
+        self.keys_by_symbol:dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.ships_by_symbol)
+
+    def __str__(self) -> str:
+        return f"FleetIndex(ships: {len(self)}, waypoints: {len(self.by_waypoint)}, systems: {len(self.by_system)})"
+
+    def subscribe(self, events:EventBus) -> None:
+        """ Keep the indexes current from fleet events """
+        events.subscribe(ShipAdded, lambda e: self.add(e.ship))
+        events.subscribe(ShipRemoved, lambda e: self.remove(e.ship_symbol))
+        events.subscribe(ShipNavChanged, self._on_ship_changed)
+        events.subscribe(CargoChanged, self._on_ship_changed)
+        events.subscribe(ShipUpdated, self._on_ship_changed)
+
+    def add(self, ship:Ship) -> None:
+        """ Index a ship, or re-index it if already known """
+        self.ships_by_symbol[ship.symbol] = ship
+        self.update(ship)
+
+    def update(self, ship:Ship) -> None:
+        """ Move the ship to the index entries matching its current state """
+        keys:tuple = (ship.nav.waypoint.waypoint, ship.nav.system, ship.nav.status, ship.role, CargoFullness.of(ship))
+        old_keys:tuple|None = self.keys_by_symbol.get(ship.symbol, None)
+        if old_keys == keys:
+            return
+        for index, old_key, key in zip(self._indexes(), old_keys or (None,) * len(keys), keys):
+            if old_key == key:
+                continue
+            if old_key is not None:
+                self._discard(index, old_key, ship.symbol)
+            index.setdefault(key, set()).add(ship.symbol)
+        self.keys_by_symbol[ship.symbol] = keys
+
+    def remove(self, ship_symbol:str) -> None:
+        """ Drop a ship from every index """
+        self.ships_by_symbol.pop(ship_symbol, None)
+        old_keys:tuple|None = self.keys_by_symbol.pop(ship_symbol, None)
+        if old_keys is None:
+            return
+        for index, old_key in zip(self._indexes(), old_keys):
+            self._discard(index, old_key, ship_symbol)
+
+    def query(self, waypoint:str|None=None, system:str|None=None, status:str|None=None, role:str|None=None, fullness:CargoFullness|None=None) -> list[Ship]:
+        """ Ships matching every given criteria, e.g. query(role="EXCAVATOR", status="IN_ORBIT", fullness=CargoFullness.EMPTY) """
+        matches:list[set[str]] = []
+        for index, key in zip(self._indexes(), (waypoint, system, status, role, fullness)):
+            if key is not None:
+                matches.append(index.get(key, set()))
+        if len(matches) == 0:
+            return list(self.ships_by_symbol.values())
+        matches.sort(key=len)
+        symbols:set[str] = matches[0].intersection(*matches[1:])
+        return [self.ships_by_symbol[s] for s in symbols]
+
+    def count(self, waypoint:str|None=None, system:str|None=None, status:str|None=None, role:str|None=None, fullness:CargoFullness|None=None) -> int:
+        """ Number of ships matching every given criteria """
+        return len(self.query(waypoint, system, status, role, fullness))
+
+    # Helper Methods
+
+    def _indexes(self) -> tuple[dict, ...]:
+        return (self.by_waypoint, self.by_system, self.by_status, self.by_role, self.by_fullness)
+
+    def _discard(self, index:dict, key:object, ship_symbol:str) -> None:
+        symbols:set[str]|None = index.get(key, None)
+        if symbols is not None:
+            symbols.discard(ship_symbol)
+            if len(symbols) == 0:
+                del index[key]
+
+    def _on_ship_changed(self, event:ShipEvent) -> None:
+        ship:Ship|None = self.ships_by_symbol.get(event.ship_symbol, None)
+        if ship is not None:
+            self.update(ship)
@@ -0,0 +1,89 @@
+from json import JSONDecoder, JSONDecodeError
+from time import monotonic
+from typing import IO, Iterator
+from models.universe_store import UniverseStore
+
+WHITESPACE:str = " \t\n\r"
+
+def iter_json_array(stream:IO[str], chunk_size:int=1 << 16) -> Iterator[object]:
+    """
+    Yield the items of a top level json array one at a time, reading the
+    stream in chunks. Only the item being decoded is held in memory,
+    however long the array is.
+    """
+    decoder:JSONDecoder = JSONDecoder()
+    buffer:str = ""
+    position:int = 0
+    started:bool = False
+    while True:
+        chunk:str = stream.read(chunk_size)
+        # keep only what has not been decoded yet
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("Expected a json array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ",":
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except JSONDecodeError:
+                if chunk == "":
+                    raise
+                break  # item cut by the chunk, read more
+            if end == len(buffer) and chunk != "":
+                break  # a number might go on in the next chunk
+            position = end
+            yield item
+        if chunk == "":
+            raise ValueError("Json array never closed")
+
+class GalaxyImporter:
+    """
+    Loads the bulk systems.json dump into the universe store.
+    Systems are parsed one at a time and written in batches, so memory
+    stays flat whatever the size of the galaxy.
+    """
+    def __init__(self, store:UniverseStore, batch_size:int=1000, report_every:float=5.0) -> None:
+        self.store:UniverseStore = store
+        self.batch_size:int = batch_size
+        self.report_every:float = report_every
+
+    def __str__(self) -> str:
+        return f"GalaxyImporter(batch_size: {self.batch_size}, store: {self.store})"
+
+    def import_file(self, filename:str) -> int:
+        """ Import a systems.json file, returns how many systems were imported """
+        with open(filename, "r", encoding="utf8") as stream:
+            return self.import_stream(stream)
+
+    def import_stream(self, stream:IO[str]) -> int:
+        started_at:float = monotonic()
+        reported_at:float = started_at
+        imported:int = 0
+        batch:list[dict] = []
+        for system in iter_json_array(stream):
+            batch.append(system)
+            if len(batch) >= self.batch_size:
+                self.store.add_systems(batch)
+                imported += len(batch)
+                batch = []
+                if monotonic() - reported_at >= self.report_every:
+                    reported_at = monotonic()
+                    print(f"Imported {imported} systems, {imported / (reported_at - started_at):.0f} systems/s")
+        if len(batch) > 0:
+            self.store.add_systems(batch)
+            imported += len(batch)
+        print(f"Imported {imported} systems in {monotonic() - started_at:.1f}s")
+        return imported
@@ -0,0 +1,88 @@
+from models.galaxy_snapshot import GalaxySnapshot, NO_ID
+
+try:
+    import numpy as np
+except ImportError:
+    # optional, install the galaxy extra to search the galaxy
+    np = None
+
+class GalaxySearch:
+    """
+    Nearest system queries over every system of a galaxy snapshot.
+    Coordinates are held in two int64 columns and each query is one
+    vectorized pass over them, a partial sort picks the k best, so a query
+    over tens of thousands of systems takes a fraction of a millisecond.
+    Which systems have a waypoint with a trait is worked out once per trait
+    from the snapshot trait masks and kept.
+    Distances are squared integers until the end, no rounding surprises.
+    """
+    def __init__(self, galaxy:GalaxySnapshot) -> None:
+        if np is None:
+            raise RuntimeError("Galaxy search needs numpy, install the galaxy extra")
+        self.galaxy:GalaxySnapshot = galaxy
+        self.xs = np.asarray(galaxy.systems["x"], dtype=np.int64)
+        self.ys = np.asarray(galaxy.systems["y"], dtype=np.int64)
+        self._systems_with_trait:dict[str, object] = {}  # trait -> sorted system indices
+
+    def __str__(self) -> str:
+        return f"GalaxySearch(systems: {len(self.xs)}, traits indexed: {len(self._systems_with_trait)})"
+
+    def coordinates(self, system_symbol:str) -> tuple[int, int]|None:
+        i:int|None = self.galaxy.system_index(system_symbol)
+        return (int(self.xs[i]), int(self.ys[i])) if i is not None else None
+
+    def nearest(self, x:int, y:int, k:int=1) -> list[tuple[str, float]]:
+        """ The k systems closest to (x, y) with their distance, closest first """
+        return self._nearest(x, y, k, None)
+
+    def within(self, x:int, y:int, radius:float) -> list[tuple[str, float]]:
+        """ Systems at most radius away from (x, y), closest first """
+        squared = self._squared_distances(x, y, None)
+        indices = np.flatnonzero(squared <= radius * radius)
+        indices = indices[np.argsort(squared[indices], kind="stable")]
+        return self._results(indices, squared[indices])
+
+    def nearest_with_trait(self, x:int, y:int, trait:str, k:int=1) -> list[tuple[str, float]]:
+        """ The k systems closest to (x, y) having a waypoint with the trait """
+        candidates = self.systems_with_trait(trait)
+        if len(candidates) == 0:
+            return []
+        return self._nearest(x, y, k, candidates)
+
+    def systems_with_trait(self, trait:str):
+        """ Indices of systems with at least one waypoint having the trait """
+        if trait not in self._systems_with_trait:
+            mask:tuple[int, int]|None = self.galaxy.trait_mask([trait])
+            if mask is None:
+                self._systems_with_trait[trait] = np.empty(0, dtype=np.int64)
+            else:
+                word:int = 0 if mask[0] != 0 else 1
+                traits = self.galaxy.waypoints["traits"][:, word]
+                systems = self.galaxy.waypoints["system"][(traits & np.uint64(mask[word])) != 0]
+                self._systems_with_trait[trait] = np.unique(systems[systems != NO_ID]).astype(np.int64)
+        return self._systems_with_trait[trait]
+
+    # Helper Methods
+
+    def _squared_distances(self, x:int, y:int, candidates):
+        if candidates is None:
+            dx = self.xs - x
+            dy = self.ys - y
+        else:
+            dx = self.xs[candidates] - x
+            dy = self.ys[candidates] - y
+        return dx * dx + dy * dy
+
+    def _nearest(self, x:int, y:int, k:int, candidates) -> list[tuple[str, float]]:
+        squared = self._squared_distances(x, y, candidates)
+        k = min(k, len(squared))
+        if k <= 0:
+            return []
+        best = np.argpartition(squared, k - 1)[:k] if k < len(squared) else np.arange(len(squared))
+        best = best[np.argsort(squared[best], kind="stable")]
+        indices = candidates[best] if candidates is not None else best
+        return self._results(indices, squared[best])
+
+    def _results(self, indices, squared) -> list[tuple[str, float]]:
+        symbols = self.galaxy.systems["symbol"][indices]
+        return [(self.galaxy.string(int(s)), float(d) ** 0.5) for s, d in zip(symbols, squared)]
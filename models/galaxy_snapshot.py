@@ -0,0 +1,212 @@
+from json import dumps, loads
+from os import makedirs
+from os.path import join
+from models.system import System
+from models.waypoint import Waypoint
+from models.universe_store import UniverseStore
+
+try:
+    import numpy as np
+except ImportError:
+    # optional, install the galaxy extra to use snapshots
+    np = None
+
+NO_ID:int = 0xFFFFFFFF
+MAX_TRAITS:int = 128
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("Galaxy snapshots need numpy, install the galaxy extra")
+
+def system_dtype():
+    return np.dtype([("symbol", "<u4"), ("sector", "<u4"), ("name", "<u4"), ("constellation", "<u4"),
+                     ("type", "u1"), ("x", "<i4"), ("y", "<i4"), ("first_waypoint", "<u4"), ("waypoint_count", "<u4")])
+
+def waypoint_dtype():
+    return np.dtype([("symbol", "<u4"), ("system", "<u4"), ("type", "u1"), ("x", "<i4"), ("y", "<i4"),
+                     ("orbits", "<u4"), ("traits", "<u8", (2,))])
+
+class GalaxySnapshot:
+    """
+    Read only galaxy in a few flat files, memory mapped on load so opening
+    it costs nothing whatever its size.
+    Systems and waypoints are numpy structured arrays sorted by symbol,
+    symbols and names are ids into a sorted string table, types are ids
+    into small lists and traits are a 128 bit mask split in two u8 words.
+    Lookups are binary searches, System and Waypoint objects are only
+    built when asked for.
+    """
+    FILES:tuple[str, ...] = ("strings.npy", "systems.npy", "waypoints.npy")
+
+    def __init__(self, strings, systems, waypoints, meta:dict) -> None:
+        self.strings = strings
+        self.systems = systems
+        self.waypoints = waypoints
+        self.system_types:list[str] = meta["system_types"]
+        self.waypoint_types:list[str] = meta["waypoint_types"]
+        self.traits:list[str] = meta["traits"]
+        self.trait_bits:dict[str, int] = {t: i for i, t in enumerate(self.traits)}
+        self._system_views:dict[int, System] = {}
+        self._waypoint_views:dict[int, Waypoint] = {}
+
+    def __str__(self) -> str:
+        return f"GalaxySnapshot(systems: {len(self.systems)}, waypoints: {len(self.waypoints)}, strings: {len(self.strings)})"
+
+    @staticmethod
+    def load(directory:str) -> GalaxySnapshot:
+        """ Memory map a snapshot, nothing is read until used """
+        _require_numpy()
+        with open(join(directory, "meta.json"), "r") as stream:
+            meta:dict = loads(stream.read())
+        strings, systems, waypoints = (np.load(join(directory, f), mmap_mode="r") for f in GalaxySnapshot.FILES)
+        return GalaxySnapshot(strings, systems, waypoints, meta)
+
+    @staticmethod
+    def build(store:UniverseStore, directory:str) -> GalaxySnapshot:
+        """ Write a snapshot of everything in the universe store """
+        _require_numpy()
+        systems:list[dict] = store.raw_rows("systems")
+        waypoints:list[dict] = store.raw_rows("waypoints")
+
+        strings:set[str] = set()
+        system_types:set[str] = set()
+        waypoint_types:set[str] = set()
+        traits:set[str] = set()
+        for s in systems:
+            strings.update((s["symbol"], s["sectorSymbol"], s.get("name", ""), s.get("constellation", "")))
+            system_types.add(s["type"])
+        for w in waypoints:
+            strings.add(w["symbol"])
+            waypoint_types.add(w["type"])
+            traits.update(t["symbol"] for t in w.get("traits", []))
+        if len(traits) > MAX_TRAITS:
+            raise ValueError(f"{len(traits)} traits do not fit in a {MAX_TRAITS} bit mask")
+
+        meta:dict = {"system_types": sorted(system_types), "waypoint_types": sorted(waypoint_types), "traits": sorted(traits)}
+        table:list[str] = sorted(strings)
+        string_ids:dict[str, int] = {s: i for i, s in enumerate(table)}
+        system_type_ids:dict[str, int] = {t: i for i, t in enumerate(meta["system_types"])}
+        waypoint_type_ids:dict[str, int] = {t: i for i, t in enumerate(meta["waypoint_types"])}
+        trait_bits:dict[str, int] = {t: i for i, t in enumerate(meta["traits"])}
+        system_ids:dict[str, int] = {s["symbol"]: i for i, s in enumerate(systems)}
+
+        string_array = np.array([s.encode("utf8") for s in table], dtype=f"S{max((len(s.encode('utf8')) for s in table), default=1)}")
+        waypoint_array = np.zeros(len(waypoints), dtype=waypoint_dtype())
+        first:dict[int, int] = {}
+        for i, w in enumerate(waypoints):
+            system:int = system_ids.get(w["systemSymbol"], NO_ID)
+            first.setdefault(system, i)
+            mask:list[int] = [0, 0]
+            for t in w.get("traits", []):
+                bit:int = trait_bits[t["symbol"]]
+                mask[bit // 64] |= 1 << (bit % 64)
+            orbits:str = w.get("orbits", "")
+            waypoint_array[i] = (string_ids[w["symbol"]], system, waypoint_type_ids[w["type"]], w["x"], w["y"],
+                                 string_ids.get(orbits, NO_ID) if orbits else NO_ID, mask)
+        counts = np.bincount(waypoint_array["system"][waypoint_array["system"] != NO_ID], minlength=len(systems))
+
+        system_array = np.zeros(len(systems), dtype=system_dtype())
+        for i, s in enumerate(systems):
+            system_array[i] = (string_ids[s["symbol"]], string_ids[s["sectorSymbol"]], string_ids[s.get("name", "")],
+                               string_ids[s.get("constellation", "")], system_type_ids[s["type"]], s["x"], s["y"],
+                               first.get(i, 0), counts[i])
+
+        makedirs(directory, exist_ok=True)
+        for filename, array in zip(GalaxySnapshot.FILES, (string_array, system_array, waypoint_array)):
+            np.save(join(directory, filename), array)
+        with open(join(directory, "meta.json"), "w") as stream:
+            stream.write(dumps(meta))
+        return GalaxySnapshot.load(directory)
+
+    def string(self, string_id:int) -> str:
+        return self.strings[string_id].decode("utf8") if string_id != NO_ID else ""
+
+    def string_id(self, value:str) -> int|None:
+        """ Id of a string in the sorted table, None if absent """
+        key:bytes = value.encode("utf8")
+        i:int = int(np.searchsorted(self.strings, key))
+        return i if i < len(self.strings) and self.strings[i] == key else None
+
+    def system_index(self, symbol:str) -> int|None:
+        return self._row(self.systems, symbol)
+
+    def waypoint_index(self, symbol:str) -> int|None:
+        return self._row(self.waypoints, symbol)
+
+    def trait_mask(self, traits:list[str]) -> tuple[int, int]|None:
+        """ The two mask words for traits, None if one was never seen """
+        mask:list[int] = [0, 0]
+        for t in traits:
+            bit:int|None = self.trait_bits.get(t, None)
+            if bit is None:
+                return None
+            mask[bit // 64] |= 1 << (bit % 64)
+        return (mask[0], mask[1])
+
+    def get_system(self, symbol:str) -> System|None:
+        """ System with its waypoints, built on first use """
+        i:int|None = self.system_index(symbol)
+        if i is None:
+            return None
+        if i not in self._system_views:
+            row = self.systems[i]
+            waypoints:list[Waypoint] = self._waypoints_in(i)
+            system:System = System({
+                "symbol": self.string(row["symbol"]),
+                "sectorSymbol": self.string(row["sector"]),
+                "name": self.string(row["name"]),
+                "constellation": self.string(row["constellation"]),
+                "type": self.system_types[row["type"]],
+                "x": int(row["x"]),
+                "y": int(row["y"]),
+                "waypoints": [],
+                "factions": [],
+            })
+            system.waypoints = waypoints
+            self._system_views[i] = system
+        return self._system_views[i]
+
+    def get_waypoint(self, symbol:str) -> Waypoint|None:
+        """ Waypoint built on first use, trait names are all it knows of traits """
+        i:int|None = self.waypoint_index(symbol)
+        return self._waypoint_view(i) if i is not None else None
+
+    def waypoints_of(self, system_symbol:str) -> list[Waypoint]:
+        i:int|None = self.system_index(system_symbol)
+        return self._waypoints_in(i) if i is not None else []
+
+    # Helper Methods
+
+    def _row(self, array, symbol:str) -> int|None:
+        """ Binary search of a symbol in an array sorted by symbol id """
+        string_id:int|None = self.string_id(symbol)
+        if string_id is None:
+            return None
+        i:int = int(np.searchsorted(array["symbol"], string_id))
+        return i if i < len(array) and array["symbol"][i] == string_id else None
+
+    def _waypoints_in(self, system_index:int) -> list[Waypoint]:
+        row = self.systems[system_index]
+        start:int = int(row["first_waypoint"])
+        return [self._waypoint_view(i) for i in range(start, start + int(row["waypoint_count"]))]
+
+    def _waypoint_view(self, i:int) -> Waypoint:
+        if i not in self._waypoint_views:
+            row = self.waypoints[i]
+            symbol_id:int = int(row["symbol"])
+            rows = self.waypoints[0:0]
+            if row["system"] != NO_ID:
+                system = self.systems[row["system"]]
+                start:int = int(system["first_waypoint"])
+                rows = self.waypoints[start:start + int(system["waypoint_count"])]
+            mask:tuple[int, int] = (int(row["traits"][0]), int(row["traits"][1]))
+            self._waypoint_views[i] = Waypoint({
+                "symbol": self.string(symbol_id),
+                "type": self.waypoint_types[row["type"]],
+                "x": int(row["x"]),
+                "y": int(row["y"]),
+                "orbits": self.string(int(row["orbits"])),
+                "orbitals": [{"symbol": self.string(int(o))} for o in rows["symbol"][rows["orbits"] == symbol_id]],
+                "traits": [{"symbol": t, "name": "", "description": ""} for b, t in enumerate(self.traits) if mask[b // 64] >> (b % 64) & 1],
+            })
+        return self._waypoint_views[i]
@@ -1,5 +1,4 @@
 from yaml import dump, safe_load, YAMLError
-from time import sleep
 from models.ship import Ship, ShipCargo, Market
 from models.waypoint import Waypoint
 from models.location import Location
@@ -9,7 +8,34 @@ from models.agent import Agent
 from models.system import System
 from models.shipyard import Shipyard
 from models.account import Account
+from models.timer_wheel import TimerWheel, Timer
+from models.fleet import FleetIndex
+from models.survey import Survey, SurveyCache
+from models.market_cache import MarketCache
+from models.extraction_log import ExtractionLog, ExtractionRecord, ExtractionRate
+from models.universe import Universe
+from models.cargo_policy import CargoPolicy, CargoAction, CargoDecision
+from models.transfer import TransferOrchestrator
+from models.navigation import Navigator
+from models.contract_planner import ContractPlanner, ContractEstimate
+from models.contract_scheduler import ContractScheduler, ContractTask
+from models.shipyard_cache import ShipyardCache
+from models.purchase_optimizer import PurchaseOptimizer, PurchaseOption
+from models.ship_rules import ShipRules
+from models.universe_store import UniverseStore
+from models.crawler import GalaxyCrawler, CrawlProgress
+from models.galaxy_import import GalaxyImporter
+from models.galaxy_snapshot import GalaxySnapshot
+from models.galaxy_search import GalaxySearch
+from models.trait_index import TraitQuery
+from models.codec import get_codec
+from models.transport import Transport, API_URL, make_transport
+from models.shared_limiter import make_limiter
+from models.jump_graph import RouteLeg, LegKind, system_of
+from models.events import EventBus, ShipAdded, ShipRemoved, ShipDeparted, ShipArrived, CooldownStarted, CooldownEnded, CargoFull, ExtractionCompleted, ContractChanged, SurveysCreated, SurveyExhausted, MarketUpdated, ShipyardUpdated, MiningStopped
 from datetime import datetime
+from os.path import exists, join
+from threading import Event, RLock, Thread
 
 class Hero:
     """ Class representing the player """
@@ -28,6 +54,50 @@ class Hero:
         self.api:Spacetrader = Spacetrader("", "")
         self.ships_by_symbol:dict[str, Ship] = {}
         self.systems:list[System] = []
+        self.timers:TimerWheel = TimerWheel()
+        self.events:EventBus = EventBus()
+        self.timer_by_ship_event:dict[tuple[str, type], Timer] = {}
+        self.events.subscribe(ShipDeparted, self._on_ship_departed)
+        self.events.subscribe(CooldownStarted, self._on_cooldown_started)
+        self.events.subscribe(ShipArrived, self._on_ship_arrived)
+        self.fleet:FleetIndex = FleetIndex()
+        self.fleet.subscribe(self.events)
+        self.markets:MarketCache = MarketCache()
+        self.surveys:SurveyCache = SurveyCache()
+        self.wanted_deposits:set[str] = set()  # empty means anything worth selling
+        self.events.subscribe(MarketUpdated, lambda e: self.markets.update(e.market, self.api.clock.now()))
+        self.events.subscribe(SurveysCreated, lambda e: self.surveys.add(e.surveys))
+        self.events.subscribe(SurveyExhausted, lambda e: self.surveys.discard(e.signature))
+        self.extractions:ExtractionLog = ExtractionLog()
+        self.universe:Universe = Universe()
+        self.cargo_policy:CargoPolicy = CargoPolicy(self.markets, self.universe)
+        self.transfers:TransferOrchestrator = TransferOrchestrator(self.fleet, self.markets, self.cargo_policy)
+        self.events.subscribe(ExtractionCompleted, self._on_extraction_completed)
+        self.navigator:Navigator = Navigator(self.universe)
+        self.contract_planner:ContractPlanner = ContractPlanner(self.fleet, self.markets, self.navigator, self.extractions)
+        self.contract_scheduler:ContractScheduler = ContractScheduler()
+        self.events.subscribe(ContractChanged, self._on_contract_changed)
+        self.shipyards:ShipyardCache = ShipyardCache()
+        self.events.subscribe(ShipyardUpdated, lambda e: self.shipyards.update(e.shipyard, self.api.clock.now()))
+        self.purchase_optimizer:PurchaseOptimizer = PurchaseOptimizer(self.shipyards, self.fleet, self.navigator, self.extractions, self.markets)
+        self.ship_rules:ShipRules = ShipRules()
+        self.universe_store_filename:str = "universe.db"
+        self.galaxy_snapshot_directory:str = "galaxy"
+        self.galaxy:GalaxySnapshot|None = None
+        self.galaxy_search:GalaxySearch|None = None
+        self.detailed_systems:set[str] = set()  # systems with every waypoint fetched, traits and all
+        self.routes:dict[str, list[RouteLeg]] = {}  # ship -> legs still to go
+        self.events.subscribe(ShipArrived, self._on_route_arrived)
+        self.auto_mining:set[str] = set()  # ships mining on their own, as long as timers run
+        self.mining_failures:dict[str, int] = {}  # ship -> extractions failed in a row
+        self.max_mining_retries:int = 3
+        self.events.subscribe(MiningStopped, lambda e: self.auto_mining.discard(e.ship_symbol))
+        self.events.subscribe(CooldownEnded, self._on_auto_mining_cooldown_ended)
+        self.events.subscribe(CargoFull, self._on_auto_mining_cargo_full)
+        self.events.subscribe(ShipArrived, self._on_auto_mining_arrived)
+        self.lock:RLock = RLock()  # held by whoever uses the hero while the fleet loop runs
+        self._fleet_thread:Thread|None = None
+        self._fleet_stop:Event = Event()
 
     def __str__(self) -> str:
         return f"Hero(callsign: {self.callsign}, faction: {self.faction})"
@@ -37,19 +107,62 @@ class Hero:
         with open(filename, "r") as stream:
             try:
                 obj = safe_load(stream)
-                self.callsign = obj["callsign"]
-                self.faction = obj["faction"]
-                self.token = obj.get("token", None)
-                self.account_token = obj.get("account_token", None)
-                self.debug = obj.get("debug", False)
-                self.api = Spacetrader(self.token, self.account_token, self.debug)
-                self.headquarter = None
-                if self.debug:
-                    print(f"init_from_file: {filename}")
-                    print(self)
             except YAMLError as exc:
                 print(exc)
                 print(f"Unable to read from file named {filename}")
+                return
+        registered:bool = self.init_from_dict(obj)
+        if self.debug:
+            print(f"init_from_file: {filename}")
+
+        # save token
+        if registered:
+            with open(filename, "w+") as stream:
+                try:
+                    # keep every other setting of the file as it was
+                    obj["token"] = self.token
+                    obj["account_token"] = self.account_token
+                    stream.write(dump(obj))
+                except YAMLError as exc:
+                    print(exc)
+                    print(f"Unable to write to file named {filename}")
+
+    def init_from_dict(self, obj:dict) -> bool:
+        """
+        Build everything from settings already read, like the ones of data.yaml.
+        Registers the agent when there is no valid token, returns True if it did.
+        """
+        self.callsign = obj["callsign"]
+        self.faction = obj["faction"]
+        self.token = obj.get("token", None)
+        self.account_token = obj.get("account_token", None)
+        self.debug = obj.get("debug", False)
+        transport:Transport = make_transport(obj.get("transport", "http1"), obj.get("api_url", API_URL), obj.get("request_timeout", 30.0))
+        self.api = Spacetrader(self.token, self.account_token, self.debug, transport)
+        self.api.codec = get_codec(obj.get("json_codec", "auto"))
+        self.api.compression = obj.get("compression", True)
+        self.api.limiter = make_limiter(obj.get("rate_limiter", "local"), obj.get("rate_limiter_file", ""), self.callsign)
+        self.extractions = ExtractionLog(obj.get("extraction_log", ""))
+        self.transfers.debug = self.debug
+        self.contract_planner.extractions = self.extractions
+        self.purchase_optimizer.extractions = self.extractions
+        self.universe_store_filename = obj.get("universe_store", self.universe_store_filename)
+        self.galaxy_snapshot_directory = obj.get("galaxy_snapshot", self.galaxy_snapshot_directory)
+        if exists(self.universe_store_filename):
+            self.load_jump_graph()
+            self.universe.attach_store(self.universe_store_filename)
+        if exists(join(self.galaxy_snapshot_directory, "meta.json")):
+            try:
+                self.galaxy = GalaxySnapshot.load(self.galaxy_snapshot_directory)
+                self.galaxy_search = GalaxySearch(self.galaxy)
+            except RuntimeError as e:
+                print(e)
+        if "ship_rules" in obj:
+            self.ship_rules = ShipRules.from_list(obj["ship_rules"])
+        self.contract_planner.min_profit_per_hour = obj.get("min_contract_profit_per_hour", 0.0)
+        self.headquarter = None
+        if self.debug:
+            print(self)
 
         account:Account|None = self.get_account()
         if account is None:
@@ -70,23 +183,11 @@ class Hero:
             self.token = resp.get("data", {}).get("token", None)
             self.api.token = self.token
 
-            # save token
-            if self.token is not None:
-                with open(filename, "w+") as stream:
-                    try:
-                        data = {
-                                 "debug": self.debug,
-                                 "callsign": self.callsign,
-                                 "faction": self.faction,
-                                 "token": self.token,
-                                 "account_token": self.account_token
-                               }
-                        stream.write(dump(data))
-                    except YAMLError as exc:
-                        print(exc)
-                        print(f"Unable to write to file named {filename}")
-            else:
+            if self.token is None:
                 print("Unable to get token")
+                return False
+            return True
+        return False
 
     def get_account(self) -> Account|None:
         """ Get account """
@@ -127,11 +228,26 @@ class Hero:
         return self.agent
 
     def get_my_ships(self) -> list[Ship]:
-        """ Get my ships """
-        info = self.api.get_auth("my/ships")["data"]
-        ships = list(map(lambda s: Ship(self.api, s), info))
-        ship_keys = list(map(lambda s: s.symbol, ships))
-        self.ships_by_symbol = dict(zip(ship_keys, ships))
+        """
+        Get my ships.
+        Ships we already know are updated in place and only publish what
+        changed, new ships are added and ships that are gone are removed.
+        """
+        info = self._get_all_pages("my/ships")
+        previous:dict[str, Ship] = self.ships_by_symbol
+        ships:list[Ship] = []
+        for raw in info:
+            ship:Ship|None = previous.get(raw["symbol"], None)
+            if ship is None:
+                ship = Ship(self.api, raw, self.events)
+                self.events.publish(ShipAdded(ship.symbol, ship))
+            else:
+                ship.update(raw)
+            ships.append(ship)
+        self.ships_by_symbol = {s.symbol: s for s in ships}
+        for symbol in previous:
+            if symbol not in self.ships_by_symbol:
+                self.events.publish(ShipRemoved(symbol))
         if self.debug:
             print("Get my ships")
             print(info)
@@ -143,7 +259,11 @@ class Hero:
         """ Get contracts """
         if (not lazy_load) or (lazy_load and len(self.contracts) == 0):
             info = self.api.get_auth("my/contracts")["data"]
+            previous:dict[str, Contract] = {c.id: c for c in self.contracts}
             self.contracts = list(map(lambda c: Contract(c), info))
+            for c in self.contracts:
+                if c.id not in previous or str(previous[c.id]) != str(c):
+                    self.events.publish(ContractChanged(c))
             if self.debug:
                 print("Get Contracts")
                 for c in self.contracts:
@@ -164,12 +284,54 @@ class Hero:
             self.accept_contract(c.id)
         self.get_contracts()
 
+    def plan_contracts(self) -> list[ContractEstimate]:
+        """ Estimate every contract from cached prices, positions and the fleet """
+        return self.contract_planner.rank(self.get_contracts(), self.api.clock.now())
+
+    def accept_worthwhile_contracts(self) -> list[ContractEstimate]:
+        """ Accept only the contracts the planner thinks are worth it """
+        worthwhile:list[ContractEstimate] = self.contract_planner.worthwhile(self.get_contracts(), self.api.clock.now())
+        for estimate in worthwhile:
+            if self.debug:
+                print(f"Accepting {estimate.contract_id}, {estimate.profit()} profit in {estimate.seconds}s")
+            self.accept_contract(estimate.contract_id)
+        return worthwhile
+
     def accept_contract(self, contract_id:str) -> None:
         """ Accept a particular contract """
         info = self.api.post_auth(f"my/contracts/{contract_id}/accept")
         if self.debug:
             print("Accept Contract")
             print(info)
+        raw_contract:dict|None = info.get("data", {}).get("contract", None)
+        if raw_contract is not None:
+            contract:Contract = Contract(raw_contract)
+            self.contracts = [contract if c.id == contract.id else c for c in self.contracts]
+            self.events.publish(ContractChanged(contract))
+
+    def fulfill_contract(self, contract_id:str) -> Contract|None:
+        """ Get paid for a contract once everything has been delivered """
+        try:
+            info = self.api.post_auth(f"my/contracts/{contract_id}/fulfill")["data"]
+        except Exception as e:
+            print(e)
+            return None
+        if self.debug:
+            print("Fulfill Contract")
+            print(info)
+        if self.agent is not None:
+            self.agent.credits = info["agent"]["credits"]
+        contract:Contract = Contract(info["contract"])
+        self.events.publish(ContractChanged(contract))
+        return contract
+
+    def negotiate_contract(self, ship_name:str) -> Contract|None:
+        """ Negotiate a new contract, the ship must be at a waypoint of a faction """
+        matching = self._find_ship_by_name(ship_name)
+        if matching is None:
+            return None
+        matching.dock()
+        return matching.negotiate_contract()
 
     def get_headquarter_waypoints(self, page:int=1) -> list[Waypoint]:
         """ Get all the waypoints in the same system as the headquarter """
@@ -194,12 +356,29 @@ class Hero:
             print(url)
         raw_waypoints = self.api.get_auth(url)["data"]
         waypoints:list[Waypoint] = list(map(lambda w: Waypoint(w), raw_waypoints))
+        self.universe.add_waypoints(waypoints)
         if self.debug:
             print(f"Get waypoints for system {system} and trait {trait}")
             for w in waypoints:
                 print(w)
         return waypoints
 
+    def find_waypoints(self, query:str, system:str|None=None) -> list[Waypoint]:
+        """
+        Known waypoints matching a trait query like "MARKETPLACE !STRIPPED type=ENGINEERED_ASTEROID",
+        see TraitQuery.parse. Given a system, all its waypoints are fetched the first time.
+        """
+        trait_query:TraitQuery = TraitQuery.parse(query)
+        if system is not None:
+            trait_query.system = system
+            if system not in self.detailed_systems:
+                self.universe.add_waypoints(list(map(lambda w: Waypoint(w), self._get_all_pages(f"systems/{system}/waypoints"))))
+                self.detailed_systems.add(system)
+        waypoints:list[Waypoint] = self.universe.find(trait_query)
+        if self.debug:
+            print(f"Find waypoints {trait_query}: {len(waypoints)} of {len(self.universe.traits)}")
+        return waypoints
+
     def get_shipyard_waypoints(self, system:str, page:int=1) -> list[Waypoint]:
         """ Get all the shipyard waypoints given a system """
         return self.get_waypoints(system, "SHIPYARD", page)
@@ -230,6 +409,9 @@ class Hero:
             print("Get Systems")
             print(raw)
         self.systems = list(map(lambda s: System(s), raw))
+        for system in self.systems:
+            self.universe.add_system(system)
+            self.navigator.graph.add_system(system.symbol, system.x, system.y, system.waypoints[0].waypoint if len(system.waypoints) > 0 else None)
         return self.systems
 
     def get_system(self, system_symbol:str) -> System:
@@ -238,7 +420,10 @@ class Hero:
         if self.debug:
             print("Get System")
             print(raw)
-        return System(raw)
+        system:System = System(raw)
+        self.universe.add_system(system)
+        self.navigator.graph.add_system(system.symbol, system.x, system.y, system.waypoints[0].waypoint if len(system.waypoints) > 0 else None)
+        return system
 
     def get_waypoint(self, location) -> Waypoint:
         """ Get waypoint given a location """
@@ -246,7 +431,9 @@ class Hero:
         if self.debug:
             print("Get Waypoint")
             print(raw_waypoint)
-        return Waypoint(raw_waypoint)
+        waypoint:Waypoint = Waypoint(raw_waypoint)
+        self.universe.add_waypoints([waypoint])
+        return waypoint
 
     def get_shipyard(self, shipyard_waypoint_symbol:str) -> Shipyard|None:
         """ Get all the ships available to purchase from headquarter """
@@ -257,7 +444,156 @@ class Hero:
             print(raw)
         if raw is None:
             return None
-        return Shipyard(raw)
+        shipyard:Shipyard = Shipyard(raw)
+        self.events.publish(ShipyardUpdated(shipyard))
+        return shipyard
+
+    def crawl_shipyards(self, systems:list[str]=[]) -> ShipyardCache:
+        """ Look at every shipyard of the given systems, by default those our ships and headquarter are in """
+        if len(systems) == 0:
+            self.get_agent(True)
+            systems = sorted({s.nav.system for s in self.ships_by_symbol.values()} | {self.headquarter.system})
+        for system in systems:
+            raw_waypoints:list[dict] = self._get_all_pages(f"systems/{system}/waypoints?traits=SHIPYARD")
+            waypoints:list[Waypoint] = list(map(lambda w: Waypoint(w), raw_waypoints))
+            self.universe.add_waypoints(waypoints)
+            for w in waypoints:
+                self.get_shipyard(w.waypoint)
+        if self.debug:
+            print(f"Crawled {self.shipyards}")
+        return self.shipyards
+
+    def crawl_galaxy(self, workers:int=4) -> list[CrawlProgress]:
+        """ Crawl every system, waypoint, market and shipyard into the local universe store, resuming if interrupted """
+        store:UniverseStore = UniverseStore(self.universe_store_filename)
+        try:
+            return GalaxyCrawler(self.api, store, workers).crawl()
+        finally:
+            store.close()
+            self.universe.attach_store(self.universe_store_filename)
+
+    def import_galaxy(self, filename:str="systems.json") -> int:
+        """ Load the bulk systems dump into the local universe store, downloading it first if missing """
+        if not exists(filename):
+            self.api.download("systems.json", filename)
+        store:UniverseStore = UniverseStore(self.universe_store_filename)
+        try:
+            return GalaxyImporter(store).import_file(filename)
+        finally:
+            store.close()
+            self.universe.attach_store(self.universe_store_filename)
+
+    def nearest_systems(self, system_symbol:str, k:int=10, trait:str|None=None) -> list[tuple[str, float]]:
+        """
+        Systems closest to a system, optionally only those with a waypoint
+        having the trait, with their distance. Needs a galaxy snapshot.
+        """
+        position:tuple[int, int]|None = self._galaxy_position(system_symbol)
+        if position is None:
+            return []
+        if trait is None:
+            return self.galaxy_search.nearest(position[0], position[1], k)
+        return self.galaxy_search.nearest_with_trait(position[0], position[1], trait, k)
+
+    def systems_within(self, system_symbol:str, radius:float) -> list[tuple[str, float]]:
+        """ Systems at most radius away from a system, closest first """
+        position:tuple[int, int]|None = self._galaxy_position(system_symbol)
+        if position is None:
+            return []
+        return self.galaxy_search.within(position[0], position[1], radius)
+
+    def load_jump_graph(self) -> None:
+        """ Systems and jump gates from the universe store into the navigator """
+        store:UniverseStore = UniverseStore(self.universe_store_filename)
+        try:
+            landings:dict[str, str] = store.landing_waypoints()
+            for system, (x, y) in store.system_coordinates().items():
+                self.navigator.graph.add_system(system, x, y, landings.get(system, None))
+            for gate in store.waypoints_of_type("JUMP_GATE"):
+                self.navigator.graph.gates[system_of(gate)] = gate
+            for gate, connections in store.jump_gates().items():
+                self.navigator.graph.add_jump_gate(gate, connections)
+        finally:
+            store.close()
+        if self.debug:
+            print(self.navigator.graph)
+
+    def get_jump_gate(self, waypoint_symbol:str) -> list[str]:
+        """ Gates a jump gate connects to """
+        system:str = system_of(waypoint_symbol)
+        raw = self.api.get_auth(f"systems/{system}/waypoints/{waypoint_symbol}/jump-gate").get("data", None)
+        if self.debug:
+            print("Get Jump Gate")
+            print(raw)
+        if raw is None:
+            return []
+        self.navigator.graph.add_jump_gate(waypoint_symbol, raw["connections"])
+        return raw["connections"]
+
+    def plan_route(self, ship_name:str, destination:str) -> list[RouteLeg]|None:
+        """ Legs to get a ship to any waypoint, None if no known way """
+        matching = self._find_ship_by_name(ship_name)
+        if matching is None:
+            return None
+        return self.navigator.route(matching, matching.nav.waypoint.waypoint, destination)
+
+    def travel(self, ship_name:str, destination:str) -> list[RouteLeg]|None:
+        """
+        Start a ship on its way to any waypoint, across systems through jump
+        gates or warps. Each leg starts when the one before arrives or the
+        reactor cools down, a ShipArrived at the destination ends it.
+        """
+        legs:list[RouteLeg]|None = self.plan_route(ship_name, destination)
+        if legs is None:
+            print(f"No known route for {ship_name} to {destination}")
+            return None
+        if self.debug:
+            for leg in legs:
+                print(f"{ship_name}: {leg.kind.name} {leg.origin} -> {leg.destination}, {leg.seconds}s")
+        self.routes[ship_name] = list(legs)
+        self._next_leg(ship_name)
+        return legs
+
+    def build_galaxy_snapshot(self) -> GalaxySnapshot:
+        """ Snapshot the universe store into memory mappable files, opened instantly from then on """
+        store:UniverseStore = UniverseStore(self.universe_store_filename)
+        try:
+            self.galaxy = GalaxySnapshot.build(store, self.galaxy_snapshot_directory)
+        finally:
+            store.close()
+        self.galaxy_search = GalaxySearch(self.galaxy)
+        if self.debug:
+            print(self.galaxy)
+        return self.galaxy
+
+    def recommend_ship_purchases(self, max_payback_hours:float=float("inf")) -> list[PurchaseOption]:
+        """ Ship types worth buying with the credits we have, quickest payback first """
+        return self.purchase_optimizer.recommend(self.get_agent().credits, max_payback_hours)
+
+    def buy_recommended_ship(self, option:PurchaseOption) -> dict|None:
+        """ Bring our nearest ship to the shipyard if needed and buy there """
+        nearest:Ship|None = self.purchase_optimizer.nearest_ship(option.shipyard)
+        if nearest is None:
+            print(f"No ship of ours can get to {option.shipyard}")
+            return None
+        if nearest.nav.waypoint.waypoint != option.shipyard:
+            arrived:list[bool] = []
+
+            def on_ship_arrived(event:ShipArrived) -> None:
+                if event.ship_symbol == nearest.symbol and event.waypoint == option.shipyard:
+                    arrived.append(True)
+            unsubscribe = self.events.subscribe(ShipArrived, on_ship_arrived)
+            nearest.orbit()
+            if nearest.fly(option.shipyard) is None:
+                unsubscribe()
+                return None
+            self.timers.run(lambda: len(arrived) > 0)
+            unsubscribe()
+        try:
+            return self.buy_ship(option.ship_type, option.shipyard)
+        except Exception as e:
+            print(e)
+            return None
 
     def get_market(self, waypoint_symbol:str) -> Market|None:
         """ Get all the market info """
@@ -265,6 +601,7 @@ class Hero:
         raw = self.api.get_auth(f"systems/{system}/waypoints/{waypoint_symbol}/market")["data"]
         market:Market = Market()
         market.parse_market(raw)
+        self.events.publish(MarketUpdated(market))
         if self.debug:
             print("Get Market")
             print(market)
@@ -285,8 +622,119 @@ class Hero:
         if self.debug:
             print(f"Buy Ship, type:{ship_type}, symbol: {symbol}")
             print(raw_purchase)
+        # the purchase comes with the whole ship, no need to refresh the fleet
+        ship:Ship = Ship(self.api, raw_purchase["ship"], self.events)
+        self.ships_by_symbol[ship.symbol] = ship
+        self.events.publish(ShipAdded(ship.symbol, ship))
+        if self.agent is not None and "agent" in raw_purchase:
+            self.agent.credits = raw_purchase["agent"]["credits"]
+        self.assign_ship(ship.symbol, ship_type)
         return raw_purchase
 
+    def assign_fleet(self) -> dict[str, str]:
+        """ Put every ship to work following the ship rules, returns ship -> strategy """
+        return {ship.symbol: self.assign_ship(ship.symbol) for ship in self.get_my_ships()}
+
+    def take_ship(self, ship_name:str) -> str:
+        """ Start running one ship, fetched on its own, returns the strategy """
+        resp = self.api.get_auth(f"my/ships/{ship_name}")
+        if "data" not in resp:
+            print(resp.get("error", resp))
+            return ShipRules.IDLE
+        matching:Ship|None = self._find_ship_by_name(ship_name)
+        if matching is None:
+            matching = Ship(self.api, resp["data"], self.events)
+            self.ships_by_symbol[ship_name] = matching
+            self.events.publish(ShipAdded(ship_name, matching))
+        else:
+            matching.update(resp["data"])
+        return self.assign_ship(ship_name)
+
+    def release_ship(self, ship_name:str) -> bool:
+        """ Stop running a ship and forget it, timers still pending for it find nothing to do """
+        self.stop_mining(ship_name)
+        self.routes.pop(ship_name, None)
+        for key in [k for k in self.timer_by_ship_event if k[0] == ship_name]:
+            self.timers.cancel(self.timer_by_ship_event.pop(key))
+        if self.ships_by_symbol.pop(ship_name, None) is None:
+            return False
+        self.events.publish(ShipRemoved(ship_name))
+        return True
+
+    def start_fleet_loop(self, poll:float=1.0) -> Thread:
+        """
+        Fire the timers from a background thread, so assigned ships keep
+        working while nothing else drives the timers, like a menu waiting on
+        the user. Anything else using the hero meanwhile holds self.lock.
+        """
+        if self._fleet_thread is None or not self._fleet_thread.is_alive():
+            self._fleet_stop.clear()
+            self._fleet_thread = Thread(target=self._fleet_loop, args=(poll,), name=f"fleet-{self.callsign}", daemon=True)
+            self._fleet_thread.start()
+        return self._fleet_thread
+
+    def stop_fleet_loop(self) -> None:
+        self._fleet_stop.set()
+        if self._fleet_thread is not None:
+            self._fleet_thread.join()
+            self._fleet_thread = None
+
+    def share_caches(self, other:Hero) -> None:
+        """
+        Use the universe, markets, shipyards and galaxy of another agent,
+        what one agent learns about the world the others know at once.
+        Fleets, contracts and extraction logs stay each agent's own.
+        """
+        self.universe = other.universe
+        self.markets = other.markets
+        self.shipyards = other.shipyards
+        self.galaxy = other.galaxy
+        self.galaxy_search = other.galaxy_search
+        self.detailed_systems = other.detailed_systems
+        self.navigator.universe = other.universe
+        self.navigator.graph = other.navigator.graph
+        self.cargo_policy.markets = other.markets
+        self.cargo_policy.universe = other.universe
+        self.transfers.markets = other.markets
+        self.contract_planner.markets = other.markets
+        self.purchase_optimizer.shipyards = other.shipyards
+        self.purchase_optimizer.markets = other.markets
+
+    def assign_ship(self, ship_name:str, ship_type:str="") -> str:
+        """ Put a ship to work following the ship rules, returns the strategy """
+        matching = self._find_ship_by_name(ship_name)
+        if matching is None:
+            return ShipRules.IDLE
+        strategy:str = self.ship_rules.strategy_for(matching, ship_type)
+        if self.debug:
+            print(f"{ship_name} assigned to {strategy}")
+        match strategy:
+            case ShipRules.MINE:
+                self.start_mining(ship_name)
+            case ShipRules.IDLE:
+                pass
+            case _:
+                print(f"Unknown strategy {strategy} for {ship_name}")
+        return strategy
+
+    def start_mining(self, ship_name:str) -> None:
+        """
+        Fly to the best asteroid of the system and keep mining there,
+        progressing whenever the timers run.
+        """
+        matching = self._find_ship_by_name(ship_name)
+        if matching is None:
+            return
+        asteroid:str|None = self._best_asteroid(matching)
+        if asteroid is None:
+            print(f"No asteroid known in {matching.nav.system} for {ship_name}")
+            return
+        self.auto_mining.add(ship_name)
+        self._fly_or_arrive(matching, asteroid)
+
+    def stop_mining(self, ship_name:str) -> None:
+        self.auto_mining.discard(ship_name)
+
     def orbit(self, name:str) -> None:
         """ orbit the ship with the matching name """
         matching = self._find_ship_by_name(name)
@@ -319,13 +767,31 @@ class Hero:
                 print("Refuel")
             matching.refuel()
 
-    def mine(self, ship_name:str) -> None:
-        """ Mine ship """
+    def mine(self, ship_name:str) -> dict|None:
+        """ Mine ship, using the most valuable survey we have for where it is """
         matching = self._find_ship_by_name(ship_name)
         if matching is not None:
+            survey:Survey|None = self.best_survey(matching.nav.waypoint.waypoint)
             if self.debug:
-                print("Mine")
-            matching.mine()
+                print(f"Mine, survey: {survey}")
+            return matching.mine(survey)
+        return None
+
+    def survey(self, ship_name:str) -> list[Survey]:
+        """ Survey where the ship is, results are shared with the whole fleet """
+        matching = self._find_ship_by_name(ship_name)
+        if matching is not None:
+            if self.debug:
+                print("Survey")
+            return matching.survey()
+        return []
+
+    def best_survey(self, waypoint_symbol:str) -> Survey|None:
+        """ Cached survey of the waypoint with the highest expected sell value for the deposits we want """
+        return self.surveys.best(waypoint_symbol,
+                                 self.markets.best_sell_prices(),
+                                 self.api.clock.now(),
+                                 self.wanted_deposits or None)
 
     def get_cargo(self, ship_name:str) -> ShipCargo|None:
         """ Get cargo on ship """
@@ -359,6 +825,41 @@ class Hero:
             return matching.cargo_is_full()
         return False
 
+    def seconds_until_ready(self, ship_name:str) -> float:
+        """ Seconds until the ship is off cooldown, against server time """
+        matching = self._find_ship_by_name(ship_name)
+        if matching is not None:
+            return matching.seconds_until_ready()
+        return 0.0
+
+    def contract_needs(self) -> dict[str, int]:
+        """ Units of each good still to deliver for accepted contracts """
+        needs:dict[str, int] = {}
+        for c in self.contracts:
+            if c.accepted and not c.fulfilled:
+                for d in c.terms.deliveries:
+                    needs[d.trade] = needs.get(d.trade, 0) + max(d.units_required - d.units_fulfilled, 0)
+        return needs
+
+    def decide_cargo(self, ship_name:str) -> list[CargoDecision]:
+        """ What to keep, haul and jettison from the ship's hold, decided locally """
+        matching = self._find_ship_by_name(ship_name)
+        if matching is None:
+            return []
+        return self.cargo_policy.decide(matching, self.contract_needs())
+
+    def apply_cargo_policy(self, ship_name:str) -> int:
+        """ Jettison what the cargo policy says is junk, returns how many units were freed """
+        matching = self._find_ship_by_name(ship_name)
+        freed:int = 0
+        for decision in self.decide_cargo(ship_name):
+            if decision.action == CargoAction.JETTISON:
+                if self.debug:
+                    print(f"Jettison {decision.units} {decision.symbol} from {ship_name}, worth {decision.value_per_unit:.1f} per unit")
+                matching.dump_cargo(decision.symbol, decision.units)
+                freed += decision.units
+        return freed
+
     def sell_all_cargo_for_ships(self, ship_names:list[str], goods_to_keep:list[str]) -> None:
         """ Sell all cargo for ships """
         for s in ship_names:
@@ -367,36 +868,453 @@ class Hero:
         self.get_my_ships()  # refresh ship data
 
     def send_ships_to_mine(self, ship_names:list[str]) -> None:
-        """ Send all ships to mine """
-        ship_name_to_done:dict[str, bool] = {}
+        """ Send all ships to mine, each extracts again the moment its cooldown ends """
+        mining:set[str] = set(ship_names)
+
+        def on_cooldown_ended(event:CooldownEnded) -> None:
+            if event.ship_symbol in mining:
+                self._mine_until_full(event.ship_symbol)
+
+        def on_cargo_full(event:CargoFull) -> None:
+            # make room by dropping junk, stop once only worthwhile cargo is left
+            if event.ship_symbol in mining and self.apply_cargo_policy(event.ship_symbol) == 0:
+                mining.discard(event.ship_symbol)
+
+        unsubscribes = [self.events.subscribe(CooldownEnded, on_cooldown_ended),
+                        self.events.subscribe(CargoFull, on_cargo_full),
+                        self.events.subscribe(MiningStopped, lambda e: mining.discard(e.ship_symbol))]
         for s in ship_names:
             self.orbit(s)
-            ship_name_to_done[s] = False
+            if self.cargo_is_full(s) and self.apply_cargo_policy(s) == 0:
+                mining.discard(s)
+            else:
+                self._schedule_mine(s)
+        self.timers.run(lambda: len(mining) == 0)
+        for unsubscribe in unsubscribes:
+            unsubscribe()
+        self.get_my_ships()  # refresh ship data
 
-        done:bool = False
-        while not done:
-            done = True
-            for s in ship_names:
-                # not done yet
-                if self.debug:
-                    print(f"{s} done?: {ship_name_to_done[s]}")
-                if not ship_name_to_done[s]:
-                    if self.debug:
-                        print(f"{s} full?: {self.cargo_is_full(s)}")
-                    if self.cargo_is_full(s):
-                        # full, we are done
-                        ship_name_to_done[s] = True
-                    else:
-                        done = False  # must wait for this mine to finish
-                        self.mine(s)
+    def mine_with_haulers(self, miner_names:list[str], hauler_names:list[str]) -> None:
+        """
+        Miners hand their cargo to haulers waiting at the same waypoint and
+        go straight back to extracting, haulers sell at the best market once
+        full and come back. Runs until interrupted.
+        """
+        mining:set[str] = set(miner_names)
+        haulers:set[str] = set(hauler_names)
+        waiting:set[str] = set()            # full miners with no hauler around
+        selling:dict[str, str] = {}         # hauler -> market it is flying to
+        home:dict[str, str] = {}            # hauler -> waypoint it collects at
+        self.transfers.haulers |= haulers
+
+        def offload(miner_name:str) -> bool:
+            """ True once the miner has room again """
+            miner:Ship|None = self._find_ship_by_name(miner_name)
+            if miner is None:
+                return False
+            self.apply_cargo_policy(miner_name)
+            if miner.cargo_is_full():
+                self.transfers.offload(miner, self.contract_needs())
+            return not miner.cargo_is_full()
+
+        def on_cargo_full(event:CargoFull) -> None:
+            if event.ship_symbol in mining:
+                if not offload(event.ship_symbol):
+                    waiting.add(event.ship_symbol)
+            elif event.ship_symbol in haulers and event.ship_symbol not in selling:
+                self._haul_to_market(event.ship_symbol, selling)
+
+        def on_cooldown_ended(event:CooldownEnded) -> None:
+            if event.ship_symbol in mining and event.ship_symbol not in waiting:
+                self._mine_until_full(event.ship_symbol)
+
+        def on_ship_arrived(event:ShipArrived) -> None:
+            if selling.get(event.ship_symbol, None) == event.waypoint:
+                del selling[event.ship_symbol]
+                self._sell_and_return(event.ship_symbol, home[event.ship_symbol])
+            elif event.ship_symbol in haulers and home.get(event.ship_symbol, None) == event.waypoint:
+                for miner_name in list(waiting):
+                    if offload(miner_name):
+                        waiting.discard(miner_name)
+                        self._schedule_mine(miner_name)
+
+        unsubscribes = [self.events.subscribe(CargoFull, on_cargo_full),
+                        self.events.subscribe(CooldownEnded, on_cooldown_ended),
+                        self.events.subscribe(ShipArrived, on_ship_arrived),
+                        self.events.subscribe(MiningStopped, lambda e: mining.discard(e.ship_symbol))]
+        try:
+            for h in hauler_names:
+                self.orbit(h)
+                hauler:Ship|None = self._find_ship_by_name(h)
+                if hauler is not None:
+                    home[h] = hauler.nav.waypoint.waypoint
+            for s in miner_names:
+                self.orbit(s)
+                if self.cargo_is_full(s) and not offload(s):
+                    waiting.add(s)
                 else:
-                    if self.debug:
-                        print(f"{s} is done")
-            if not done:
-                sleep(100)
-            self.get_my_ships()  # refresh ship data
+                    self._schedule_mine(s)
+            self.timers.run()
+        finally:
+            for unsubscribe in unsubscribes:
+                unsubscribe()
+            self.transfers.haulers -= haulers
+
+    def run_contracts(self, ship_names:list[str]) -> None:
+        """
+        Mine for contracts, serving deliveries earliest deadline first across
+        the ships. A ship leaves its asteroid once it holds all the most
+        urgent delivery still needs or its hold is full, delivers, fulfills
+        the contract once everything is in, negotiates the next one and flies
+        back to mine. Runs until interrupted.
+        """
+        ships:set[str] = set(ship_names)
+        home:dict[str, str] = {}
+        away:set[str] = set()  # ships out delivering or on their way back
+
+        def refresh_tasks() -> None:
+            self.contract_scheduler.refresh(self.contracts, self.api.clock.now())
+            # surveys go after what the contracts need
+            self.wanted_deposits = self.contract_scheduler.wanted()
+
+        def dispatch(ship_name:str) -> bool:
+            """ True if the ship left to deliver """
+            matching:Ship|None = self._find_ship_by_name(ship_name)
+            if matching is None:
+                return False
+            task:ContractTask|None = self.contract_scheduler.take(matching)
+            if task is None:
+                return False
+            if self.debug:
+                print(f"{ship_name} delivering {task.trade} to {task.destination} for {task.contract_id}")
+            away.add(ship_name)
+            self._fly_or_arrive(matching, task.destination)
+            return True
+
+        def on_cooldown_ended(event:CooldownEnded) -> None:
+            if event.ship_symbol in ships and event.ship_symbol not in away and not dispatch(event.ship_symbol):
+                self._mine_until_full(event.ship_symbol)
+
+        def on_cargo_full(event:CargoFull) -> None:
+            if event.ship_symbol in ships and event.ship_symbol not in away and not dispatch(event.ship_symbol):
+                if self.apply_cargo_policy(event.ship_symbol) == 0:
+                    print(f"{event.ship_symbol} is full of cargo no contract needs")
+
+        def on_ship_arrived(event:ShipArrived) -> None:
+            if event.ship_symbol not in ships or event.ship_symbol not in away:
+                return
+            assignment:tuple[ContractTask, int]|None = self.contract_scheduler.assignment(event.ship_symbol)
+            if assignment is not None and assignment[0].destination == event.waypoint:
+                self._deliver_for_contract(event.ship_symbol, assignment[0], assignment[1])
+                refresh_tasks()
+                if not dispatch(event.ship_symbol):
+                    matching:Ship|None = self._find_ship_by_name(event.ship_symbol)
+                    if matching is not None:
+                        self._fly_or_arrive(matching, home[event.ship_symbol])
+            elif home.get(event.ship_symbol, None) == event.waypoint:
+                away.discard(event.ship_symbol)
+                self._schedule_mine(event.ship_symbol)
+
+        unsubscribes = [self.events.subscribe(CooldownEnded, on_cooldown_ended),
+                        self.events.subscribe(CargoFull, on_cargo_full),
+                        self.events.subscribe(ShipArrived, on_ship_arrived),
+                        self.events.subscribe(MiningStopped, lambda e: ships.discard(e.ship_symbol))]
+        try:
+            self.get_contracts()
+            refresh_tasks()
+            for s in ship_names:
+                matching:Ship|None = self._find_ship_by_name(s)
+                if matching is None:
+                    continue
+                home[s] = matching.nav.waypoint.waypoint
+                self.orbit(s)
+                if not dispatch(s):
+                    self._schedule_mine(s)
+            self.timers.run()
+        finally:
+            for unsubscribe in unsubscribes:
+                unsubscribe()
+            self.wanted_deposits = set()
 
     ## Helpers
+    def _fleet_loop(self, poll:float) -> None:
+        """ Sleep until the next timer is due, at most poll, then fire what is due """
+        while True:
+            with self.lock:
+                deadline:float|None = self.timers.next_deadline()
+            wait:float = poll if deadline is None else min(max(deadline - self.timers.clock(), 0.0), poll)
+            if self._fleet_stop.wait(wait):
+                return
+            with self.lock:
+                try:
+                    self.timers.advance()
+                except Exception as e:
+                    # one ship going wrong should not stop the others
+                    print(e)
+
+    def _galaxy_position(self, system_symbol:str) -> tuple[int, int]|None:
+        if self.galaxy_search is None:
+            print("No galaxy snapshot yet, crawl or import the galaxy first")
+            return None
+        position:tuple[int, int]|None = self.galaxy_search.coordinates(system_symbol)
+        if position is None:
+            print(f"{system_symbol} is not in the galaxy snapshot")
+        return position
+
+    def _fly_or_arrive(self, ship:Ship, destination:str) -> None:
+        """ Fly somewhere, or say we arrived if already there """
+        ship.orbit()
+        if ship.nav.waypoint.waypoint == destination:
+            self.events.publish(ShipArrived(ship.symbol, destination))
+        elif ship.nav.system != system_of(destination):
+            self.travel(ship.symbol, destination)
+        else:
+            ship.fly(destination)
+
+    def _next_leg(self, ship_name:str) -> None:
+        """ Start the next leg of a ship's route """
+        legs:list[RouteLeg] = self.routes.get(ship_name, [])
+        matching = self._find_ship_by_name(ship_name)
+        if len(legs) == 0 or matching is None:
+            self.routes.pop(ship_name, None)
+            return
+        leg:RouteLeg = legs[0]
+        matching.orbit()
+        match leg.kind:
+            case LegKind.NAVIGATE:
+                started:bool = matching.fly(leg.destination) is not None
+            case LegKind.WARP:
+                started = matching.warp(leg.destination) is not None
+            case LegKind.JUMP:
+                wait:float = self.seconds_until_ready(ship_name)
+                if wait > 0:
+                    self.timers.schedule(wait, self._next_leg, ship_name)
+                    return
+                started = matching.jump(leg.destination) is not None
+                if started:
+                    # jumps are instant
+                    self.events.publish(ShipArrived(ship_name, leg.destination))
+        if not started:
+            print(f"{ship_name} stopped at {matching.nav.waypoint.waypoint} on its way to {legs[-1].destination}")
+            self.routes.pop(ship_name, None)
+
+    def _on_route_arrived(self, event:ShipArrived) -> None:
+        legs:list[RouteLeg] = self.routes.get(event.ship_symbol, [])
+        if len(legs) > 0 and legs[0].destination == event.waypoint:
+            legs.pop(0)
+            self._next_leg(event.ship_symbol)
+
+    def _deliver_for_contract(self, ship_name:str, task:ContractTask, units:int) -> None:
+        """ Deliver a tranche, fulfill the contract when complete and line up the next one """
+        matching:Ship|None = self._find_ship_by_name(ship_name)
+        if matching is None:
+            self.contract_scheduler.release(ship_name, 0)
+            return
+        held:int = sum(i.units for i in matching.cargo.inventory if i.symbol == task.trade)
+        delivered:int = 0
+        matching.dock()
+        try:
+            matching.deliver(task.contract_id, task.trade, min(units, held))
+            delivered = min(units, held)
+        except Exception as e:
+            print(e)
+        self.contract_scheduler.release(ship_name, delivered)
+
+        contract:Contract|None = self.get_contract_by_id(task.contract_id)
+        if contract is None or contract.fulfilled or not contract.is_complete():
+            return
+        if self.fulfill_contract(contract.id) is None:
+            return
+        negotiated:Contract|None = matching.negotiate_contract()
+        if negotiated is not None and len(self.contract_planner.worthwhile([negotiated], self.api.clock.now())) > 0:
+            self.accept_contract(negotiated.id)
+
+    def _best_asteroid(self, ship:Ship) -> str|None:
+        """ Asteroid of the ship's system making the most per hour, the closest when we don't know yet """
+        asteroid_types:set[str] = {"ASTEROID", "ASTEROID_FIELD", "ENGINEERED_ASTEROID"}
+        system:str = ship.nav.system
+        asteroids:list[Waypoint] = self.universe.find(TraitQuery(types=list(asteroid_types), system=system))
+        if len(asteroids) == 0:
+            waypoints:list[Waypoint] = list(map(lambda w: Waypoint(w), self._get_all_pages(f"systems/{system}/waypoints")))
+            self.universe.add_waypoints(waypoints)
+            asteroids = [w for w in waypoints if w.type in asteroid_types]
+        if len(asteroids) == 0:
+            return None
+        rates:dict[object, ExtractionRate] = self.extractions.rates_by_waypoint()
+        best:Waypoint = max(asteroids, key=lambda w: (rates[w.waypoint].credits_per_hour() if w.waypoint in rates else 0.0,
+                                                      -self.navigator.travel_time(ship, ship.nav.waypoint.waypoint, w.waypoint)))
+        return best.waypoint
+
+    def _on_auto_mining_arrived(self, event:ShipArrived) -> None:
+        if event.ship_symbol in self.auto_mining:
+            self._schedule_mine(event.ship_symbol)
+
+    def _on_auto_mining_cooldown_ended(self, event:CooldownEnded) -> None:
+        if event.ship_symbol in self.auto_mining:
+            self._mine_until_full(event.ship_symbol)
+
+    def _on_auto_mining_cargo_full(self, event:CargoFull) -> None:
+        # make room by dropping junk, stop once only worthwhile cargo is left
+        if event.ship_symbol in self.auto_mining and self.apply_cargo_policy(event.ship_symbol) == 0:
+            print(f"{event.ship_symbol} is full, stopped mining")
+            self.auto_mining.discard(event.ship_symbol)
+
+    def _on_contract_changed(self, event:ContractChanged) -> None:
+        """ Keep our contracts in line with what the server last told us """
+        for i, c in enumerate(self.contracts):
+            if c.id == event.contract.id:
+                self.contracts[i] = event.contract
+                return
+        self.contracts.append(event.contract)
+
+    def _haul_to_market(self, hauler_name:str, selling:dict[str, str]) -> None:
+        """ Send a full hauler to the market paying the most for its hold """
+        hauler:Ship|None = self._find_ship_by_name(hauler_name)
+        if hauler is None:
+            return
+        market:str|None = self.transfers.best_market(hauler, self.contract_needs())
+        if market is None:
+            print(f"No known market for the cargo of {hauler_name}")
+            return
+        if self.debug:
+            print(f"{hauler_name} hauling to {market}")
+        selling[hauler_name] = market
+        self._fly_or_arrive(hauler, market)
+
+    def _sell_and_return(self, hauler_name:str, home:str) -> None:
+        """ Sell the hold apart from contract goods, refuel and fly back """
+        hauler:Ship|None = self._find_ship_by_name(hauler_name)
+        if hauler is None:
+            return
+        hauler.dock()
+        market:Market = hauler.get_market()
+        volumes:dict[str, int] = {g.symbol: g.volume for g in market.trade_goods}
+        needs:dict[str, int] = self.contract_needs()
+        for item in list(hauler.cargo.inventory):
+            units:int = item.units - needs.get(item.symbol, 0)
+            while units > 0:
+                # markets only take so much per transaction
+                batch:int = min(units, volumes.get(item.symbol, units))
+                try:
+                    hauler.sell_cargo(item.symbol, batch)
+                except Exception as e:
+                    print(e)
+                    break
+                units -= batch
+        if hauler.fuel.current < hauler.fuel.capacity:
+            try:
+                hauler.refuel()
+            except Exception as e:
+                print(e)
+        self._fly_or_arrive(hauler, home)
+
+    def _get_all_pages(self, path:str, limit:int=20) -> list[dict]:
+        """ Get every page of a paginated listing """
+        items:list[dict] = []
+        page:int = 1
+        while True:
+            separator:str = "&" if "?" in path else "?"
+            resp = self.api.get_auth(f"{path}{separator}page={page}&limit={limit}")
+            data:list[dict] = resp["data"]
+            items.extend(data)
+            total:int = resp.get("meta", {}).get("total", 0)
+            if len(data) < limit or len(items) >= total:
+                return items
+            page += 1
+
     def _find_ship_by_name(self, name:str) -> Ship|None:
         return self.ships_by_symbol.get(name, None)
 
+    def _schedule_mine(self, ship_name:str, min_delay:float=0.0) -> None:
+        """ Mine again once the ship is off cooldown """
+        delay:float = max(self.seconds_until_ready(ship_name), min_delay)
+        self.timers.schedule(delay, self._mine_until_full, ship_name)
+
+    def _mine_until_full(self, ship_name:str) -> None:
+        matching = self._find_ship_by_name(ship_name)
+        if matching is None:
+            return
+        if self.debug:
+            print(f"{ship_name} full?: {matching.cargo_is_full()}")
+        if matching.cargo_is_full():
+            if self.debug:
+                print(f"{ship_name} is done")
+            return
+        if matching.has_surveyor():
+            self.surveys.evict_expired(self.api.clock.now())
+            if len(self.surveys.for_waypoint(matching.nav.waypoint.waypoint, self.wanted_deposits or None)) == 0:
+                # nothing good to extract with, a survey first pays for its cooldown
+                if len(self.survey(ship_name)) > 0:
+                    return
+        if self.mine(ship_name) is not None:
+            # the new cooldown ends with a CooldownEnded event
+            self.mining_failures.pop(ship_name, None)
+            return
+        error:dict = matching.last_error or {}
+        if error.get("code", 0) == Ship.COOLDOWN_ERROR and matching.seconds_until_ready() > 0:
+            # the error told the ship its cooldown, CooldownEnded brings it back
+            return
+        if error.get("code", 0) in (4221, 4224):
+            # the survey went stale and was dropped, try again with another one
+            self._schedule_mine(ship_name)
+            return
+        failures:int = self.mining_failures.get(ship_name, 0) + 1
+        if failures > self.max_mining_retries:
+            self.mining_failures.pop(ship_name, None)
+            print(f"{ship_name} stopped mining: {error.get('message', 'extraction failed')}")
+            self.events.publish(MiningStopped(ship_name, error.get("message", "")))
+            return
+        self.mining_failures[ship_name] = failures
+        try:
+            # resync with the server, something about the ship is not what we think
+            matching.refresh()
+        except Exception as e:
+            print(e)
+        self._schedule_mine(ship_name, 2.0 ** failures)
+
+    def _schedule_ship_event(self, ship_symbol:str, delay:float, event:object) -> None:
+        """ Publish the event after delay, replacing the same kind of event already pending for the ship """
+        key:tuple[str, type] = (ship_symbol, type(event))
+        pending:Timer|None = self.timer_by_ship_event.pop(key, None)
+        if pending is not None:
+            self.timers.cancel(pending)
+
+        def fire() -> None:
+            self.timer_by_ship_event.pop(key, None)
+            self.events.publish(event)
+        self.timer_by_ship_event[key] = self.timers.schedule(delay, fire)
+
+    def _on_ship_departed(self, event:ShipDeparted) -> None:
+        self._schedule_ship_event(event.ship_symbol,
+                                  self.api.clock.seconds_until(event.arrival_at),
+                                  ShipArrived(event.ship_symbol, event.destination))
+
+    def _on_ship_arrived(self, event:ShipArrived) -> None:
+        # the server puts ships in orbit on arrival, mirror it without asking
+        matching = self._find_ship_by_name(event.ship_symbol)
+        if matching is not None and matching.nav.status == "IN_TRANSIT":
+            matching.arrive()
+
+    def _on_extraction_completed(self, event:ExtractionCompleted) -> None:
+        matching = self._find_ship_by_name(event.ship_symbol)
+        if matching is None:
+            return
+        units:int = int(event.extraction.yield_units)
+        price:int = self.markets.best_sell_prices().get(event.extraction.yield_symbol, 0)
+        self.extractions.record(ExtractionRecord(
+                matching.symbol,
+                matching.nav.waypoint.waypoint,
+                matching.frame.symbol,
+                list(map(lambda m: m.symbol, matching.mounts)),
+                matching.mining_strength(),
+                event.survey,
+                event.extraction.yield_symbol,
+                units,
+                event.cooldown.total_seconds if event.cooldown is not None else 0,
+                units * price,
+                self.api.clock.now()))
+
+    def _on_cooldown_started(self, event:CooldownStarted) -> None:
+        self._schedule_ship_event(event.ship_symbol,
+                                  self.api.clock.seconds_until(event.cooldown.expiration),
+                                  CooldownEnded(event.ship_symbol))
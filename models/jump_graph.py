@@ -0,0 +1,192 @@
+from dataclasses import dataclass
+from enum import Enum
+from heapq import heappush, heappop
+from math import dist
+
+class LegKind(Enum):
+    NAVIGATE = 1  # fly within a system
+    JUMP = 2      # jump gate to jump gate
+    WARP = 3      # warp drive, straight to another system
+
+@dataclass
+class RouteLeg:
+    """ One step of a route, between two waypoints """
+    kind:LegKind
+    origin:str
+    destination:str
+    seconds:int
+
+def system_of(waypoint_symbol:str) -> str:
+    return "-".join(waypoint_symbol.split("-")[0:2])
+
+def jump_cooldown(distance:float) -> int:
+    """ Rough reactor cooldown after a jump, the server tells the real one after jumping """
+    return max(60, round(distance))
+
+def warp_time(distance:float, speed:int) -> int:
+    """ Seconds to warp distance between systems in cruise mode """
+    return round(round(max(1, distance)) * (50 / max(speed, 1)) + 15)
+
+class JumpGraph:
+    """
+    Systems linked by their jump gates, edges weighted by the jump cooldown.
+    Shortest paths are A* with ALT: distances from a few landmarks spread
+    across the graph give, by the triangle inequality, a lower bound to any
+    target that is much tighter than nothing. Warp legs, when the ship can
+    warp, link any two systems in fuel range; those are not covered by the
+    landmarks so routes allowing warps fall back to plain Dijkstra.
+    """
+    def __init__(self, landmark_count:int=8) -> None:
+        self.coordinates:dict[str, tuple[int, int]] = {}  # system -> x, y
+        self.gates:dict[str, str] = {}                    # system -> its jump gate waypoint
+        self.landings:dict[str, str] = {}                 # system -> a waypoint to warp to when its gate is unknown
+        self.edges:dict[str, dict[str, int]] = {}         # system -> connected system -> seconds
+        self.landmark_count:int = landmark_count
+        self.landmarks:list[dict[str, int]] = []
+        # warp_range -> system -> systems in range and their distance, found through a grid of warp_range cells
+        self.warp_neighbours:dict[float, dict[str, list[tuple[str, float]]]] = {}
+        self._warp_grids:dict[float, dict[tuple[int, int], list[str]]] = {}
+
+    def __str__(self) -> str:
+        return f"JumpGraph(systems: {len(self.coordinates)}, gates: {len(self.gates)}, landmarks: {len(self.landmarks)})"
+
+    def add_system(self, symbol:str, x:int, y:int, landing:str|None=None) -> None:
+        if self.coordinates.get(symbol, None) != (x, y):
+            self.warp_neighbours.clear()
+            self._warp_grids.clear()
+        self.coordinates[symbol] = (x, y)
+        if landing is not None:
+            self.landings.setdefault(symbol, landing)
+
+    def landing(self, system:str) -> str|None:
+        """ Waypoint a warp into the system arrives at, its gate so the route can carry on by jumping """
+        return self.gates.get(system, self.landings.get(system, None))
+
+    def add_jump_gate(self, gate:str, connections:list[str]) -> None:
+        """ A gate and the gates it connects to, jumps go both ways """
+        system:str = system_of(gate)
+        self.gates[system] = gate
+        for other_gate in connections:
+            other:str = system_of(other_gate)
+            self.gates.setdefault(other, other_gate)
+            seconds:int = jump_cooldown(self.distance(system, other))
+            self.edges.setdefault(system, {})[other] = seconds
+            self.edges.setdefault(other, {})[system] = seconds
+        self.landmarks = []  # stale, rebuilt on the next query
+
+    def distance(self, from_system:str, to_system:str) -> float:
+        start:tuple[int, int]|None = self.coordinates.get(from_system, None)
+        end:tuple[int, int]|None = self.coordinates.get(to_system, None)
+        if start is None or end is None:
+            return 0.0
+        return dist(start, end)
+
+    def prepare(self) -> None:
+        """ Pick landmarks far from each other and remember every distance from them """
+        self.landmarks = []
+        if len(self.edges) == 0:
+            return
+        # start from the system farthest from an arbitrary one, then keep taking
+        # the one farthest from every landmark so far
+        distances:dict[str, int] = self._dijkstra(next(iter(self.edges)))
+        closest:dict[str, int] = {}
+        for _ in range(min(self.landmark_count, len(self.edges))):
+            candidates:dict[str, int] = closest if len(closest) > 0 else distances
+            landmark:str = max(candidates, key=candidates.get)
+            from_landmark:dict[str, int] = self._dijkstra(landmark)
+            self.landmarks.append(from_landmark)
+            for system, d in from_landmark.items():
+                closest[system] = min(closest.get(system, d), d)
+
+    def heuristic(self, system:str, target:str) -> int:
+        """ Lower bound of the jump seconds from system to target """
+        best:int = 0
+        for distances in self.landmarks:
+            to_target:int|None = distances.get(target, None)
+            to_system:int|None = distances.get(system, None)
+            if to_target is not None and to_system is not None:
+                best = max(best, abs(to_target - to_system))
+        return best
+
+    def shortest_path(self, source:str, target:str, warp_range:float=0.0, speed:int=1) -> tuple[int, list[tuple[str, LegKind]]]|None:
+        """ Seconds and the systems to go through with how to get to each, None if unreachable """
+        if source == target:
+            return (0, [])
+        if warp_range <= 0 and len(self.landmarks) == 0:
+            self.prepare()
+        use_landmarks:bool = warp_range <= 0
+        best:dict[str, int] = {source: 0}
+        previous:dict[str, tuple[str, LegKind]] = {}
+        queue:list[tuple[int, int, str]] = [(self.heuristic(source, target) if use_landmarks else 0, 0, source)]
+        while queue:
+            _, seconds, system = heappop(queue)
+            if system == target:
+                return (seconds, self._path(previous, source, target))
+            if seconds > best.get(system, seconds):
+                continue
+            for neighbour, cost, kind in self._neighbours(system, target, warp_range, speed):
+                total:int = seconds + cost
+                if total < best.get(neighbour, total + 1):
+                    best[neighbour] = total
+                    previous[neighbour] = (system, kind)
+                    estimate:int = total + (self.heuristic(neighbour, target) if use_landmarks else 0)
+                    heappush(queue, (estimate, total, neighbour))
+        return None
+
+    # Helper Methods
+
+    def _neighbours(self, system:str, target:str, warp_range:float, speed:int) -> list[tuple[str, int, LegKind]]:
+        neighbours:list[tuple[str, int, LegKind]] = [(s, c, LegKind.JUMP) for s, c in self.edges.get(system, {}).items()]
+        if warp_range > 0 and system in self.coordinates:
+            # passing through takes a waypoint to warp to, the target has the destination
+            neighbours.extend((other, warp_time(d, speed), LegKind.WARP) for other, d in self._in_warp_range(system, warp_range)
+                              if other == target or self.landing(other) is not None)
+        return neighbours
+
+    def _in_warp_range(self, system:str, warp_range:float) -> list[tuple[str, float]]:
+        """ Systems within warp_range, only the 3 x 3 grid cells around the system can hold any """
+        cached:dict[str, list[tuple[str, float]]] = self.warp_neighbours.setdefault(warp_range, {})
+        if system in cached:
+            return cached[system]
+        grid:dict[tuple[int, int], list[str]]|None = self._warp_grids.get(warp_range, None)
+        if grid is None:
+            grid = {}
+            for other, (x, y) in self.coordinates.items():
+                grid.setdefault((int(x // warp_range), int(y // warp_range)), []).append(other)
+            self._warp_grids[warp_range] = grid
+        origin:tuple[int, int] = self.coordinates[system]
+        cell_x, cell_y = int(origin[0] // warp_range), int(origin[1] // warp_range)
+        found:list[tuple[str, float]] = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other in grid.get((cell_x + dx, cell_y + dy), []):
+                    d:float = dist(origin, self.coordinates[other])
+                    if other != system and d <= warp_range:
+                        found.append((other, d))
+        cached[system] = found
+        return found
+
+    def _dijkstra(self, source:str) -> dict[str, int]:
+        """ Jump seconds from source to every system it can reach """
+        distances:dict[str, int] = {source: 0}
+        queue:list[tuple[int, str]] = [(0, source)]
+        while queue:
+            seconds, system = heappop(queue)
+            if seconds > distances[system]:
+                continue
+            for neighbour, cost in self.edges.get(system, {}).items():
+                total:int = seconds + cost
+                if total < distances.get(neighbour, total + 1):
+                    distances[neighbour] = total
+                    heappush(queue, (total, neighbour))
+        return distances
+
+    def _path(self, previous:dict[str, tuple[str, LegKind]], source:str, target:str) -> list[tuple[str, LegKind]]:
+        path:list[tuple[str, LegKind]] = []
+        system:str = target
+        while system != source:
+            before, kind = previous[system]
+            path.append((system, kind))
+            system = before
+        path.reverse()
+        return path
@@ -6,6 +6,12 @@ class Location:
         self.system:str = f"{data[0]}-{data[1]}"
         self.waypoint:str = coordinate
 
+    def __eq__(self, other:object) -> bool:
+        return isinstance(other, Location) and self.waypoint == other.waypoint
+
+    def __hash__(self) -> int:
+        return hash(self.waypoint)
+
     def __str__(self) -> str:
         return f"Location(sector: {self.sector}, system: {self.system}, waypoint: {self.waypoint})"
 
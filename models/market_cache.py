@@ -0,0 +1,60 @@
+from datetime import datetime as dt
+from models.ship import Market, TradeGood
+
+class MarketCache:
+    """ Last seen state of every market, with the best prices per good kept up to date """
+    def __init__(self) -> None:
+        self.markets_by_symbol:dict[str, Market] = {}
+        self.updated_at_by_symbol:dict[str, dt] = {}
+        self.sell_prices_by_good:dict[str, dict[str, int]] = {}      # good -> waypoint -> what they pay us
+        self.purchase_prices_by_good:dict[str, dict[str, int]] = {}  # good -> waypoint -> what we pay them
+        self.best_sell_price_by_good:dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.markets_by_symbol)
+
+    def __str__(self) -> str:
+        return f"MarketCache(markets: {len(self)}, goods: {len(self.sell_prices_by_good)})"
+
+    def update(self, market:Market, at:dt|None=None) -> None:
+        """ Remember a market, prices only come with it when a ship is there """
+        previous:Market|None = self.markets_by_symbol.get(market.symbol, None)
+        if len(market.trade_goods) == 0 and previous is not None:
+            # keep the last prices we saw rather than forgetting them
+            market.trade_goods = previous.trade_goods
+        self.markets_by_symbol[market.symbol] = market
+        if at is not None:
+            self.updated_at_by_symbol[market.symbol] = at
+
+        touched:set[str] = set()
+        good:TradeGood
+        for good in market.trade_goods:
+            self.sell_prices_by_good.setdefault(good.symbol, {})[market.symbol] = good.sell_price
+            self.purchase_prices_by_good.setdefault(good.symbol, {})[market.symbol] = good.purchase_price
+            touched.add(good.symbol)
+        for symbol in touched:
+            self.best_sell_price_by_good[symbol] = max(self.sell_prices_by_good[symbol].values())
+
+    def sell_price(self, waypoint:str, good:str) -> int|None:
+        """ What the market at waypoint pays for good, None if unknown """
+        return self.sell_prices_by_good.get(good, {}).get(waypoint, None)
+
+    def best_sell(self, good:str) -> tuple[str, int]|None:
+        """ Waypoint paying the most for good and the price """
+        prices:dict[str, int] = self.sell_prices_by_good.get(good, {})
+        if len(prices) == 0:
+            return None
+        waypoint:str = max(prices, key=prices.get)
+        return (waypoint, prices[waypoint])
+
+    def cheapest_purchase(self, good:str) -> tuple[str, int]|None:
+        """ Waypoint selling good the cheapest and the price """
+        prices:dict[str, int] = self.purchase_prices_by_good.get(good, {})
+        if len(prices) == 0:
+            return None
+        waypoint:str = min(prices, key=prices.get)
+        return (waypoint, prices[waypoint])
+
+    def best_sell_prices(self) -> dict[str, int]:
+        """ Best known sell price of every good """
+        return self.best_sell_price_by_good
@@ -1,5 +1,7 @@
 import yaml
+from contextlib import contextmanager
 from time import sleep
+from typing import Iterator
 from math import dist
 from dataclasses import dataclass
 from enum import Enum
@@ -11,7 +13,8 @@ from models.ship import Ship, ShipNav, Market, FlightMode
 from models.contract import Contract
 from models.printer import Printer
 from models.shipyard import Shipyard
-from datetime import datetime, timezone
+from models.purchase_optimizer import PurchaseOption
+from datetime import datetime
 
 @dataclass
 class Option:
@@ -52,6 +55,7 @@ class Menu:
         self.hero = hero
         self.debug = self.hero.debug
         self.printer:Printer = Printer(self.hero.debug)
+        self.printer.subscribe(self.hero.events)
         self.choice_by_name:dict[str,Choice] = {}
         self.default_quit_choice = Choice("quit", ChoiceType.ACTION)
         self.current_choice:Choice = self.default_quit_choice
@@ -62,6 +66,7 @@ class Menu:
         self.current_ship_type:str = ""
         self.current_system:System|None = None
         self.current_contract:Contract|None = None
+        self._holding_lock:bool = False  # an action holds the hero's lock
 
     def init_from_file(self, filename:str):
         with open(filename, "r") as stream:
@@ -83,14 +88,16 @@ class Menu:
                 print(f"Unable to read from file named {filename}")
 
     def ask(self, question:str) -> str:
-        return prompt([IText("answer", message=question)])["answer"]
+        with self._waiting_on_user():
+            return prompt([IText("answer", message=question)])["answer"]
 
     def ask_with_choice(self, question:str, choices:list[str], variable_name:str="answer") -> str:
         """ Ask user for a choice """
         questions:list[IList] = [
           IList(variable_name, message=question, choices=choices)
         ]
-        answers = prompt(questions)
+        with self._waiting_on_user():
+            answers = prompt(questions)
         if answers is None:
             return ""
         return answers[variable_name]
@@ -123,11 +130,44 @@ class Menu:
         return page
 
     def current_time(self) -> datetime:
-        # Get current UTC time as a timezone-aware object
-        return datetime.now(timezone.utc)
+        # Get current server time as a timezone-aware object
+        return self.hero.api.clock.now()
 
     def query_user(self) -> bool:
-        """ True to keep going, False to quit """
+        """
+        True to keep going, False to quit.
+        Actions hold the hero's lock so the fleet loop waits for them, but
+        let go of it while a prompt waits on the user.
+        """
+        with self.hero.lock:
+            # fire arrivals and cooldowns that came due, in case no fleet loop runs
+            self.hero.timers.advance()
+        self.printer.print_notices()
+        if self.current_choice is not None and self.current_choice.choice_type == ChoiceType.ACTION:
+            with self.hero.lock:
+                self._holding_lock = True
+                try:
+                    return self._answer()
+                finally:
+                    self._holding_lock = False
+        return self._answer()
+
+    @contextmanager
+    def _waiting_on_user(self) -> Iterator[None]:
+        """ Fleet notices first, then the fleet loop gets the hero until the user answers """
+        self.printer.print_notices()
+        holding:bool = self._holding_lock
+        if holding:
+            self._holding_lock = False
+            self.hero.lock.release()
+        try:
+            yield
+        finally:
+            if holding:
+                self.hero.lock.acquire()
+                self._holding_lock = True
+
+    def _answer(self) -> bool:
         if self.current_choice is not None:
             if self.debug:
                 print(self.current_choice)
@@ -149,6 +189,40 @@ class Menu:
                             return False
                         case "get_agent":
                             self.printer.print_agent(self.hero.get_agent())
+                        case "get_extraction_stats":
+                            if len(self.hero.extractions) == 0:
+                                print("No extractions recorded")
+                            else:
+                                self.printer.print_extraction_rates("Asteroid", self.hero.extractions.rates_by_waypoint())
+                                self.printer.print_extraction_rates("Frame", self.hero.extractions.rates_by_frame())
+                                self.printer.print_extraction_rates("Mining Strength", self.hero.extractions.rates_by_mining_strength())
+                        case "get_ship_purchases":
+                            self.hero.crawl_shipyards()
+                            options:list[PurchaseOption] = self.hero.recommend_ship_purchases()
+                            if len(options) == 0:
+                                print("Nothing worth buying, visit shipyards with a ship to see prices")
+                            else:
+                                self.printer.print_purchase_options(options)
+                                names:list[str] = list(map(lambda o: f"{o.ship_type} at {o.shipyard}", options))
+                                cancel_text:str = self.add_back(names)
+                                name:str = self.ask_with_choice("Which ship do you want to buy?", names)
+                                if name != cancel_text:
+                                    resp = self.hero.buy_recommended_ship(options[names.index(name) - 1])
+                                    if self.debug:
+                                        print(resp)
+                        case "crawl_galaxy":
+                            try:
+                                self.hero.crawl_galaxy()
+                                self.hero.build_galaxy_snapshot()
+                            except KeyboardInterrupt:
+                                print("Crawl stopped, it picks up from here next time")
+                        case "get_network_stats":
+                            print(f"JSON codec: {self.hero.api.codec.name}, compression: {self.hero.api.compression}")
+                            self.printer.print_wire_stats(self.hero.api.wire_stats)
+                            self.printer.print_stream_stats(self.hero.api.transport)
+                        case "import_galaxy":
+                            self.hero.import_galaxy()
+                            self.hero.build_galaxy_snapshot()
                         case "get_systems":
                             self.printer.print_systems(self.hero.get_systems())
                         case "get_headquarter":
@@ -238,6 +312,8 @@ class Menu:
                                                  "Map of Waypoints",
                                                  "Map of Shipyards",
                                                  "Map of Markets",
+                                                 "Nearby Systems",
+                                                 "Nearest Shipyards",
                                                  "Move",
                                                  "Flight Mode",
                                                  "Market",
@@ -299,6 +375,12 @@ class Menu:
 
                                     print("Shipyards")
                                     self.printer.print_waypoints(shipyard_waypoints, shipyard_distances)
+                                case "Nearby Systems":
+                                    system_distances:list[tuple[str, float]] = self.hero.nearest_systems(self.current_ship.nav.system)
+                                    self.printer.print_system_distances(system_distances)
+                                case "Nearest Shipyards":
+                                    system_distances:list[tuple[str, float]] = self.hero.nearest_systems(self.current_ship.nav.system, trait="SHIPYARD")
+                                    self.printer.print_system_distances(system_distances)
                                 case "Map of Markets":
                                     ship:Ship = self.current_ship
                                     ship_x:int = ship.nav.route.destination.x
@@ -456,7 +538,7 @@ class Menu:
                             if len(contracts) == 0:
                                 print("No contracts")
                             else:
-                                self.printer.print_list({"Contract IDs": contract_ids})
+                                self.printer.print_contract_estimates(self.hero.contract_planner.rank(contracts, self.current_time()))
                         case "get_contract":
                             contract_ids = list(map(lambda c: c.id, self.hero.get_contracts()))
                             cancel_text:str = self.add_back(contract_ids)
@@ -474,15 +556,19 @@ class Menu:
                             if self.current_contract is None:
                                 # no contract was selected but we got here, just fail
                                 return False
-                            actions:list[str] = ["Accept"]
+                            actions:list[str] = ["Accept", "Plan"]
                             cancel_text:str = self.add_back(actions)
                             action:str = self.ask_with_choice(f"Actions for {self.current_contract.id}?", actions)
                             if action == cancel_text:
                                 self.back_current_choice()
                                 return True
-                            resp = self.hero.accept_contract(self.current_contract.id)
-                            if self.debug:
-                                print(resp)
+                            match action:
+                                case "Accept":
+                                    resp = self.hero.accept_contract(self.current_contract.id)
+                                    if self.debug:
+                                        print(resp)
+                                case "Plan":
+                                    self.printer.print_contract_plan(self.hero.contract_planner.estimate(self.current_contract, self.current_time()))
                         case "get_system":
                             system_names:list[str] = list(map(lambda s: s.name, self.hero.systems))
                             cancel_text:str = self.add_back(system_names)
@@ -496,7 +582,7 @@ class Menu:
                             self.current_system = self.hero.get_system(matching.symbol)
                             self.printer.print_system(self.current_system)
                         case "system_actions":
-                            actions:list[str] = ["Info", "Waypoints", "Shipyards", "Markets"]
+                            actions:list[str] = ["Info", "Waypoints", "Search Waypoints", "Shipyards", "Markets"]
                             cancel_text:str = self.add_back(actions)
                             system_symbol:str = self.current_system.symbol
                             match self.ask_with_choice(f"Actions for {system_symbol}?", actions):
@@ -510,6 +596,13 @@ class Menu:
                                     page:int = self.ask_page()
                                     waypoints:list[Waypoint] = self.hero.get_waypoints(system_symbol, "", page)
                                     self.printer.print_waypoints(waypoints)
+                                case "Search Waypoints":
+                                    query:str = self.ask("Traits to look for, e.g. MARKETPLACE !STRIPPED type=ENGINEERED_ASTEROID")
+                                    waypoints:list[Waypoint] = self.hero.find_waypoints(query, system_symbol)
+                                    if len(waypoints) == 0:
+                                        print("No waypoint matches")
+                                    else:
+                                        self.printer.print_waypoints(waypoints)
                                 case "Shipyards":
                                     page:int = self.ask_page()
                                     waypoints:list[Waypoint] = self.hero.get_waypoints(system_symbol, "SHIPYARD", page)
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Callable
+from yaml import safe_load, YAMLError
+from models.hero import Hero
+from models.spacetrader import AgentLock
+
+class MultiAgentRunner:
+    """
+    Runs several agents in one process from one asyncio loop.
+    Every agent keeps its own token, rate limiter and connections, and
+    shares the universe, markets, shipyards and galaxy of the first one.
+    Agent code is blocking, so each turn runs in the loop's thread pool
+    holding the AgentLock: Python code of two agents never runs at once,
+    shared caches need no locking of their own, while the waits on rate
+    limiters and the network of every agent overlap.
+    """
+    def __init__(self, poll:float=1.0, debug:bool=False) -> None:
+        self.heroes:list[Hero] = []
+        self.lock:AgentLock = AgentLock()
+        self.poll:float = poll  # longest sleep before looking at an agent's timers again
+        self.debug:bool = debug
+        self._turns:dict[str, asyncio.Lock] = {}
+
+    def __str__(self) -> str:
+        return f"MultiAgentRunner(agents: {list(map(lambda h: h.callsign, self.heroes))})"
+
+    def add(self, hero:Hero) -> Hero:
+        """ Run another agent, sharing the world caches of the first """
+        if len(self.heroes) > 0:
+            hero.share_caches(self.heroes[0])
+        hero.api.shared_lock = self.lock
+        self.heroes.append(hero)
+        return hero
+
+    def load(self, filename:str) -> list[Hero]:
+        """
+        Agents listed in a yaml file, each either the name of a data.yaml
+        or the same settings inline:
+          agents:
+            - data.yaml
+            - callsign: other
+              faction: COSMIC
+              token: ...
+        """
+        with open(filename, "r") as stream:
+            try:
+                obj = safe_load(stream)
+            except YAMLError as exc:
+                print(exc)
+                print(f"Unable to read from file named {filename}")
+                return []
+        for agent in obj.get("agents", []):
+            hero:Hero = Hero()
+            if isinstance(agent, str):
+                hero.init_from_file(agent)
+            else:
+                hero.init_from_dict(agent)
+            self.add(hero)
+            if self.debug:
+                print(f"Loaded agent {hero.callsign}")
+        return self.heroes
+
+    def find(self, callsign:str) -> Hero|None:
+        return next((h for h in self.heroes if h.callsign == callsign), None)
+
+    async def call(self, hero:Hero, callback:Callable, *args) -> object:
+        """ Run some of an agent's code, one turn at a time per agent """
+        turn:asyncio.Lock = self._turns.setdefault(hero.callsign, asyncio.Lock())
+        async with turn:
+            return await asyncio.to_thread(self._locked, callback, *args)
+
+    async def run(self, start:Callable[[Hero], object]|None=None, until:Callable[[], bool]|None=None) -> None:
+        """
+        Start every agent with start(hero), then fire each agent's timers as
+        they come due until they all run out or until() says to stop.
+        """
+        if start is not None:
+            await asyncio.gather(*(self.call(hero, start, hero) for hero in self.heroes))
+        await asyncio.gather(*(self._drive(hero, until) for hero in self.heroes))
+
+    # Helper Methods
+
+    def _locked(self, callback:Callable, *args) -> object:
+        with self.lock:
+            return callback(*args)
+
+    async def _drive(self, hero:Hero, until:Callable[[], bool]|None) -> None:
+        """ Timer loop of one agent, sleeping on the event loop in between """
+        while hero.timers.count > 0 and not (until is not None and until()):
+            delay:float = max(hero.timers.next_deadline() - hero.timers.clock(), 0.0)
+            await asyncio.sleep(min(delay, self.poll))
+            await self.call(hero, hero.timers.advance)
+        if self.debug:
+            print(f"{hero.callsign} has nothing left to do")
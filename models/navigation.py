@@ -0,0 +1,103 @@
+from math import ceil
+from models.ship import Ship, FlightMode
+from models.universe import Universe
+from models.jump_graph import JumpGraph, RouteLeg, LegKind, system_of, warp_time
+
+# seconds per unit of distance at speed 1, the game divides these by engine speed
+TRAVEL_MULTIPLIERS:dict[FlightMode, float] = {
+    FlightMode.CRUISE: 25,
+    FlightMode.BURN: 12.5,
+    FlightMode.DRIFT: 250,
+    FlightMode.STEALTH: 30,
+}
+
+def travel_time(distance:float, speed:int, flight_mode:FlightMode=FlightMode.CRUISE) -> int:
+    """ Seconds to fly distance within a system """
+    return round(round(max(1, distance)) * (TRAVEL_MULTIPLIERS[flight_mode] / max(speed, 1)) + 15)
+
+def fuel_cost(distance:float, flight_mode:FlightMode=FlightMode.CRUISE) -> int:
+    """ Fuel burnt flying distance within a system """
+    match flight_mode:
+        case FlightMode.DRIFT:
+            return 1
+        case FlightMode.BURN:
+            return 2 * max(1, round(distance))
+        case _:
+            return max(1, round(distance))
+
+# ships burn fuel by the tank unit, markets sell it by the barrel of 100
+FUEL_UNITS_PER_MARKET_UNIT:int = 100
+
+def fuel_purchase_cost(fuel_units:int, fuel_price:int) -> int:
+    """ Credits to buy back fuel_units of tank fuel at fuel_price per market unit """
+    return ceil(max(fuel_units, 0) / FUEL_UNITS_PER_MARKET_UNIT) * fuel_price
+
+class Navigator:
+    """
+    Travel times and fuel between waypoints we know the position of.
+    Across systems it goes through the jump gate graph, flying to the gate,
+    jumping or warping, then flying from the gate on the other side.
+    """
+    def __init__(self, universe:Universe, graph:JumpGraph|None=None) -> None:
+        self.universe:Universe = universe
+        self.graph:JumpGraph = graph if graph is not None else JumpGraph()
+
+    def __str__(self) -> str:
+        return f"Navigator({self.universe})"
+
+    def distance(self, from_symbol:str, to_symbol:str) -> float:
+        """ Distance between waypoints, unknown positions count as next to each other """
+        if from_symbol == to_symbol:
+            return 0.0
+        distance:float|None = self.universe.distance(from_symbol, to_symbol)
+        return distance if distance is not None else 0.0
+
+    def travel_time(self, ship:Ship, from_symbol:str, to_symbol:str, flight_mode:FlightMode=FlightMode.CRUISE) -> int:
+        """ Seconds for ship to get between waypoints, nothing if already there """
+        if from_symbol == to_symbol:
+            return 0
+        if system_of(from_symbol) != system_of(to_symbol):
+            legs:list[RouteLeg]|None = self.route(ship, from_symbol, to_symbol, flight_mode)
+            if legs is not None:
+                return sum(leg.seconds for leg in legs)
+        return travel_time(self.distance(from_symbol, to_symbol), ship.engine.speed, flight_mode)
+
+    def fuel_cost(self, from_symbol:str, to_symbol:str, flight_mode:FlightMode=FlightMode.CRUISE) -> int:
+        """ Fuel to fly between waypoints, nothing if already there, jumps burn none """
+        if from_symbol == to_symbol:
+            return 0
+        return fuel_cost(self.distance(from_symbol, to_symbol), flight_mode)
+
+    def route(self, ship:Ship, from_symbol:str, to_symbol:str, flight_mode:FlightMode=FlightMode.CRUISE) -> list[RouteLeg]|None:
+        """ Legs to get from one waypoint to another, None if no known way across systems """
+        if from_symbol == to_symbol:
+            return []
+        origin:str = system_of(from_symbol)
+        target:str = system_of(to_symbol)
+        if origin == target:
+            return [RouteLeg(LegKind.NAVIGATE, from_symbol, to_symbol, self.travel_time(ship, from_symbol, to_symbol, flight_mode))]
+        warp_range:float = ship.fuel.capacity if ship.has_warp_drive() else 0.0
+        path:tuple[int, list[tuple[str, LegKind]]]|None = self.graph.shortest_path(origin, target, warp_range, ship.engine.speed)
+        if path is None:
+            return None
+        legs:list[RouteLeg] = []
+        here:str = from_symbol
+        system:str = origin
+        for next_system, kind in path[1]:
+            if kind == LegKind.JUMP:
+                gate:str = self.graph.gates[system]
+                if here != gate:
+                    legs.append(RouteLeg(LegKind.NAVIGATE, here, gate, self.travel_time(ship, here, gate, flight_mode)))
+                    here = gate
+                arrival:str = self.graph.gates[next_system]
+                seconds:int = self.graph.edges[system][next_system]
+            else:
+                # warp straight to where we are going, or a waypoint of the system to carry on from
+                arrival = to_symbol if next_system == target else self.graph.landing(next_system)
+                seconds = warp_time(self.graph.distance(system, next_system), ship.engine.speed)
+            legs.append(RouteLeg(kind, here, arrival, seconds))
+            here = arrival
+            system = next_system
+        if here != to_symbol:
+            legs.append(RouteLeg(LegKind.NAVIGATE, here, to_symbol, self.travel_time(ship, here, to_symbol, flight_mode)))
+        return legs
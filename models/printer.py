@@ -1,3 +1,4 @@
+from queue import SimpleQueue, Empty
 from tabulate import tabulate
 from models.waypoint import Waypoint
 from models.ship import Ship, ShipExtraction, ShipCooldown, ShipCargo, ShipMount, ShipModule, Market, ShipNav, Transaction, ShipFuel
@@ -5,10 +6,33 @@ from models.shipyard import Shipyard
 from models.contract import Contract
 from models.agent import Agent
 from models.system import System
+from models.extraction_log import ExtractionRate
+from models.contract_planner import ContractEstimate
+from models.purchase_optimizer import PurchaseOption
+from models.codec import WireStats, EndpointStats
+from models.transport import Transport
+from models.sharding import ShardMetrics
+from models.events import EventBus, ShipArrived, CooldownEnded, CargoFull, ContractChanged
 
 class Printer():
     def __init__(self, debug:bool) -> None:
         self.debug = debug
+        self.notices:SimpleQueue[str] = SimpleQueue()  # the fleet loop's thread must not print over a prompt
+
+    def subscribe(self, events:EventBus) -> None:
+        """ Queue a short notice as things happen to the fleet, print_notices shows them """
+        events.subscribe(ShipArrived, lambda e: self.notices.put(f"{e.ship_symbol} arrived at {e.waypoint}"))
+        events.subscribe(CooldownEnded, lambda e: self.notices.put(f"{e.ship_symbol} is ready"))
+        events.subscribe(CargoFull, lambda e: self.notices.put(f"{e.ship_symbol} cargo is full ({e.cargo.units} / {e.cargo.capacity})"))
+        events.subscribe(ContractChanged, lambda e: self.notices.put(f"Contract {e.contract.id} accepted: {e.contract.accepted}, fulfilled: {e.contract.fulfilled}"))
+
+    def print_notices(self) -> None:
+        """ Print the notices queued so far """
+        while True:
+            try:
+                print(self.notices.get_nowait())
+            except Empty:
+                return
 
     def print_dict(self, table: dict[str,str]) -> None:
         """ Print dictionary """
@@ -192,6 +216,13 @@ class Printer():
         }
         self.print_list(pretty_systems)
 
+    def print_system_distances(self, system_distances:list[tuple[str, float]]) -> None:
+        """ Print systems and how far away they are, as given """
+        self.print_list({
+            "Symbols": list(map(lambda s: s[0], system_distances)),
+            "Distance": list(map(lambda s: f"{s[1]:.1f}", system_distances)),
+        })
+
     def print_waypoint(self, hq:Waypoint) -> None:
         self.print_waypoints([hq])
 
@@ -282,6 +313,44 @@ class Printer():
                 f"{str(cargo.units)} / {str(cargo.capacity)}",
             ]})
 
+    def print_extraction_rates(self, title:str, rates:dict[object, ExtractionRate]) -> None:
+        """ Print aggregated extraction rates, best credits per hour first """
+        ordered:list[tuple[object, ExtractionRate]] = sorted(rates.items(), key=lambda r: r[1].credits_per_hour(), reverse=True)
+        self.print_list({
+            title: list(map(lambda r: str(r[0]), ordered)),
+            "Extractions": list(map(lambda r: str(r[1].extractions), ordered)),
+            "Units": list(map(lambda r: str(r[1].units), ordered)),
+            "Credits": list(map(lambda r: str(r[1].credits), ordered)),
+            "Units / Hour": list(map(lambda r: f"{r[1].units_per_hour():.1f}", ordered)),
+            "Credits / Hour": list(map(lambda r: f"{r[1].credits_per_hour():.1f}", ordered)),
+        })
+
+    def print_contract_estimates(self, estimates:list[ContractEstimate]) -> None:
+        """ Print what each contract is worth and why it can't be done """
+        self.print_list({
+            "Contract": list(map(lambda e: e.contract_id, estimates)),
+            "Revenue": list(map(lambda e: str(e.revenue), estimates)),
+            "Cost": list(map(lambda e: str(e.cost), estimates)),
+            "Hours": list(map(lambda e: f"{e.seconds / 3600:.1f}", estimates)),
+            "Profit / Hour": list(map(lambda e: f"{e.profit_per_hour():.1f}", estimates)),
+            "Feasible": list(map(lambda e: "yes" if e.feasible else e.reason, estimates)),
+        })
+
+    def print_contract_plan(self, estimate:ContractEstimate) -> None:
+        """ Print which ship does what for a contract """
+        self.print_contract_estimates([estimate])
+        if len(estimate.deliveries) == 0:
+            return
+        self.print_list({
+            "Ship": list(map(lambda d: d.ship_symbol, estimate.deliveries)),
+            "Source": list(map(lambda d: d.source.name, estimate.deliveries)),
+            "Trade": list(map(lambda d: d.trade, estimate.deliveries)),
+            "Pickup": list(map(lambda d: d.pickup, estimate.deliveries)),
+            "Destination": list(map(lambda d: d.destination, estimate.deliveries)),
+            "Units": list(map(lambda d: str(d.units), estimate.deliveries)),
+            "Trips": list(map(lambda d: str(d.trips), estimate.deliveries)),
+        })
+
     def print_import_export_exchange(self, title:str, the_list:list) -> None:
         print(title)
         if len(the_list) == 0:
@@ -395,6 +464,58 @@ class Printer():
             ]
         })
 
+    def print_purchase_options(self, options:list[PurchaseOption]) -> None:
+        """ Print ship types to buy, quickest payback first """
+        self.print_list({
+            "Ship Type": list(map(lambda o: o.ship_type, options)),
+            "Shipyard": list(map(lambda o: o.shipyard, options)),
+            "Price": list(map(lambda o: str(o.price), options)),
+            "Travel Cost": list(map(lambda o: str(o.travel_cost), options)),
+            "Credits / Hour": list(map(lambda o: f"{o.credits_per_hour:.1f}", options)),
+            "Payback Hours": list(map(lambda o: f"{o.payback_hours():.1f}", options)),
+        })
+
+    def print_wire_stats(self, wire_stats:WireStats) -> None:
+        """ Print bytes on the wire against decoded bytes per endpoint, busiest first """
+        rows:list[tuple[str, EndpointStats]] = sorted(wire_stats.by_endpoint.items(), key=lambda e: -e[1].wire_bytes)
+        rows.append(("Total", wire_stats.total()))
+        self.print_list({
+            "Endpoint": list(map(lambda r: r[0], rows)),
+            "Requests": list(map(lambda r: str(r[1].requests), rows)),
+            "Wire Bytes": list(map(lambda r: str(r[1].wire_bytes), rows)),
+            "Decoded Bytes": list(map(lambda r: str(r[1].decoded_bytes), rows)),
+            "Ratio": list(map(lambda r: f"{r[1].compression_ratio():.1f}", rows)),
+            "Decode ms": list(map(lambda r: f"{r[1].decode_seconds * 1000:.1f}", rows)),
+        })
+
+    def print_stream_stats(self, transport:Transport) -> None:
+        """ Print what the transport carried, streams are requests """
+        stats = transport.stats
+        self.print_dict({
+            "Transport": transport.name,
+            "Base URL": transport.base_url,
+            "Streams": str(stats.streams),
+            "Errors": str(stats.errors),
+            "Timeouts": str(stats.timeouts),
+            "Average ms": f"{stats.average() * 1000:.1f}",
+            "Slowest ms": f"{stats.slowest * 1000:.1f}",
+            "Max In Flight": str(stats.max_in_flight),
+        })
+
+    def print_shard_metrics(self, metrics:list[ShardMetrics]) -> None:
+        """ Print what each shard ran and how busy it was over the last report """
+        metrics = sorted(metrics, key=lambda m: m.shard)
+        self.print_list({
+            "Shard": list(map(lambda m: str(m.shard), metrics)),
+            "Ships": list(map(lambda m: str(m.ships), metrics)),
+            "Turns": list(map(lambda m: str(m.turns), metrics)),
+            "Timers Fired": list(map(lambda m: str(m.timers_fired), metrics)),
+            "Requests": list(map(lambda m: str(m.requests), metrics)),
+            "Requests / s": list(map(lambda m: f"{m.requests_per_second:.2f}", metrics)),
+            "CPU s": list(map(lambda m: f"{m.cpu_seconds:.2f}", metrics)),
+            "Load": list(map(lambda m: f"{m.load:.0%}", metrics)),
+        })
+
     def print_transaction(self, transaction:Transaction) -> None:
         self.print_list({
             "Field": [
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from models.ship import Ship
+from models.shipyard import ShipyardShip
+from models.shipyard_cache import ShipyardCache
+from models.fleet import FleetIndex
+from models.navigation import Navigator, fuel_purchase_cost
+from models.extraction_log import ExtractionLog, ExtractionRate
+from models.market_cache import MarketCache
+
+@dataclass
+class PurchaseOption:
+    """ A ship type, where to buy it and how long it takes to pay for itself """
+    ship_type:str
+    shipyard:str
+    price:int
+    travel_cost:int          # fuel for the nearest ship of ours to get there
+    credits_per_hour:float
+
+    def total_cost(self) -> int:
+        return self.price + self.travel_cost
+
+    def payback_hours(self) -> float:
+        return self.total_cost() / self.credits_per_hour if self.credits_per_hour > 0 else float("inf")
+
+class PurchaseOptimizer:
+    """
+    Ranks ship types by how fast they pay for themselves. Earnings come from
+    the extraction log, what ships with the same mining strength made per
+    hour, or failing that what the fleet makes per unit of strength.
+    Buying needs one of our ships at the shipyard, so only shipyards in
+    systems we have ships in count and the fuel to get there adds to the price.
+    """
+    def __init__(self, shipyards:ShipyardCache, fleet:FleetIndex, navigator:Navigator, extractions:ExtractionLog, markets:MarketCache, default_fuel_price:int=72) -> None:
+        self.shipyards:ShipyardCache = shipyards
+        self.fleet:FleetIndex = fleet
+        self.navigator:Navigator = navigator
+        self.extractions:ExtractionLog = extractions
+        self.markets:MarketCache = markets
+        self.default_fuel_price:int = default_fuel_price
+
+    def __str__(self) -> str:
+        return f"PurchaseOptimizer({self.shipyards})"
+
+    def credits_per_hour(self, ship:ShipyardShip) -> float:
+        """ What a ship like this should make mining """
+        if ship.mining_strength <= 0:
+            return 0.0
+        same_strength:ExtractionRate|None = self.extractions.rates_by_mining_strength().get(ship.mining_strength, None)
+        if same_strength is not None and same_strength.seconds > 0:
+            return same_strength.credits_per_hour()
+        credits:int = 0
+        strength_seconds:int = 0
+        for record in self.extractions.records:
+            credits += record.credits
+            strength_seconds += record.cooldown_seconds * record.mining_strength
+        if strength_seconds == 0:
+            return 0.0
+        return credits * 3600 / strength_seconds * ship.mining_strength
+
+    def nearest_ship(self, shipyard:str) -> Ship|None:
+        """ Our ship that gets to the shipyard the quickest """
+        system:str = "-".join(shipyard.split("-")[0:2])
+        ships:list[Ship] = [s for s in self.fleet.query(system=system) if s.nav.status != "IN_TRANSIT"]
+        if len(ships) == 0:
+            return None
+        return min(ships, key=lambda s: self.navigator.travel_time(s, s.nav.waypoint.waypoint, shipyard))
+
+    def options(self) -> list[PurchaseOption]:
+        """ Best place to buy each ship type we have prices for, quickest payback first """
+        fuel:tuple[str, int]|None = self.markets.cheapest_purchase("FUEL")
+        fuel_price:int = fuel[1] if fuel is not None else self.default_fuel_price
+        options:list[PurchaseOption] = []
+        for ship_type, ship in self.shipyards.ships_by_type.items():
+            best:PurchaseOption|None = None
+            for shipyard, price in self.shipyards.prices_by_type.get(ship_type, {}).items():
+                nearest:Ship|None = self.nearest_ship(shipyard)
+                if nearest is None:
+                    continue
+                travel_cost:int = fuel_purchase_cost(self.navigator.fuel_cost(nearest.nav.waypoint.waypoint, shipyard), fuel_price)
+                option:PurchaseOption = PurchaseOption(ship_type, shipyard, price, travel_cost, self.credits_per_hour(ship))
+                if best is None or option.total_cost() < best.total_cost():
+                    best = option
+            if best is not None:
+                options.append(best)
+        return sorted(options, key=lambda o: o.payback_hours())
+
+    def recommend(self, budget:int, max_payback_hours:float=float("inf")) -> list[PurchaseOption]:
+        """ Options we can afford that pay back in time """
+        return [o for o in self.options() if o.credits_per_hour > 0 and o.total_cost() <= budget and o.payback_hours() <= max_payback_hours]
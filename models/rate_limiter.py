@@ -0,0 +1,47 @@
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable
+
+class TokenBucket:
+    """
+    Token bucket rate limiter, safe to share between threads.
+    Tokens come back at rate per second up to capacity, so short bursts go
+    through right away and anything sustained is held to the rate.
+    The API allows 2 requests per second with a burst of 30 over 60 seconds.
+    """
+    def __init__(self, rate:float=2.0, capacity:float=2.0, clock:Callable[[], float]=monotonic) -> None:
+        self.rate:float = rate
+        self.capacity:float = capacity
+        self.clock:Callable[[], float] = clock
+        self.tokens:float = capacity
+        self.updated_at:float = clock()
+        self.acquired:int = 0
+        self.waited:float = 0.0
+        self._lock:Lock = Lock()
+
+    def __str__(self) -> str:
+        return f"TokenBucket(rate: {self.rate}, capacity: {self.capacity}, tokens: {self.tokens:.2f}, acquired: {self.acquired}, waited: {self.waited:.1f})"
+
+    def reserve(self, tokens:float=1.0) -> float:
+        """ Take tokens now, possibly going into debt, returns seconds to wait before using them """
+        with self._lock:
+            now:float = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= tokens
+            self.acquired += 1
+            delay:float = max(-self.tokens / self.rate, 0.0)
+            self.waited += delay
+            return delay
+
+    def acquire(self, tokens:float=1.0) -> float:
+        """ Block until tokens are available, returns seconds waited """
+        delay:float = self.reserve(tokens)
+        if delay > 0:
+            sleep(delay)
+        return delay
+
+    def penalize(self, seconds:float) -> None:
+        """ The server told us to back off, hold everyone for that long """
+        with self._lock:
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
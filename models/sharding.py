@@ -0,0 +1,424 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime as dt
+from multiprocessing import Process, Queue
+from multiprocessing.managers import BaseManager
+from os import cpu_count, urandom
+from queue import Empty
+from signal import signal, SIGINT, SIG_IGN
+from threading import Lock
+from time import monotonic, process_time, sleep
+from typing import Callable
+from yaml import safe_load, YAMLError
+from models.hero import Hero
+from models.ship import Market
+from models.shipyard import Shipyard
+from models.waypoint import Waypoint
+from models.rate_limiter import TokenBucket
+from models.shared_limiter import FileTokenBucket
+from models.events import MarketUpdated, ShipyardUpdated
+
+class SharedCache:
+    """
+    World knowledge shards publish to and catch up from, lives in the
+    coordinator's manager process. Every entry remembers its version so a
+    shard only pulls what changed since it last looked.
+    """
+    def __init__(self) -> None:
+        self.version:int = 0
+        self.entries:OrderedDict[tuple[str, str], tuple[int, int, dict, dt|None]] = OrderedDict()  # (kind, key) -> (version, shard, raw, at), oldest first
+        self._lock:Lock = Lock()
+
+    def publish(self, shard:int, kind:str, key:str, raw:dict, at:dt|None=None) -> int:
+        with self._lock:
+            self.version += 1
+            self.entries[(kind, key)] = (self.version, shard, raw, at)
+            self.entries.move_to_end((kind, key))
+            return self.version
+
+    def since(self, shard:int, version:int) -> tuple[int, list[tuple[str, dict, dt|None]]]:
+        """ Entries other shards published after version, oldest first, and the version to ask from next """
+        changed:list[tuple[str, dict, dt|None]] = []
+        with self._lock:
+            for (kind, _), (entry_version, origin, raw, at) in reversed(self.entries.items()):
+                if entry_version <= version:
+                    break
+                if origin != shard:
+                    changed.append((kind, raw, at))
+            changed.reverse()
+            return self.version, changed
+
+_limiters:dict[str, TokenBucket] = {}
+_cache:SharedCache = SharedCache()
+
+def _limiter(callsign:str) -> TokenBucket:
+    """ One bucket per agent, whichever shard asks """
+    return _limiters.setdefault(callsign, TokenBucket())
+
+def _shared_cache() -> SharedCache:
+    return _cache
+
+class ShardManager(BaseManager):
+    """ Serves the rate limiters and the cache every shard shares """
+    pass
+
+ShardManager.register("limiter", callable=_limiter)
+ShardManager.register("cache", callable=_shared_cache)
+
+class RemoteLimiter:
+    """
+    Stands in for the TokenBucket of an agent held by the ShardManager, so
+    every process running ships of the agent keeps to one rate together.
+    Only the reservation goes to the manager, the wait happens here.
+    """
+    def __init__(self, bucket) -> None:
+        self.bucket = bucket  # proxy of a TokenBucket
+        self.acquired:int = 0
+        self.waited:float = 0.0
+
+    def __str__(self) -> str:
+        return f"RemoteLimiter(acquired: {self.acquired}, waited: {self.waited:.1f})"
+
+    def reserve(self, tokens:float=1.0) -> float:
+        return self.bucket.reserve(tokens)
+
+    def acquire(self, tokens:float=1.0) -> float:
+        delay:float = self.reserve(tokens)
+        self.acquired += 1
+        self.waited += delay
+        if delay > 0:
+            sleep(delay)
+        return delay
+
+    def penalize(self, seconds:float) -> None:
+        self.bucket.penalize(seconds)
+
+@dataclass(frozen=True)
+class ShardUnit:
+    """ What moves between shards as a whole, one ship or every ship of an agent """
+    callsign:str
+    ships:tuple[str, ...]
+
+    def __str__(self) -> str:
+        return f"{self.callsign}:{self.ships[0]}" if len(self.ships) == 1 else f"{self.callsign} ({len(self.ships)} ships)"
+
+@dataclass
+class ShardMetrics:
+    """ What a shard did since it started, sent to the coordinator every so often """
+    shard:int
+    ships:int = 0
+    turns:int = 0
+    timers_fired:int = 0
+    requests:int = 0
+    cpu_seconds:float = 0.0
+    uptime:float = 0.0
+    load:float = 0.0             # share of one core used since the last report
+    requests_per_second:float = 0.0
+
+    def since(self, previous:ShardMetrics|None) -> ShardMetrics:
+        """ These metrics with load and rates over the time since previous """
+        if previous is None:
+            previous = ShardMetrics(self.shard)
+        elapsed:float = self.uptime - previous.uptime
+        if elapsed > 0:
+            self.load = (self.cpu_seconds - previous.cpu_seconds) / elapsed
+            self.requests_per_second = (self.requests - previous.requests) / elapsed
+        return self
+
+class ShardWorker:
+    """
+    Runs the ships given to one worker process. Agents get a Hero each,
+    created when their first ship arrives, all drawing from the agent's
+    shared rate limiter and sharing world caches with the other shards.
+    """
+    def __init__(self, shard:int, settings:dict[str, dict], manager:ShardManager, reports:Queue, poll:float=1.0, report_every:float=5.0) -> None:
+        self.shard:int = shard
+        self.settings:dict[str, dict] = settings  # callsign -> data.yaml settings, token included
+        self.manager:ShardManager = manager
+        self.cache = manager.cache()
+        self.reports:Queue = reports
+        self.poll:float = poll
+        self.report_every:float = report_every
+        self.heroes:dict[str, Hero] = {}
+        self.units:set[ShardUnit] = set()
+        self.metrics:ShardMetrics = ShardMetrics(shard)
+        self.started_at:float = monotonic()
+        self.cache_version:int = 0
+        self.known_waypoints:int = 0
+        self.stopped:bool = False
+
+    def __str__(self) -> str:
+        return f"ShardWorker(shard: {self.shard}, agents: {list(self.heroes)}, ships: {self.metrics.ships})"
+
+    def run(self, commands:Queue) -> None:
+        """ Fire timers as they come due, taking and releasing ships as told, until told to stop """
+        reported_at:float = monotonic()
+        while not self.stopped:
+            self._handle(commands, self._next_wait())
+            started:float = process_time()
+            for hero in self.heroes.values():
+                self.metrics.timers_fired += hero.timers.advance()
+            self._sync()
+            self.metrics.turns += 1
+            self.metrics.cpu_seconds += process_time() - started
+            if monotonic() - reported_at >= self.report_every:
+                self._report()
+                reported_at = monotonic()
+        self._report()
+
+    def take(self, unit:ShardUnit) -> dict[str, str]:
+        """ Start running the ships of a unit, returns ship -> strategy """
+        hero:Hero = self._hero(unit.callsign)
+        strategies:dict[str, str] = {s: hero.take_ship(s) for s in unit.ships}
+        self.units.add(unit)
+        self.metrics.ships += len(unit.ships)
+        return strategies
+
+    def release(self, unit:ShardUnit) -> None:
+        hero:Hero|None = self.heroes.get(unit.callsign, None)
+        if hero is not None:
+            for ship in unit.ships:
+                hero.release_ship(ship)
+        self.units.discard(unit)
+        self.metrics.ships -= len(unit.ships)
+
+    # Helper Methods
+
+    def _hero(self, callsign:str) -> Hero:
+        hero:Hero|None = self.heroes.get(callsign, None)
+        if hero is not None:
+            return hero
+        hero = Hero()
+        hero.init_from_dict(self.settings[callsign])
+        if not isinstance(hero.api.limiter, FileTokenBucket):
+            hero.api.limiter = RemoteLimiter(self.manager.limiter(callsign))
+        if len(self.heroes) > 0:
+            hero.share_caches(next(iter(self.heroes.values())))
+        hero.events.subscribe(MarketUpdated, lambda e: self.cache.publish(self.shard, "market", e.market.symbol, e.market.raw, hero.api.clock.now()))
+        hero.events.subscribe(ShipyardUpdated, lambda e: self.cache.publish(self.shard, "shipyard", e.shipyard.symbol, e.shipyard.raw, hero.api.clock.now()))
+        self.heroes[callsign] = hero
+        return hero
+
+    def _next_wait(self) -> float:
+        """ Seconds until the first timer of any agent is due, at most poll """
+        wait:float = self.poll
+        for hero in self.heroes.values():
+            deadline:float|None = hero.timers.next_deadline()
+            if deadline is not None:
+                wait = min(wait, max(deadline - hero.timers.clock(), 0.0))
+        return wait
+
+    def _handle(self, commands:Queue, wait:float) -> None:
+        """ Carry out what the coordinator asked, waiting at most wait for it to ask anything """
+        try:
+            command, unit = commands.get(timeout=wait) if wait > 0 else commands.get_nowait()
+        except Empty:
+            return
+        match command:
+            case "take":
+                self.reports.put(("assigned", self.shard, unit, self.take(unit)))
+            case "release":
+                self.release(unit)
+                self.reports.put(("released", self.shard, unit, {}))
+            case "stop":
+                self.stopped = True
+
+    def _sync(self) -> None:
+        """ Publish waypoints we found and catch up on everything the other shards found """
+        if len(self.heroes) == 0:
+            return
+        hero:Hero = next(iter(self.heroes.values()))
+        waypoints:dict[str, Waypoint] = hero.universe.waypoints_by_symbol
+        if len(waypoints) > self.known_waypoints:
+            for waypoint in list(waypoints.values())[self.known_waypoints:]:
+                self.cache.publish(self.shard, "waypoint", waypoint.waypoint, waypoint.raw)
+        self.cache_version, changed = self.cache.since(self.shard, self.cache_version)
+        found:list[Waypoint] = []
+        for kind, raw, at in changed:
+            match kind:
+                case "market":
+                    hero.markets.update(Market().parse_market(raw), at)
+                case "shipyard":
+                    hero.shipyards.update(Shipyard(raw), at)
+                case "waypoint":
+                    found.append(Waypoint(raw))
+        hero.universe.add_waypoints(found)
+        self.known_waypoints = len(waypoints)
+
+    def _report(self) -> None:
+        self.metrics.requests = sum(h.api.wire_stats.total().requests for h in self.heroes.values())
+        self.metrics.uptime = monotonic() - self.started_at
+        self.reports.put(("metrics", self.shard, None, self.metrics))
+
+def run_shard(shard:int, settings:dict[str, dict], address:tuple, authkey:bytes, commands:Queue, reports:Queue, poll:float, report_every:float) -> None:
+    """ Worker process entry point """
+    # the coordinator handles Ctrl-C and tells every shard to stop
+    signal(SIGINT, SIG_IGN)
+    manager:ShardManager = ShardManager(address=address, authkey=authkey)
+    manager.connect()
+    ShardWorker(shard, settings, manager, reports, poll, report_every).run(commands)
+
+class ShardCoordinator:
+    """
+    Spreads the ships of one or more agents over worker processes, one per
+    core by default, so parsing and planning use every core. The coordinator
+    serves each agent's rate limiter and the shared caches through a
+    ShardManager, and moves ships from the busiest shard to the idlest one
+    when their loads drift apart.
+    """
+    def __init__(self, shards:int=0, by:str="ship", poll:float=1.0, report_every:float=5.0, rebalance_every:float=30.0, imbalance:float=0.25, debug:bool=False) -> None:
+        self.shards:int = shards if shards > 0 else (cpu_count() or 1)
+        self.by:str = by  # ship or agent, what moves between shards
+        self.poll:float = poll
+        self.report_every:float = report_every
+        self.rebalance_every:float = rebalance_every
+        self.imbalance:float = imbalance  # difference in load (share of a core) worth moving a unit for
+        self.debug:bool = debug
+        self.heroes:list[Hero] = []
+        self.settings:dict[str, dict] = {}
+        self.units_by_shard:dict[int, list[ShardUnit]] = {}
+        self.metrics:dict[int, ShardMetrics] = {}
+        self.moving:ShardUnit|None = None
+        self.moving_to:int = -1
+        self.authkey:bytes = urandom(16)
+        self.manager:ShardManager|None = None
+        self.processes:list[Process] = []
+        self.commands:list[Queue] = []
+        self.reports:Queue|None = None
+
+    def __str__(self) -> str:
+        return f"ShardCoordinator(shards: {self.shards}, by: {self.by}, agents: {list(self.settings)})"
+
+    def load(self, filename:str) -> list[Hero]:
+        """ Agents listed the same way as for the MultiAgentRunner """
+        with open(filename, "r") as stream:
+            try:
+                obj = safe_load(stream)
+            except YAMLError as exc:
+                print(exc)
+                print(f"Unable to read from file named {filename}")
+                return []
+        for agent in obj.get("agents", []):
+            hero:Hero = Hero()
+            if isinstance(agent, str):
+                hero.init_from_file(agent)
+                with open(agent, "r") as stream:
+                    agent = safe_load(stream)
+            else:
+                hero.init_from_dict(agent)
+            self.add(hero, agent)
+        return self.heroes
+
+    def add(self, hero:Hero, settings:dict) -> None:
+        """ Shard the ships of an agent, settings are what it was initialized from """
+        # workers must not register again, they get the token we ended up with
+        self.settings[hero.callsign] = {**settings, "token": hero.token}
+        self.heroes.append(hero)
+
+    def start(self) -> None:
+        """ Start the manager and the workers and hand out the ships """
+        self.manager = ShardManager(authkey=self.authkey)
+        self.manager.start()
+        for hero in self.heroes:
+            # a file shared limiter already keeps every process in line, other programs included
+            if not isinstance(hero.api.limiter, FileTokenBucket):
+                hero.api.limiter = RemoteLimiter(self.manager.limiter(hero.callsign))
+        units:list[ShardUnit] = self._units()
+        self.shards = max(min(self.shards, len(units)), 1)
+        self.reports = Queue()
+        for shard in range(self.shards):
+            commands:Queue = Queue()
+            process:Process = Process(target=run_shard, name=f"shard-{shard}", daemon=True,
+                                      args=(shard, self.settings, self.manager.address, self.authkey, commands, self.reports, self.poll, self.report_every))
+            process.start()
+            self.commands.append(commands)
+            self.processes.append(process)
+            self.units_by_shard[shard] = []
+        # biggest units first, each to the shard with the fewest ships so far
+        for unit in sorted(units, key=lambda u: -len(u.ships)):
+            shard:int = min(self.units_by_shard, key=lambda s: sum(len(u.ships) for u in self.units_by_shard[s]))
+            self._send(shard, "take", unit)
+        if self.debug:
+            print(f"Started {self.shards} shards for {len(units)} units")
+
+    def run(self, until:Callable[[], bool]|None=None) -> None:
+        """ Collect reports and rebalance until until() says to stop or Ctrl-C, then stop every shard """
+        rebalanced_at:float = monotonic()
+        try:
+            while not (until is not None and until()):
+                try:
+                    self._receive(self.reports.get(timeout=self.poll))
+                except Empty:
+                    pass
+                if monotonic() - rebalanced_at >= self.rebalance_every:
+                    self.rebalance()
+                    rebalanced_at = monotonic()
+        except KeyboardInterrupt:
+            print("Stopping shards")
+        finally:
+            self.stop()
+
+    def rebalance(self) -> ShardUnit|None:
+        """ Move one unit from the busiest shard to the idlest one if their loads are far enough apart """
+        if self.moving is not None or len(self.metrics) < 2:
+            return None
+        busiest:int = max(self.metrics, key=lambda s: self.metrics[s].load)
+        idlest:int = min(self.metrics, key=lambda s: self.metrics[s].load)
+        if self.metrics[busiest].load - self.metrics[idlest].load < self.imbalance or len(self.units_by_shard[busiest]) < 2:
+            return None
+        # the smallest unit evens things out with the least disruption
+        unit:ShardUnit = min(self.units_by_shard[busiest], key=lambda u: len(u.ships))
+        self.moving = unit
+        self.moving_to = idlest
+        self._send(busiest, "release", unit)
+        if self.debug:
+            print(f"Moving {unit} from shard {busiest} to shard {idlest}")
+        return unit
+
+    def stop(self) -> None:
+        for commands in self.commands:
+            commands.put(("stop", None))
+        for process in self.processes:
+            process.join(self.poll + self.report_every)
+            if process.is_alive():
+                process.terminate()
+        # reports sent while stopping
+        while self.reports is not None:
+            try:
+                self._receive(self.reports.get_nowait())
+            except Empty:
+                break
+        if self.manager is not None:
+            self.manager.shutdown()
+            self.manager = None
+
+    # Helper Methods
+
+    def _units(self) -> list[ShardUnit]:
+        units:list[ShardUnit] = []
+        for hero in self.heroes:
+            ships:list[str] = sorted(s.symbol for s in hero.get_my_ships())
+            if self.by == "agent":
+                units.append(ShardUnit(hero.callsign, tuple(ships)))
+            else:
+                units.extend(ShardUnit(hero.callsign, (s,)) for s in ships)
+        return [u for u in units if len(u.ships) > 0]
+
+    def _send(self, shard:int, command:str, unit:ShardUnit) -> None:
+        if command == "take":
+            self.units_by_shard[shard].append(unit)
+        self.commands[shard].put((command, unit))
+
+    def _receive(self, report:tuple) -> None:
+        kind, shard, unit, payload = report
+        match kind:
+            case "metrics":
+                self.metrics[shard] = payload.since(self.metrics.get(shard, None))
+            case "assigned":
+                if self.debug:
+                    print(f"Shard {shard} runs {unit}: {payload}")
+            case "released":
+                self.units_by_shard[shard].remove(unit)
+                if unit == self.moving:
+                    self._send(self.moving_to, "take", unit)
+                    self.moving = None
@@ -0,0 +1,151 @@
+from contextlib import contextmanager
+from json import dumps, loads
+from os import getpid, kill
+from os.path import join
+from tempfile import gettempdir
+from threading import Lock
+from time import time, sleep
+from typing import Iterator
+from models.rate_limiter import TokenBucket
+
+try:
+    import fcntl
+except ImportError:
+    # no fcntl on windows, every process keeps its own bucket there
+    fcntl = None
+
+class FileTokenBucket:
+    """
+    Token bucket shared by every process on the host that uses the same
+    file, say autominer.py and app.py playing the same agent. The bucket
+    lives in the file as json and is only read or written under flock, so
+    processes draw from one rate instead of each assuming it has it all.
+    Once the bucket is in debt a process holds at most max_ahead
+    reservations, and the waiting process holding the fewest goes next
+    (the longest waiting on ties), so a process with many threads cannot
+    queue up everything ahead of the others.
+    """
+    def __init__(self, path:str, rate:float=2.0, capacity:float=2.0, max_ahead:int=1, retry:float=0.05, stale_after:float=10.0) -> None:
+        self.path:str = path
+        self.rate:float = rate
+        self.capacity:float = capacity
+        self.max_ahead:int = max_ahead
+        self.retry:float = retry              # seconds between tries while others go first
+        self.stale_after:float = stale_after  # processes not heard of for that long are gone
+        self.pid:str = str(getpid())
+        self.acquired:int = 0
+        self.waited:float = 0.0
+        self._lock:Lock = Lock()  # flock does not keep threads of one process apart
+
+    def __str__(self) -> str:
+        return f"FileTokenBucket(path: {self.path}, rate: {self.rate}, capacity: {self.capacity}, acquired: {self.acquired}, waited: {self.waited:.1f})"
+
+    def reserve(self, tokens:float=1.0) -> float:
+        """ Take tokens once it is our turn, possibly going into debt, returns seconds to wait before using them """
+        while True:
+            delay:float|None = self._try_reserve(tokens)
+            if delay is not None:
+                self.acquired += 1
+                self.waited += delay
+                return delay
+            sleep(self.retry)
+
+    def acquire(self, tokens:float=1.0) -> float:
+        """ Block until tokens are available, returns seconds waited """
+        delay:float = self.reserve(tokens)
+        if delay > 0:
+            sleep(delay)
+        return delay
+
+    def penalize(self, seconds:float) -> None:
+        """ The server told one of us to back off, hold every process for that long """
+        with self._locked() as state:
+            self._refill(state, time())
+            state["tokens"] = min(state["tokens"], 0.0) - seconds * self.rate
+
+    # Helper Methods
+
+    def _try_reserve(self, tokens:float) -> float|None:
+        """ Seconds to wait if we got the tokens, None if another process goes first """
+        with self._locked() as state:
+            now:float = time()
+            self._refill(state, now)
+            processes:dict[str, dict] = state["processes"]
+            mine:dict = processes.setdefault(self.pid, {"slots": [], "waiting_since": None})
+            mine["seen"] = now
+            for process in processes.values():
+                process["slots"] = [s for s in process["slots"] if s > now]
+            if state["tokens"] - tokens < 0 and (len(mine["slots"]) >= self.max_ahead or not self._our_turn(processes, now)):
+                if mine["waiting_since"] is None:
+                    mine["waiting_since"] = now
+                return None
+            state["tokens"] -= tokens
+            delay:float = max(-state["tokens"] / self.rate, 0.0)
+            mine["waiting_since"] = None
+            if delay > 0:
+                mine["slots"].append(now + delay)
+            return delay
+
+    def _our_turn(self, processes:dict[str, dict], now:float) -> bool:
+        """ No other waiting process holds fewer reservations, or as many and waited longer """
+        mine:dict = processes[self.pid]
+        ours:tuple[int, float] = (len(mine["slots"]), mine["waiting_since"] or now)
+        for pid, process in list(processes.items()):
+            if pid == self.pid:
+                continue
+            if now - process.get("seen", 0.0) > self.stale_after or not self._alive(pid):
+                del processes[pid]
+                continue
+            if process["waiting_since"] is not None and (len(process["slots"]), process["waiting_since"]) < ours:
+                return False
+        return True
+
+    def _refill(self, state:dict, now:float) -> None:
+        # wall clock, the one clock every process agrees on, never refill backwards
+        state["tokens"] = min(self.capacity, state["tokens"] + max(now - state["updated_at"], 0.0) * self.rate)
+        state["updated_at"] = max(now, state["updated_at"])
+
+    def _alive(self, pid:str) -> bool:
+        try:
+            kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except (PermissionError, ValueError):
+            pass
+        return True
+
+    @contextmanager
+    def _locked(self) -> Iterator[dict]:
+        """ State of the bucket with the file locked, written back on the way out """
+        with self._lock, open(self.path, "a+") as stream:
+            fcntl.flock(stream, fcntl.LOCK_EX)
+            stream.seek(0)
+            raw:str = stream.read()
+            try:
+                state:dict = loads(raw) if raw else {}
+            except ValueError:
+                # half written by a process that died, start over
+                state = {}
+            state.setdefault("tokens", self.capacity)
+            state.setdefault("updated_at", time())
+            state.setdefault("processes", {})
+            yield state
+            stream.seek(0)
+            stream.truncate()
+            stream.write(dumps(state))
+            stream.flush()
+        # closing the file let go of the flock
+
+def default_limiter_file(callsign:str) -> str:
+    """ Processes playing the same agent end up on the same file """
+    return join(gettempdir(), f"spacetraders-{callsign or 'anonymous'}.limiter")
+
+def make_limiter(name:str="local", path:str="", callsign:str="", rate:float=2.0, capacity:float=2.0) -> TokenBucket|FileTokenBucket:
+    """ Rate limiter by name, shared falls back to local where there is no flock """
+    if name == "shared":
+        if fcntl is not None:
+            return FileTokenBucket(path or default_limiter_file(callsign), rate, capacity)
+        print("File locks are not available here, using a local rate limiter")
+    elif name != "local":
+        print(f"Unknown rate limiter {name}, using local")
+    return TokenBucket(rate, capacity)
@@ -1,7 +1,11 @@
 from datetime import datetime as dt
+from functools import cached_property
 from dataclasses import dataclass
 from models.location import Location
 from models.spacetrader import Spacetrader
+from models.contract import Contract
+from models.survey import Survey
+from models.events import EventBus, ShipUpdated, ShipNavChanged, ShipDeparted, CooldownStarted, CargoChanged, CargoFull, FuelChanged, ExtractionCompleted, ContractChanged, SurveysCreated, SurveyExhausted, MarketUpdated
 from enum import Enum
 
 @dataclass
@@ -183,26 +187,39 @@ class FlightMode(Enum):
     STEALTH = 4 # Difficult to detect, regular fuel usage, slow speed, use to avoid enemies
 
 class Market:
-    """ Market """
+    """ Market, exports, imports and the rest are built from the raw market on first use """
+    RAW_FIELDS:tuple[str, ...] = ("exports", "imports", "exchanges", "transactions", "trade_goods")
+
     def __init__(self) -> None:
         self.symbol:str = ""
-        self.exports:list[Export] = []
-        self.imports:list[Import] = []
-        self.exchanges:list[Exchange] = []
-        self.transactions:list[Transaction] = []
-        self.trade_goods:list[TradeGood] = []
+        self.raw:dict = {}
 
     def __str__(self) -> str:
         return f"Market(symbol: {self.symbol}, exports: {self.exports}, imports: {self.imports}, exchanges: {self.exchanges}, transactions: {self.transactions}, trade_goods: {self.trade_goods}"
 
     def parse_market(self, raw:dict) -> Market:
-        exports:list[Export] = list(map(lambda x: Export(x["symbol"], x["name"], x["description"]), raw.get("exports", [])))
-        imports:list[Import] = list(map(lambda x: Import(x["symbol"], x["name"], x["description"]), raw.get("imports", [])))
-        exchanges:list[Exchange] = list(map(lambda x: Exchange(x["symbol"], x["name"], x["description"]), raw.get("exchange", [])))
-        transactions:list[Transaction] = []
-        trade_goods:list[TradeGood] = []
+        self.symbol = raw["symbol"]
+        self.raw = raw
+        for field in Market.RAW_FIELDS:
+            self.__dict__.pop(field, None)
+        return self
+
+    @cached_property
+    def exports(self) -> list[Export]:
+        return list(map(lambda x: Export(x["symbol"], x["name"], x["description"]), self.raw.get("exports", [])))
+
+    @cached_property
+    def imports(self) -> list[Import]:
+        return list(map(lambda x: Import(x["symbol"], x["name"], x["description"]), self.raw.get("imports", [])))
 
-        for raw_transaction in raw.get("transactions", []):
+    @cached_property
+    def exchanges(self) -> list[Exchange]:
+        return list(map(lambda x: Exchange(x["symbol"], x["name"], x["description"]), self.raw.get("exchange", [])))
+
+    @cached_property
+    def transactions(self) -> list[Transaction]:
+        transactions:list[Transaction] = []
+        for raw_transaction in self.raw.get("transactions", []):
             transactions.append(Transaction(
                 raw_transaction["waypointSymbol"],
                 raw_transaction["shipSymbol"],
@@ -213,8 +230,12 @@ class Market:
                 raw_transaction["totalPrice"],
                 raw_transaction["timestamp"],
             ))
+        return transactions
 
-        for raw_good in raw.get("tradeGoods", []):
+    @cached_property
+    def trade_goods(self) -> list[TradeGood]:
+        trade_goods:list[TradeGood] = []
+        for raw_good in self.raw.get("tradeGoods", []):
             trade_goods.append(TradeGood(
                 raw_good["symbol"],
                 raw_good["type"],
@@ -223,23 +244,32 @@ class Market:
                 raw_good["purchasePrice"],
                 raw_good["sellPrice"],
             ))
-
-        self.symbol = raw["symbol"]
-        self.exports = exports
-        self.imports = imports
-        self.exchanges = exchanges
-        self.transactions = transactions
-        self.trade_goods = trade_goods
-        return self
+        return trade_goods
 
 
 class Ship:
     """ Ship """
-    def __init__(self, api:Spacetrader, ship:dict[str, any]) -> None:
+    # fields compared when a refresh comes in, in the order they are reported
+    DIFF_FIELDS:tuple[str, ...] = ("name", "faction", "role", "nav", "cooldown", "crew", "cargo", "fuel", "frame", "reactor", "engine", "modules", "mounts")
+    # fields built lazily from the raw ship under the same key
+    COOLDOWN_ERROR:int = 4000
+    RAW_FIELDS:tuple[str, ...] = ("nav", "cooldown", "crew", "cargo", "fuel", "frame", "reactor", "engine", "modules", "mounts")
+
+    def __init__(self, api:Spacetrader, ship:dict[str, any], events:EventBus|None=None) -> None:
         self.api = api
+        self.events:EventBus|None = events
+        self.last_error:dict|None = None  # error of the last extraction, None if it went through
         self.parse_ship(ship)
 
     def parse_ship(self, ship:dict[str, any]) -> None:
+        """
+        Keep the raw ship and build its records on first use, nav, cargo
+        and the rest are parsed only if asked for and then cached.
+        """
+        self.raw:dict[str, any] = dict(ship)
+        for field in Ship.RAW_FIELDS:
+            # drop what was built from the previous raw ship
+            self.__dict__.pop(field, None)
         self.name:str = ship.get("name", "")
         self.faction:str = ship.get("factionSymbol", "")
         self.role:str = ship.get("role", "")
@@ -251,57 +281,78 @@ class Ship:
             self.role:str = registration.get("role", "")
 
         self.symbol:str = ship["symbol"]
-        self.nav = self._create_nav(ship["nav"])
-        self.crew = ShipCrew(
-                ship["crew"]["current"],
-                ship["crew"]["capacity"],
-                ship["crew"]["required"],
-                ship["crew"]["rotation"],
-                ship["crew"]["morale"],
-                ship["crew"]["wages"])
-
-        self.cargo = ShipCargo(
-                ship["cargo"]["capacity"],
-                ship["cargo"]["units"],
-                list(map(lambda i: ShipCargoItem(i["symbol"], i["name"], i["description"], i["units"]), ship["cargo"]["inventory"])))
-
-        self.fuel = ShipFuel(
-                ship["fuel"]["current"],
-                ship["fuel"]["capacity"],
-                ship["fuel"]["consumed"]["amount"],
-                ship["fuel"]["consumed"]["timestamp"])
-
-        self.frame = ShipFrame(
-                ship["frame"]["symbol"],
-                ship["frame"]["name"],
-                ship["frame"]["description"],
-                ship["frame"]["moduleSlots"],
-                ship["frame"]["mountingPoints"],
-                ship["frame"]["fuelCapacity"],
-                ship["frame"]["condition"],
-                ship["frame"]["requirements"]["power"],
-                ship["frame"]["requirements"]["crew"])
-
-        self.reactor = ShipReactor(
-                ship["reactor"]["symbol"],
-                ship["reactor"]["name"],
-                ship["reactor"]["description"],
-                ship["reactor"]["condition"],
-                ship["reactor"]["powerOutput"],
-                ship["reactor"]["requirements"]["crew"])
-
-        self.engine = ShipEngine(
-                ship["engine"]["symbol"],
-                ship["engine"]["name"],
-                ship["engine"]["description"],
-                ship["engine"]["condition"],
-                ship["engine"]["speed"],
-                ship["engine"]["requirements"]["power"],
-                ship["engine"]["requirements"]["crew"])
-
-        self.modules = list(map(lambda m: ShipModule(m["symbol"], m["name"], m["description"], m.get("capacity", 0), m["requirements"]["power"], m["requirements"]["crew"], m["requirements"]["slots"]), ship["modules"]))
-
-        self.mounts = list(map(lambda m: ShipMount(m["symbol"], m["name"], m["description"], m["strength"], m["requirements"]["power"], m["requirements"]["crew"]), ship["mounts"]))
+
+    @cached_property
+    def nav(self) -> ShipNav:
+        return self._create_nav(self.raw["nav"])
+
+    @cached_property
+    def cooldown(self) -> ShipCooldown|None:
+        return self._create_cooldown(self.raw.get("cooldown", {}))
+
+    @cached_property
+    def crew(self) -> ShipCrew:
+        crew:dict = self.raw["crew"]
+        return ShipCrew(
+                crew["current"],
+                crew["capacity"],
+                crew["required"],
+                crew["rotation"],
+                crew["morale"],
+                crew["wages"])
+
+    @cached_property
+    def cargo(self) -> ShipCargo:
+        return self._create_cargo(self.raw["cargo"])
+
+    @cached_property
+    def fuel(self) -> ShipFuel:
+        return self._create_fuel(self.raw["fuel"])
+
+    @cached_property
+    def frame(self) -> ShipFrame:
+        frame:dict = self.raw["frame"]
+        return ShipFrame(
+                frame["symbol"],
+                frame["name"],
+                frame["description"],
+                frame["moduleSlots"],
+                frame["mountingPoints"],
+                frame["fuelCapacity"],
+                frame["condition"],
+                frame["requirements"]["power"],
+                frame["requirements"]["crew"])
+
+    @cached_property
+    def reactor(self) -> ShipReactor:
+        reactor:dict = self.raw["reactor"]
+        return ShipReactor(
+                reactor["symbol"],
+                reactor["name"],
+                reactor["description"],
+                reactor["condition"],
+                reactor["powerOutput"],
+                reactor["requirements"]["crew"])
+
+    @cached_property
+    def engine(self) -> ShipEngine:
+        engine:dict = self.raw["engine"]
+        return ShipEngine(
+                engine["symbol"],
+                engine["name"],
+                engine["description"],
+                engine["condition"],
+                engine["speed"],
+                engine["requirements"]["power"],
+                engine["requirements"]["crew"])
+
+    @cached_property
+    def modules(self) -> list[ShipModule]:
+        return list(map(lambda m: ShipModule(m["symbol"], m["name"], m["description"], m.get("capacity", 0), m["requirements"]["power"], m["requirements"]["crew"], m["requirements"]["slots"]), self.raw["modules"]))
+
+    @cached_property
+    def mounts(self) -> list[ShipMount]:
+        return list(map(lambda m: ShipMount(m["symbol"], m["name"], m["description"], m["strength"], m["requirements"]["power"], m["requirements"]["crew"]), self.raw["mounts"]))
 
     def __str__(self) -> str:
         return f"Ship(name: {self.name}, faction: {self.faction}, role: {self.role}, symbol: {self.symbol}, nav: {self.nav}, crew: {self.crew}, cargo: {self.cargo}, fuel: {self.fuel}, frame: {self.frame}, modules: {list(map(lambda m: m.__str__(), self.modules))}), mounts: {list(map(lambda m: m.__str__(), self.mounts))})"
@@ -331,6 +382,46 @@ class Ship:
         flight_mode:str = ship_nav["flightMode"]
         return ShipNav(system, waypoint, ship_route, status, flight_mode)
 
+    def _create_cargo(self, raw_cargo:dict) -> ShipCargo:
+        return ShipCargo(
+                raw_cargo["capacity"],
+                raw_cargo["units"],
+                list(map(lambda i: ShipCargoItem(i["symbol"], i["name"], i["description"], i["units"]), raw_cargo["inventory"])))
+
+    def _create_fuel(self, raw_fuel:dict) -> ShipFuel:
+        return ShipFuel(
+                raw_fuel["current"],
+                raw_fuel["capacity"],
+                raw_fuel["consumed"]["amount"],
+                raw_fuel["consumed"]["timestamp"])
+
+    def _create_cooldown(self, raw_cooldown:dict) -> ShipCooldown|None:
+        if not raw_cooldown.get("expiration"):
+            return None
+        return ShipCooldown(
+                raw_cooldown["shipSymbol"],
+                raw_cooldown["totalSeconds"],
+                raw_cooldown["remainingSeconds"],
+                dt.fromisoformat(raw_cooldown["expiration"]))
+
+    def seconds_until_ready(self) -> float:
+        """ Seconds until the cooldown expires, measured against server time """
+        if self.cooldown is None:
+            return 0.0
+        return max(self.api.clock.seconds_until(self.cooldown.expiration), 0.0)
+
+    def seconds_until_arrival(self) -> float:
+        """ Seconds until the current route arrives, measured against server time """
+        return max(self.api.clock.seconds_until(self.nav.route.arrival_at), 0.0)
+
+    def has_arrived(self) -> bool:
+        """ Indicates if the current route has arrived """
+        return self.api.clock.has_passed(self.nav.route.arrival_at)
+
+    def arrive(self) -> ShipNav:
+        """ Account for an arrival the server makes on its own, ships come out of transit in orbit """
+        return self._update_nav(dict(self.raw["nav"], status="IN_ORBIT"))
+
     def is_docked(self) -> bool:
         """ Tells if ship is docked """
         return self.nav.status == "DOCKED"
@@ -342,42 +433,70 @@ class Ship:
     def orbit(self) -> ShipNav:
         """ Bring ship into orbit """
         resp = self.api.post_auth(f"my/ships/{self.symbol}/orbit")["data"]
-        return self._create_nav(resp["nav"])
+        return self._update_nav(resp["nav"])
 
     def fly(self, destination_waypoint_symbol:str) -> ShipNav:
         """ Fly ship """
         try:
             resp = self.api.post_auth(f"my/ships/{self.symbol}/navigate", {"waypointSymbol": destination_waypoint_symbol})["data"]
-            return self._create_nav(resp["nav"])
+            nav:ShipNav = self._update_nav(resp["nav"])
+            if "fuel" in resp:
+                self._update_fuel(resp["fuel"])
+            self._publish(ShipDeparted(self.symbol, nav.route.destination.symbol, nav.route.arrival_at))
+            return nav
         except Exception as e:
             # catching the common mistake of flying without orbiting first
             print(e)
 
+    def jump(self, waypoint_symbol:str) -> ShipNav|None:
+        """
+        Jump to the jump gate of another system, the gate must be connected to the one we orbit.
+        The ship is there at once but its reactor cools down.
+        """
+        try:
+            resp = self.api.post_auth(f"my/ships/{self.symbol}/jump", {"waypointSymbol": waypoint_symbol})["data"]
+            nav:ShipNav = self._update_nav(resp["nav"])
+            self._update_cooldown(resp["cooldown"])
+            return nav
+        except Exception as e:
+            print(e)
+            return None
+
+    def warp(self, waypoint_symbol:str) -> ShipNav|None:
+        """ Warp to a waypoint of another system, needs a warp drive and burns fuel like flying """
+        try:
+            resp = self.api.post_auth(f"my/ships/{self.symbol}/warp", {"waypointSymbol": waypoint_symbol})["data"]
+            nav:ShipNav = self._update_nav(resp["nav"])
+            if "fuel" in resp:
+                self._update_fuel(resp["fuel"])
+            self._publish(ShipDeparted(self.symbol, nav.route.destination.symbol, nav.route.arrival_at))
+            return nav
+        except Exception as e:
+            print(e)
+            return None
+
+    def has_warp_drive(self) -> bool:
+        return any(m.symbol.startswith("MODULE_WARP_DRIVE") for m in self.modules)
+
     def dock(self) -> ShipNav:
         """ Dock ship """
         resp = self.api.post_auth(f"my/ships/{self.symbol}/dock")["data"]
-        return self._create_nav(resp["nav"])
+        return self._update_nav(resp["nav"])
 
     def update_flight_mode(self, flight_mode:FlightMode) -> ShipNav:
         """ Update flight mode """
         resp = self.api.patch_auth(f"my/ships/{self.symbol}/nav", {"flightMode": flight_mode.name})["data"]
-        return self._create_nav(resp)
+        return self._update_nav(resp)
 
     def get_flight_mode(self) -> ShipNav:
         """ Get flight mode """
         resp = self.api.get_auth(f"my/ships/{self.symbol}/nav")["data"]
-        return self._create_nav(resp)
+        return self._update_nav(resp)
 
     def refuel(self) -> dict:
         """ Refuel ship """
         resp = self.api.post_auth(f"my/ships/{self.symbol}/refuel")["data"]
-        raw_fuel = resp["fuel"]
-        fuel:ShipFuel = ShipFuel(
-            raw_fuel["current"],
-            raw_fuel["capacity"],
-            raw_fuel["consumed"]["amount"],
-            raw_fuel["consumed"]["timestamp"],
-        )
+        fuel:ShipFuel = self._update_fuel(resp["fuel"])
         raw_transaction = resp["transaction"]
         transaction:Transaction = Transaction(
             raw_transaction["waypointSymbol"],
@@ -391,28 +510,59 @@ class Ship:
         )
         return { "agent": resp["agent"], "fuel": fuel, "transaction": transaction }
 
-    def mine(self) -> dict:
+    def survey(self) -> list[Survey]:
+        """ Survey the current waypoint, surveys make extractions favor their deposits """
+        try:
+            resp = self.api.post_auth(f"my/ships/{self.symbol}/survey")["data"]
+            surveys:list[Survey] = list(map(lambda s: Survey(
+                    s["signature"],
+                    s["symbol"],
+                    list(map(lambda d: d["symbol"], s["deposits"])),
+                    dt.fromisoformat(s["expiration"]),
+                    s["size"],
+                    s), resp["surveys"]))
+            self._update_cooldown(resp["cooldown"])
+            self._publish(SurveysCreated(self.symbol, surveys))
+            return surveys
+        except Exception as e:
+            print(e)
+            return []
+
+    def mining_strength(self) -> int:
+        """ Total strength of the mining lasers, 0 if the ship can't mine """
+        return sum(m.strength for m in self.mounts if m.symbol.startswith("MOUNT_MINING_LASER"))
+
+    def has_surveyor(self) -> bool:
+        """ Indicates if the ship can survey """
+        return any(m.symbol.startswith("MOUNT_SURVEYOR") for m in self.mounts)
+
+    def mine(self, survey:Survey|None=None) -> dict:
         """ Mine resources, returns what is left on the asteroid or whatever we are mining """
+        self.last_error = None
         try:
-            resp = self.api.post_auth(f"my/ships/{self.symbol}/extract")["data"]
+            if survey is None:
+                resp = self.api.post_auth(f"my/ships/{self.symbol}/extract")
+            else:
+                resp = self.api.post_auth(f"my/ships/{self.symbol}/extract/survey", survey.raw)
+                # 4221 survey expired, 4224 survey exhausted
+                if resp.get("error", {}).get("code", 0) in (4221, 4224):
+                    self._publish(SurveyExhausted(survey.signature))
+            self.last_error = resp.get("error", None)
+            if self.last_error is not None and self.last_error.get("code", 0) == Ship.COOLDOWN_ERROR:
+                # still cooling down, the error says until when
+                cooldown:dict|None = self.last_error.get("data", {}).get("cooldown", None)
+                if cooldown is not None:
+                    self._update_cooldown(cooldown)
+            resp = resp["data"]
             raw_extraction = resp["extraction"]
-            raw_cooldown = resp["cooldown"]
-            raw_cargo = resp["cargo"]
             extraction:ShipExtraction = ShipExtraction(
                     raw_extraction["shipSymbol"],
                     raw_extraction["yield"]["symbol"],
                     raw_extraction["yield"]["units"],
             )
-            cooldown:ShipCooldown = ShipCooldown(
-                    raw_cooldown["shipSymbol"],
-                    raw_cooldown["totalSeconds"],
-                    raw_cooldown["remainingSeconds"],
-                    raw_cooldown["expiration"],
-            )
-            cargo:ShipCargo = ShipCargo(
-                    raw_cargo["capacity"],
-                    raw_cargo["units"],
-                    list(map(lambda i: ShipCargoItem(i["symbol"], i["name"], i["description"], i["units"]), raw_cargo["inventory"])))
+            cooldown:ShipCooldown|None = self._update_cooldown(resp["cooldown"])
+            cargo:ShipCargo = self._update_cargo(resp["cargo"])
+            self._publish(ExtractionCompleted(self.symbol, extraction, cooldown, survey.signature if survey is not None else None))
             return {
                 "extraction": extraction,
                 "cooldown": cooldown,
@@ -421,31 +571,48 @@ class Ship:
                 "modifiers": resp["modifiers"],
             }
         except Exception as e:
-            print(e)
+            if self.last_error is None:
+                self.last_error = {"message": str(e)}
+            print(self.last_error.get("message", e))
 
     def dump_cargo(self, cargo_symbol:str, units:int) -> ShipCargo:
         """ Jettison cargo to make room """
         ship = self.api.post_auth(f"my/ships/{self.symbol}/jettison", {"symbol": cargo_symbol, "units": units})["data"]
-        self.cargo = ShipCargo(
-                ship["cargo"]["capacity"],
-                ship["cargo"]["units"],
-                list(map(lambda i: ShipCargoItem(i["symbol"], i["name"], i["description"], i["units"]), ship["cargo"]["inventory"])))
-        return self.cargo
+        return self._update_cargo(ship["cargo"])
 
     def get_cargo(self) -> ShipCargo:
         """ Get Cargo """
         cargo = self.api.get_auth(f"my/ships/{self.symbol}/cargo")["data"]
-        self.cargo = ShipCargo(
-                cargo["capacity"],
-                cargo["units"],
-                list(map(lambda i: ShipCargoItem(i["symbol"], i["name"], i["description"], i["units"]), cargo["inventory"])))
-        return self.cargo
+        return self._update_cargo(cargo)
+
+    def transfer_cargo(self, to_ship:Ship, trade_symbol:str, units:int) -> ShipCargo|None:
+        """ Hand cargo to another ship at the same waypoint and in the same nav status """
+        try:
+            resp = self.api.post_auth(f"my/ships/{self.symbol}/transfer", {"tradeSymbol": trade_symbol, "units": units, "shipSymbol": to_ship.symbol})["data"]
+            item:ShipCargoItem = next((i for i in self.cargo.inventory if i.symbol == trade_symbol), ShipCargoItem(trade_symbol, trade_symbol, "", 0))
+            cargo:ShipCargo = self._update_cargo(resp["cargo"])
+            to_ship.receive_cargo(item, units)
+            return cargo
+        except Exception as e:
+            print(e)
+            return None
+
+    def receive_cargo(self, item:ShipCargoItem, units:int) -> ShipCargo:
+        """ Account for cargo another ship transferred to us, the server does not send our hold back """
+        inventory:list[ShipCargoItem] = [ShipCargoItem(i.symbol, i.name, i.description, i.units) for i in self.cargo.inventory]
+        matching:ShipCargoItem|None = next((i for i in inventory if i.symbol == item.symbol), None)
+        if matching is None:
+            inventory.append(ShipCargoItem(item.symbol, item.name, item.description, units))
+        else:
+            matching.units += units
+        return self._set_cargo(ShipCargo(self.cargo.capacity, self.cargo.units + units, inventory))
 
     def get_market(self) -> Market:
         """ View Market, only works if we are at an asteroid field """
         raw = self.api.get_auth(f"systems/{self.nav.system}/waypoints/{self.nav.waypoint.waypoint}/market")["data"]
         market:Market = Market()
         market.parse_market(raw)
+        self._publish(MarketUpdated(market))
         return market
 
     def sell_all_cargo(self, except_symbols:list[str]=[]) -> None:
@@ -455,11 +622,8 @@ class Ship:
                 self.api.post_auth(f"my/ships/{self.symbol}/sell", {"symbol": c.symbol, "units": c.units})
 
     def sell_cargo(self, cargo_symbol:str, units:int) -> dict:
-        resp = self.api.post_auth(f"my/ships/{self.symbol}/sell", {"symbol": cargo_symbol, "units": units})
-        cargo:ShipCargo = ShipCargo(
-                resp["cargo"]["capacity"],
-                resp["cargo"]["units"],
-                list(map(lambda i: ShipCargoItem(i["symbol"], i["name"], i["description"], i["units"]), resp["cargo"]["inventory"])))
+        resp = self.api.post_auth(f"my/ships/{self.symbol}/sell", {"symbol": cargo_symbol, "units": units})["data"]
+        cargo:ShipCargo = self._update_cargo(resp["cargo"])
         raw_transaction = resp["transaction"]
         transaction:Transaction = Transaction(
             raw_transaction["waypointSymbol"],
@@ -503,16 +667,107 @@ class Ship:
         Only works if you're there.
         """
         resp = self.api.post_auth(f"my/contracts/{contract_id}/deliver", {"shipSymbol": self.symbol, "tradeSymbol": trade_symbol, "units": units})["data"]
-        cargo:ShipCargo = ShipCargo(
-                resp["cargo"]["capacity"],
-                resp["cargo"]["units"],
-                list(map(lambda i: ShipCargoItem(i["symbol"], i["name"], i["description"], i["units"]), resp["cargo"]["inventory"])))
+        cargo:ShipCargo = self._update_cargo(resp["cargo"])
+        self._publish(ContractChanged(Contract(resp["contract"])))
         return {
             "contract": resp["contract"],
             "cargo": cargo
         }
 
+    def negotiate_contract(self) -> Contract|None:
+        """
+        Negotiate a new contract with the faction of the waypoint.
+        Only works if you're docked somewhere the faction is present.
+        """
+        try:
+            resp = self.api.post_auth(f"my/ships/{self.symbol}/negotiate/contract")["data"]
+            contract:Contract = Contract(resp["contract"])
+            self._publish(ContractChanged(contract))
+            return contract
+        except Exception as e:
+            print(e)
+            return None
+
     def refresh(self) -> None:
         """ Refresh this data """
         resp = self.api.get_auth(f"my/ships/{self.symbol}")["data"]
-        self.parse_ship(resp)
+        self.update(resp)
+
+    def update(self, ship:dict[str, any]) -> list[str]:
+        """
+        Update this ship in place from a fresh snapshot.
+        Only fields that actually changed are replaced and published,
+        returns the names of the changed fields.
+        """
+        fresh:Ship = Ship(self.api, ship)
+        changed:list[str] = []
+        for field in Ship.DIFF_FIELDS:
+            if field in Ship.RAW_FIELDS and field in self.raw and self.raw[field] == fresh.raw.get(field, None):
+                # same raw record, nothing to build or compare
+                continue
+            if field == "cooldown":
+                # remaining seconds tick down every refresh, only a new expiration is a change
+                same:bool = (self.cooldown.expiration if self.cooldown else None) == (fresh.cooldown.expiration if fresh.cooldown else None)
+            else:
+                same = getattr(self, field) == getattr(fresh, field)
+            if not same:
+                setattr(self, field, getattr(fresh, field))
+                if field in Ship.RAW_FIELDS:
+                    self.raw[field] = fresh.raw.get(field, None)
+                changed.append(field)
+
+        if "nav" in changed:
+            self._publish(ShipNavChanged(self.symbol, self.nav))
+            if self.nav.status == "IN_TRANSIT":
+                self._publish(ShipDeparted(self.symbol, self.nav.route.destination.symbol, self.nav.route.arrival_at))
+        if "cooldown" in changed and self.cooldown is not None:
+            self._publish(CooldownStarted(self.symbol, self.cooldown))
+        if "fuel" in changed:
+            self._publish(FuelChanged(self.symbol, self.fuel))
+        if "cargo" in changed:
+            self._publish(CargoChanged(self.symbol, self.cargo))
+            if self.cargo.is_full():
+                self._publish(CargoFull(self.symbol, self.cargo))
+        if changed:
+            self._publish(ShipUpdated(self.symbol, changed))
+        return changed
+
+    # Helper Methods
+
+    def _publish(self, event:object) -> None:
+        if self.events is not None:
+            self.events.publish(event)
+
+    def _update_nav(self, raw_nav:dict) -> ShipNav:
+        self.raw["nav"] = raw_nav
+        self.nav = self._create_nav(raw_nav)
+        self._publish(ShipNavChanged(self.symbol, self.nav))
+        return self.nav
+
+    def _update_fuel(self, raw_fuel:dict) -> ShipFuel:
+        self.raw["fuel"] = raw_fuel
+        self.fuel = self._create_fuel(raw_fuel)
+        self._publish(FuelChanged(self.symbol, self.fuel))
+        return self.fuel
+
+    def _update_cooldown(self, raw_cooldown:dict) -> ShipCooldown|None:
+        self.raw["cooldown"] = raw_cooldown
+        self.cooldown = self._create_cooldown(raw_cooldown)
+        if self.cooldown is not None:
+            self._publish(CooldownStarted(self.symbol, self.cooldown))
+        return self.cooldown
+
+    def _update_cargo(self, raw_cargo:dict) -> ShipCargo:
+        return self._set_cargo(self._create_cargo(raw_cargo), raw_cargo)
+
+    def _set_cargo(self, cargo:ShipCargo, raw_cargo:dict|None=None) -> ShipCargo:
+        if raw_cargo is None:
+            # built by hand, the raw cargo no longer says what is in the hold
+            self.raw.pop("cargo", None)
+        else:
+            self.raw["cargo"] = raw_cargo
+        self.cargo = cargo
+        self._publish(CargoChanged(self.symbol, self.cargo))
+        if self.cargo.is_full():
+            self._publish(CargoFull(self.symbol, self.cargo))
+        return self.cargo
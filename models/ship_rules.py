@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+from models.ship import Ship
+
+@dataclass
+class ShipRule:
+    """ What a ship matching role, ship type and frame should do, empty matches anything """
+    strategy:str
+    role:str = ""
+    ship_type:str = ""
+    frame:str = ""
+
+    def matches(self, ship:Ship, ship_type:str="") -> bool:
+        return ((self.role == "" or self.role == ship.role) and
+                (self.ship_type == "" or self.ship_type == ship_type) and
+                (self.frame == "" or self.frame == ship.frame.symbol))
+
+class ShipRules:
+    """ First matching rule decides what a new ship does, idle if none match """
+    MINE:str = "mine"
+    IDLE:str = "idle"
+
+    def __init__(self, rules:list[ShipRule]=[]) -> None:
+        self.rules:list[ShipRule] = rules or [ShipRule(ShipRules.MINE, role="EXCAVATOR")]
+
+    def __str__(self) -> str:
+        return f"ShipRules(rules: {self.rules})"
+
+    @staticmethod
+    def from_list(raw:list[dict]) -> ShipRules:
+        """ Rules as written in data.yaml under ship_rules """
+        return ShipRules(list(map(lambda r: ShipRule(r["strategy"], r.get("role", ""), r.get("ship_type", ""), r.get("frame", "")), raw)))
+
+    def strategy_for(self, ship:Ship, ship_type:str="") -> str:
+        rule:ShipRule|None = next((r for r in self.rules if r.matches(ship, ship_type)), None)
+        return rule.strategy if rule is not None else ShipRules.IDLE
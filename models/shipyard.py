@@ -1,12 +1,41 @@
+from dataclasses import dataclass
+
+@dataclass
+class ShipyardShip:
+    """ Ship for sale, only listed when one of our ships is at the shipyard """
+    ship_type:str
+    name:str
+    supply:str
+    purchase_price:int
+    frame:str
+    speed:int
+    mining_strength:int
+    cargo_capacity:int
+
 class Shipyard:
     """ Shipyard with ships """
 
     def __init__(self, from_api:dict[str, any]) -> None:
         self.symbol:str = from_api['symbol']
+        self.raw:dict[str, any] = from_api
         self.modifications_fee:int = from_api['modificationsFee']
         self.ship_types:list[str] = []
         for ship_type in from_api["shipTypes"]:
             self.ship_types.append(ship_type["type"])
+        self.ships:list[ShipyardShip] = list(map(lambda s: ShipyardShip(
+            s["type"],
+            s["name"],
+            s.get("supply", ""),
+            s["purchasePrice"],
+            s["frame"]["symbol"],
+            s["engine"]["speed"],
+            sum(m.get("strength", 0) for m in s["mounts"] if m["symbol"].startswith("MOUNT_MINING_LASER")),
+            sum(m.get("capacity", 0) for m in s["modules"] if m["symbol"].startswith("MODULE_CARGO_HOLD")),
+        ), from_api.get("ships", [])))
+
+    def price(self, ship_type:str) -> int|None:
+        """ Price of a ship type, None if not seen """
+        return next((s.purchase_price for s in self.ships if s.ship_type == ship_type), None)
 
     def __str__(self) -> str:
         return f"Shipyard(symbol: {self.symbol}, modifications_fee: {self.modifications_fee}, ship_types: {'-'.join(self.ship_types)}"
@@ -0,0 +1,44 @@
+from datetime import datetime as dt
+from models.shipyard import Shipyard, ShipyardShip
+
+class ShipyardCache:
+    """ Last seen offering of every shipyard, with prices per ship type """
+    def __init__(self) -> None:
+        self.shipyards_by_symbol:dict[str, Shipyard] = {}
+        self.updated_at_by_symbol:dict[str, dt] = {}
+        self.waypoints_by_type:dict[str, set[str]] = {}        # ship type -> shipyards selling it
+        self.prices_by_type:dict[str, dict[str, int]] = {}     # ship type -> shipyard -> price
+        self.ships_by_type:dict[str, ShipyardShip] = {}        # ship type -> last listing seen
+
+    def __len__(self) -> int:
+        return len(self.shipyards_by_symbol)
+
+    def __str__(self) -> str:
+        return f"ShipyardCache(shipyards: {len(self)}, ship types: {len(self.waypoints_by_type)})"
+
+    def update(self, shipyard:Shipyard, at:dt|None=None) -> None:
+        """ Remember a shipyard, prices only come with it when a ship is there """
+        previous:Shipyard|None = self.shipyards_by_symbol.get(shipyard.symbol, None)
+        if len(shipyard.ships) == 0 and previous is not None:
+            # keep the last prices we saw rather than forgetting them
+            shipyard.ships = previous.ships
+        self.shipyards_by_symbol[shipyard.symbol] = shipyard
+        if at is not None:
+            self.updated_at_by_symbol[shipyard.symbol] = at
+        for ship_type in shipyard.ship_types:
+            self.waypoints_by_type.setdefault(ship_type, set()).add(shipyard.symbol)
+        ship:ShipyardShip
+        for ship in shipyard.ships:
+            self.prices_by_type.setdefault(ship.ship_type, {})[shipyard.symbol] = ship.purchase_price
+            self.ships_by_type[ship.ship_type] = ship
+
+    def ship_types(self) -> list[str]:
+        return sorted(self.waypoints_by_type)
+
+    def cheapest(self, ship_type:str, systems:set[str]|None=None) -> tuple[str, int]|None:
+        """ Shipyard selling ship_type the cheapest and the price, optionally only in some systems """
+        prices:dict[str, int] = {w: p for w, p in self.prices_by_type.get(ship_type, {}).items() if systems is None or "-".join(w.split("-")[0:2]) in systems}
+        if len(prices) == 0:
+            return None
+        waypoint:str = min(prices, key=prices.get)
+        return (waypoint, prices[waypoint])
@@ -1,12 +1,59 @@
-import http.client
-from json import dumps, loads
+import zlib
+from os import remove, replace
+from os.path import exists
+from contextlib import contextmanager
+from threading import Lock, get_ident
+from time import time, perf_counter
+from models.codec import JsonCodec, WireStats, ACCEPT_ENCODING, get_codec, decompress
+from models.clock import ServerClock
+from models.rate_limiter import TokenBucket
+from models.transport import Transport, TransportResponse, Http1Transport
+
+class AgentLock:
+    """
+    Lock several agents in one process take turns on, a bit like the GIL:
+    their code runs holding it and API calls let it go while they wait on
+    the rate limiter and the network. It knows which thread holds it so
+    helper threads (the crawler's) never let go of someone else's turn.
+    """
+    def __init__(self) -> None:
+        self._lock:Lock = Lock()
+        self._owner:int|None = None
+
+    def __enter__(self) -> AgentLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def acquire(self) -> None:
+        self._lock.acquire()
+        self._owner = get_ident()
+
+    def release(self) -> None:
+        self._owner = None
+        self._lock.release()
+
+    def held(self) -> bool:
+        """ Held by the calling thread """
+        return self._owner == get_ident()
 
 class Spacetrader:
     """ Represents the spacetracer API """
-    def __init__(self, token:str, account_token:str, debug:bool=False) -> None:
+    def __init__(self, token:str, account_token:str, debug:bool=False, transport:Transport|None=None) -> None:
         self.token = token
         self.account_token = account_token
         self.debug = debug
+        self.clock:ServerClock = ServerClock()
+        self.limiter:TokenBucket = TokenBucket()
+        self.max_retries:int = 3
+        self.codec:JsonCodec = get_codec()
+        self.compression:bool = True  # ask for gzip or deflate responses
+        self.wire_stats:WireStats = WireStats()
+        self.transport:Transport = transport if transport is not None else Http1Transport()
+        # held by whoever runs this agent's code, let go while waiting on the network (see MultiAgentRunner)
+        self.shared_lock:AgentLock|None = None
 
     def get_auth(self, path:str, data:dict = {}) -> dict:
         return self._call_endpoint("GET", True, path, data)
@@ -23,37 +70,114 @@ class Spacetrader:
     def patch_auth(self, path:str, data:dict = {}) -> dict:
         return self._call_endpoint("PATCH", True, path, data)
 
+    def download(self, path:str, filename:str, chunk_size:int=1 << 16) -> int:
+        """ Stream a large response straight to a file without decoding it, returns bytes written """
+        with self._released():
+            return self._download(path, filename, chunk_size)
+
     # Helper Methods
 
+    def _download(self, path:str, filename:str, chunk_size:int) -> int:
+        self.limiter.acquire()
+        headers:dict[str, str] = self._headers(True)
+        if self.compression:
+            headers["Accept-Encoding"] = "gzip"
+        sent_at:float = time()
+        received:int = 0
+        written:int = 0
+        with self.transport.stream("GET", path, headers, chunk_size) as response:
+            self.clock.observe(response.header("Date"), sent_at, time())
+            if response.status != 200:
+                raise RuntimeError(f"Download of {path} failed: {response.status} {response.reason} {b''.join(response.chunks)}")
+            # gzip is undone on the fly, the file is always plain
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32) if response.header("Content-Encoding") == "gzip" else None
+            # written aside and moved in place once complete, an interrupted download leaves no half file
+            partial:str = f"{filename}.part"
+            try:
+                with open(partial, "wb") as stream:
+                    for chunk in response.chunks:
+                        received += len(chunk)
+                        if decompressor is not None:
+                            chunk = decompressor.decompress(chunk)
+                        stream.write(chunk)
+                        written += len(chunk)
+                    if decompressor is not None:
+                        tail:bytes = decompressor.flush()
+                        stream.write(tail)
+                        written += len(tail)
+                replace(partial, filename)
+            except BaseException:
+                if exists(partial):
+                    remove(partial)
+                raise
+        self.wire_stats.record("GET", path, received, written, 0.0)
+        if self.debug:
+            print(f"Downloaded {path} to {filename}, {received} bytes received, {written} bytes written")
+        return written
+
     def _call_endpoint(self, method:str, authenticated:bool, path:str, data:dict) -> dict:
-        """ Actually hits the API endpoint """
-        host = "api.spacetraders.io"
-        conn = http.client.HTTPSConnection(host)
-        headers = { "Host": host }
+        """ Hits the API endpoint once the rate limiter allows, retrying when told to slow down """
+        with self._released():
+            return self._call_with_retries(method, authenticated, path, data)
 
-        if authenticated:
-            if self.token is not None and self.token != "":
-                headers["Authorization"] = f"Bearer {self.token}"
-            else:
-                headers["Authorization"] = f"Bearer {self.account_token}"
+    @contextmanager
+    def _released(self):
+        """ Let other agents run while this one waits for its turn and its answer """
+        if self.shared_lock is None or not self.shared_lock.held():
+            yield
+            return
+        self.shared_lock.release()
+        try:
+            yield
+        finally:
+            self.shared_lock.acquire()
+
+    def _call_with_retries(self, method:str, authenticated:bool, path:str, data:dict) -> dict:
+        resp:dict = {}
+        for _ in range(self.max_retries + 1):
+            self.limiter.acquire()
+            resp = self._request(method, authenticated, path, data)
+            error:dict = resp.get("error", {}) if isinstance(resp, dict) else {}
+            if error.get("code", 0) != 429:
+                return resp
+            retry_after:float = error.get("data", {}).get("retryAfter", 1.0)
+            if self.debug:
+                print(f"Rate limited, retrying in {retry_after}s")
+            self.limiter.penalize(retry_after)
+        return resp
+
+    def _request(self, method:str, authenticated:bool, path:str, data:dict) -> dict:
+        """ Actually hits the API endpoint """
+        headers = self._headers(authenticated)
         if data:
             headers["Content-Type"] = "application/json"
             headers["Accept"] = "application/json"
+        if self.compression:
+            headers["Accept-Encoding"] = ACCEPT_ENCODING
 
-        if data is not None and len(data) > 0:
-            conn.request(method, f"/v2/{path}", dumps(data), headers=headers)
-        else:
-            conn.request(method, f"/v2/{path}", headers=headers)
-
-        response = conn.getresponse()
+        sent_at:float = time()
+        body:bytes|None = self.codec.dumps(data) if data is not None and len(data) > 0 else None
+        response:TransportResponse = self.transport.request(method, path, body, headers)
+        self.clock.observe(response.header("Date"), sent_at, time())
         if self.debug:
             print(response.status, response.reason)
 
-        raw_data = response.read()
-        encoding = response.info().get_content_charset('utf8')
+        started:float = perf_counter()
+        raw_data:bytes = decompress(response.body, response.header("Content-Encoding"))
         # error debugging
         if self.debug and response.status != 200:
             print(raw_data)
-        return loads(raw_data.decode(encoding))
-
+        encoding:str = response.charset()
+        resp = self.codec.loads(raw_data) if encoding.lower().replace("-", "") == "utf8" else self.codec.loads(raw_data.decode(encoding).encode("utf8"))
+        self.wire_stats.record(method, path, len(response.body), len(raw_data), perf_counter() - started)
+        return resp
 
+    def _headers(self, authenticated:bool) -> dict[str, str]:
+        """ The transport adds Host, HTTP/2 has it as a pseudo header """
+        headers:dict[str, str] = {}
+        if authenticated:
+            if self.token is not None and self.token != "":
+                headers["Authorization"] = f"Bearer {self.token}"
+            else:
+                headers["Authorization"] = f"Bearer {self.account_token}"
+        return headers
@@ -0,0 +1,97 @@
+from dataclasses import dataclass, field
+from datetime import datetime as dt, timedelta
+from heapq import heappush, heappop
+
+@dataclass
+class Survey:
+    """ Survey of an asteroid field, extracting with it favors its deposits """
+    signature:str
+    symbol:str
+    deposits:list[str]
+    expiration:dt
+    size:str
+    raw:dict = field(default_factory=dict, repr=False, compare=False)  # sent back as is when extracting
+
+    def expected_value(self, value_by_deposit:dict[str, float], wanted:set[str]|None=None) -> float:
+        """ Average value of one extraction, deposits we don't want are worth nothing """
+        if len(self.deposits) == 0:
+            return 0.0
+        total:float = 0.0
+        for deposit in self.deposits:
+            if wanted is None or deposit in wanted:
+                total += value_by_deposit.get(deposit, 0.0)
+        return total / len(self.deposits)
+
+class SurveyCache:
+    """
+    Fleet wide cache of active surveys per asteroid field,
+    indexed by deposit and evicted when expired or exhausted.
+    """
+    def __init__(self, expiration_margin:float=5.0) -> None:
+        self.expiration_margin:timedelta = timedelta(seconds=expiration_margin)
+        self.surveys_by_signature:dict[str, Survey] = {}
+        self.signatures_by_waypoint:dict[str, dict[str, set[str]]] = {}  # waypoint -> deposit -> signatures
+        self.expirations:list[tuple[dt, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.surveys_by_signature)
+
+    def __str__(self) -> str:
+        return f"SurveyCache(surveys: {len(self)}, waypoints: {len(self.signatures_by_waypoint)})"
+
+    def add(self, surveys:list[Survey]) -> None:
+        """ Cache new surveys """
+        for survey in surveys:
+            if survey.signature in self.surveys_by_signature:
+                continue
+            self.surveys_by_signature[survey.signature] = survey
+            by_deposit:dict[str, set[str]] = self.signatures_by_waypoint.setdefault(survey.symbol, {})
+            for deposit in survey.deposits:
+                by_deposit.setdefault(deposit, set()).add(survey.signature)
+            heappush(self.expirations, (survey.expiration, survey.signature))
+
+    def discard(self, signature:str) -> None:
+        """ Forget a survey, e.g. once the server says it is exhausted """
+        survey:Survey|None = self.surveys_by_signature.pop(signature, None)
+        if survey is None:
+            return
+        by_deposit:dict[str, set[str]] = self.signatures_by_waypoint.get(survey.symbol, {})
+        for deposit in survey.deposits:
+            signatures:set[str]|None = by_deposit.get(deposit, None)
+            if signatures is not None:
+                signatures.discard(signature)
+                if len(signatures) == 0:
+                    del by_deposit[deposit]
+        if len(by_deposit) == 0:
+            self.signatures_by_waypoint.pop(survey.symbol, None)
+
+    def evict_expired(self, now:dt) -> int:
+        """ Drop surveys that expire within the margin, returns how many were dropped """
+        evicted:int = 0
+        while self.expirations and self.expirations[0][0] - self.expiration_margin <= now:
+            _, signature = heappop(self.expirations)
+            if signature in self.surveys_by_signature:
+                self.discard(signature)
+                evicted += 1
+        return evicted
+
+    def for_waypoint(self, waypoint:str, deposits:set[str]|None=None) -> list[Survey]:
+        """ Active surveys of a waypoint, optionally only those containing one of the deposits """
+        by_deposit:dict[str, set[str]] = self.signatures_by_waypoint.get(waypoint, {})
+        signatures:set[str] = set()
+        for deposit, deposit_signatures in by_deposit.items():
+            if deposits is None or deposit in deposits:
+                signatures |= deposit_signatures
+        return [self.surveys_by_signature[s] for s in signatures]
+
+    def best(self, waypoint:str, value_by_deposit:dict[str, float], now:dt, wanted:set[str]|None=None) -> Survey|None:
+        """ Survey with the highest expected value per extraction, None if nothing is worth using """
+        self.evict_expired(now)
+        best:Survey|None = None
+        best_value:float = 0.0
+        for survey in self.for_waypoint(waypoint, wanted):
+            value:float = survey.expected_value(value_by_deposit, wanted)
+            if value > best_value:
+                best = survey
+                best_value = value
+        return best
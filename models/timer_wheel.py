@@ -0,0 +1,173 @@
+import asyncio
+from math import ceil
+from time import monotonic, sleep
+from typing import Callable
+
+class Timer:
+    """ A scheduled callback, keep it around to cancel it """
+    __slots__ = ("deadline", "callback", "args", "cancelled", "_bucket")
+
+    def __init__(self, deadline:float, callback:Callable, args:tuple) -> None:
+        self.deadline:float = deadline
+        self.callback:Callable = callback
+        self.args:tuple = args
+        self.cancelled:bool = False
+        self._bucket:set|None = None
+
+    def __str__(self) -> str:
+        return f"Timer(deadline: {self.deadline}, callback: {getattr(self.callback, '__name__', self.callback)}, cancelled: {self.cancelled})"
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel, O(1) schedule and cancel.
+    Level 0 has one slot per tick, every level above covers a whole turn of
+    the level below in each slot. Timers are cascaded down a level when the
+    wheel below wraps, so every timer is touched at most once per level.
+    """
+    def __init__(self, tick:float=0.01, slots:int=256, levels:int=4, clock:Callable[[], float]=monotonic) -> None:
+        self.tick:float = tick
+        self.slots:int = slots
+        self.levels:int = levels
+        self.clock:Callable[[], float] = clock
+        self.wheels:list[list[set[Timer]]] = [[set() for _ in range(slots)] for _ in range(levels)]
+        self.overflow:set[Timer] = set()
+        self.current_tick:int = int(clock() / tick)
+        self.count:int = 0
+        self._wakeup:asyncio.Event|None = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __str__(self) -> str:
+        return f"TimerWheel(tick: {self.tick}, slots: {self.slots}, levels: {self.levels}, count: {self.count})"
+
+    def schedule(self, delay:float, callback:Callable, *args) -> Timer:
+        """ Call callback(*args) after delay seconds """
+        return self.schedule_at(self.clock() + max(delay, 0.0), callback, *args)
+
+    def schedule_at(self, deadline:float, callback:Callable, *args) -> Timer:
+        """ Call callback(*args) once the clock reaches deadline """
+        timer:Timer = Timer(deadline, callback, args)
+        self._insert(timer)
+        self.count += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return timer
+
+    def cancel(self, timer:Timer) -> bool:
+        """ Cancel a timer, False if it already fired or was cancelled """
+        if timer.cancelled or timer._bucket is None:
+            return False
+        timer._bucket.discard(timer)
+        timer._bucket = None
+        timer.cancelled = True
+        self.count -= 1
+        return True
+
+    def advance(self, now:float|None=None) -> int:
+        """ Fire every timer that is due by now, returns how many fired """
+        if now is None:
+            now = self.clock()
+        # nudge so a clock sitting exactly on a tick boundary is not rounded down a tick
+        target:int = int(now / self.tick + 1e-6)
+        if self.count == 0:
+            self.current_tick = max(self.current_tick, target)
+            return 0
+
+        due:list[Timer] = []
+        while self.current_tick < target and self.count > len(due):
+            self.current_tick += 1
+            self._cascade()
+            bucket:set[Timer] = self.wheels[0][self.current_tick % self.slots]
+            if bucket:
+                due.extend(bucket)
+                bucket.clear()
+        self.current_tick = max(self.current_tick, target)
+
+        due.sort(key=lambda t: t.deadline)
+        for timer in due:
+            timer._bucket = None
+            self.count -= 1
+        for timer in due:
+            timer.callback(*timer.args)
+        return len(due)
+
+    def next_deadline(self) -> float|None:
+        """
+        Earliest time anything can be due, None if empty.
+        Timers on upper levels report the start of their slot, which is
+        early but safe: advancing then cascades them down.
+        """
+        if self.count == 0:
+            return None
+        earliest:int|None = None
+        span:int = 1
+        for level in range(self.levels):
+            wheel:list[set[Timer]] = self.wheels[level]
+            base:int = self.current_tick // span
+            for offset in range(1, self.slots + 1):
+                if wheel[(base + offset) % self.slots]:
+                    if earliest is None or (base + offset) * span < earliest:
+                        earliest = (base + offset) * span
+                    break
+            span *= self.slots
+        if self.overflow:
+            wrap:int = (self.current_tick // span + 1) * span
+            if earliest is None or wrap < earliest:
+                earliest = wrap
+        return earliest * self.tick
+
+    def run(self, until:Callable[[], bool]|None=None) -> None:
+        """ Fire timers as they come due until there are none left or until() says to stop """
+        while self.count > 0 and not (until is not None and until()):
+            sleep(max(self.next_deadline() - self.clock(), 0.0))
+            self.advance()
+
+    async def run_async(self, until:Callable[[], bool]|None=None) -> None:
+        """ Same as run, but sleeps on the event loop and wakes up for timers scheduled meanwhile """
+        self._wakeup = asyncio.Event()
+        try:
+            while self.count > 0 and not (until is not None and until()):
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(self.next_deadline() - self.clock(), 0.0))
+                except TimeoutError:
+                    pass
+                self.advance()
+        finally:
+            self._wakeup = None
+
+    # Helper Methods
+
+    def _insert(self, timer:Timer) -> None:
+        expires:int = max(ceil(timer.deadline / self.tick), self.current_tick + 1)
+        delta:int = expires - self.current_tick
+        span:int = 1
+        for level in range(self.levels):
+            if delta < span * self.slots:
+                bucket:set[Timer] = self.wheels[level][(expires // span) % self.slots]
+                bucket.add(timer)
+                timer._bucket = bucket
+                return
+            span *= self.slots
+        self.overflow.add(timer)
+        timer._bucket = self.overflow
+
+    def _cascade(self) -> None:
+        """ Move timers down a level whenever the level below wraps around """
+        span:int = 1
+        for level in range(1, self.levels):
+            span *= self.slots
+            if self.current_tick % span != 0:
+                return
+            self._reinsert(self.wheels[level][(self.current_tick // span) % self.slots])
+        if self.current_tick % (span * self.slots) == 0:
+            self._reinsert(self.overflow)
+
+    def _reinsert(self, bucket:set[Timer]) -> None:
+        if not bucket:
+            return
+        timers:list[Timer] = list(bucket)
+        bucket.clear()
+        for timer in timers:
+            self._insert(timer)
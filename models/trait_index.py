@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field
+
+@dataclass
+class TraitQuery:
+    """
+    Waypoints having every trait of all_of, at least one trait of each
+    any_of group, none of none_of, one of types if any are given and in
+    system if given.
+    """
+    all_of:list[str] = field(default_factory=list)
+    any_of:list[list[str]] = field(default_factory=list)
+    none_of:list[str] = field(default_factory=list)
+    types:list[str] = field(default_factory=list)
+    system:str|None = None
+
+    @staticmethod
+    def parse(text:str) -> TraitQuery:
+        """
+        Query from words, e.g. "type=ENGINEERED_ASTEROID COMMON_METAL_DEPOSITS|PRECIOUS_METAL_DEPOSITS !STRIPPED".
+        Words are ANDed, | ORs within a word, ! negates and type= filters on waypoint types.
+        """
+        query:TraitQuery = TraitQuery()
+        for word in text.upper().split():
+            if word.startswith("TYPE="):
+                query.types.extend(t for t in word[5:].split("|") if t)
+            elif word.startswith("SYSTEM="):
+                query.system = word[7:]
+            elif word.startswith("!"):
+                query.none_of.append(word[1:])
+            elif "|" in word:
+                query.any_of.append([t for t in word.split("|") if t])
+            else:
+                query.all_of.append(word)
+        return query
+
+class TraitIndex:
+    """
+    Inverted index from traits, types and systems to waypoints.
+    Every waypoint gets a bit position and each trait, type and system is a
+    Python int with the bits of its waypoints set, so queries are a handful
+    of big integer and/or/not operations whatever the number of waypoints.
+    Members are kept as sets of bits and turned into ints on first query,
+    adding one waypoint to a huge int would copy it every time.
+    """
+    def __init__(self) -> None:
+        self.symbols:list[str] = []                 # bit -> waypoint symbol
+        self.bits:dict[str, int] = {}               # waypoint symbol -> bit
+        self.traits:dict[str, set[int]] = {}        # trait -> bits
+        self.types:dict[str, set[int]] = {}         # waypoint type -> bits
+        self.systems:dict[str, set[int]] = {}       # system -> bits
+        self._indexed:dict[str, tuple[str, list[str]]] = {}  # symbol -> type, traits as indexed
+        self._bitsets:dict[tuple[str, str], int] = {}        # ("trait"|"type"|"system", key) -> cached bitset
+
+    def __str__(self) -> str:
+        return f"TraitIndex(waypoints: {len(self.symbols)}, traits: {len(self.traits)}, types: {len(self.types)})"
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def add(self, symbol:str, waypoint_type:str, traits:list[str]) -> None:
+        """ Index a waypoint, replacing what was indexed for it before """
+        bit:int|None = self.bits.get(symbol, None)
+        if bit is None:
+            bit = len(self.symbols)
+            self.bits[symbol] = bit
+            self.symbols.append(symbol)
+            self._add_member("system", self.systems, "-".join(symbol.split("-")[0:2]), bit)
+        else:
+            old_type, old_traits = self._indexed[symbol]
+            self._remove_member("type", self.types, old_type, bit)
+            for trait in old_traits:
+                self._remove_member("trait", self.traits, trait, bit)
+        self._indexed[symbol] = (waypoint_type, traits)
+        self._add_member("type", self.types, waypoint_type, bit)
+        for trait in traits:
+            self._add_member("trait", self.traits, trait, bit)
+
+    def search(self, query:TraitQuery) -> list[str]:
+        """ Waypoint symbols matching the query, in the order they were indexed """
+        return self._symbols(self.bitset(query))
+
+    def bitset(self, query:TraitQuery) -> int:
+        """ Bits of the waypoints matching the query """
+        bits:int = (1 << len(self.symbols)) - 1
+        if query.system is not None:
+            bits &= self._bitset("system", self.systems, query.system)
+        for trait in query.all_of:
+            bits &= self._bitset("trait", self.traits, trait)
+        for group in query.any_of:
+            either:int = 0
+            for trait in group:
+                either |= self._bitset("trait", self.traits, trait)
+            bits &= either
+        for trait in query.none_of:
+            bits &= ~self._bitset("trait", self.traits, trait)
+        if len(query.types) > 0:
+            of_type:int = 0
+            for waypoint_type in query.types:
+                of_type |= self._bitset("type", self.types, waypoint_type)
+            bits &= of_type
+        return bits
+
+    def count(self, query:TraitQuery) -> int:
+        return self.bitset(query).bit_count()
+
+    # Helper Methods
+
+    def _add_member(self, kind:str, members:dict[str, set[int]], key:str, bit:int) -> None:
+        members.setdefault(key, set()).add(bit)
+        self._bitsets.pop((kind, key), None)
+
+    def _remove_member(self, kind:str, members:dict[str, set[int]], key:str, bit:int) -> None:
+        members.get(key, set()).discard(bit)
+        self._bitsets.pop((kind, key), None)
+
+    def _bitset(self, kind:str, members:dict[str, set[int]], key:str) -> int:
+        bits:int|None = self._bitsets.get((kind, key), None)
+        if bits is None:
+            raw:bytearray = bytearray(len(self.symbols) // 8 + 1)
+            for bit in members.get(key, ()):
+                raw[bit >> 3] |= 1 << (bit & 7)
+            bits = int.from_bytes(raw, "little")
+            self._bitsets[(kind, key)] = bits
+        return bits
+
+    def _symbols(self, bits:int) -> list[str]:
+        # walk the binary digits once, lowest bit first
+        digits:str = bin(bits)[:1:-1]
+        symbols:list[str] = []
+        i:int = digits.find("1")
+        while i != -1:
+            symbols.append(self.symbols[i])
+            i = digits.find("1", i + 1)
+        return symbols
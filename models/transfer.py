@@ -0,0 +1,67 @@
+from models.ship import Ship
+from models.fleet import FleetIndex
+from models.market_cache import MarketCache
+from models.cargo_policy import CargoPolicy, CargoAction, CargoDecision
+from models.jump_graph import system_of
+
+class TransferOrchestrator:
+    """
+    Pairs full miners with haulers waiting at the same waypoint, so miners
+    hand over their cargo and keep extracting while haulers go sell.
+    """
+    def __init__(self, fleet:FleetIndex, markets:MarketCache, cargo_policy:CargoPolicy, debug:bool=False) -> None:
+        self.fleet:FleetIndex = fleet
+        self.markets:MarketCache = markets
+        self.cargo_policy:CargoPolicy = cargo_policy
+        self.debug:bool = debug
+        self.haulers:set[str] = set()
+
+    def __str__(self) -> str:
+        return f"TransferOrchestrator(haulers: {sorted(self.haulers)})"
+
+    def find_hauler(self, miner:Ship) -> Ship|None:
+        """ Hauler next to the miner, in the same nav status, with the most room """
+        best:Ship|None = None
+        for ship in self.fleet.query(waypoint=miner.nav.waypoint.waypoint, status=miner.nav.status):
+            if ship.symbol not in self.haulers or ship.symbol == miner.symbol:
+                continue
+            room:int = ship.cargo.capacity - ship.cargo.units
+            if room > 0 and (best is None or room > best.cargo.capacity - best.cargo.units):
+                best = ship
+        return best
+
+    def offload(self, miner:Ship, contract_needs:dict[str, int]={}) -> int:
+        """ Move the miner's cargo to haulers around it, most valuable first, returns units moved """
+        decisions:list[CargoDecision] = [d for d in self.cargo_policy.decide(miner, contract_needs) if d.action != CargoAction.JETTISON]
+        # contract goods first, then by value
+        decisions.sort(key=lambda d: (d.action != CargoAction.KEEP, -d.value_per_unit))
+        moved:int = 0
+        for decision in decisions:
+            remaining:int = decision.units
+            while remaining > 0:
+                hauler:Ship|None = self.find_hauler(miner)
+                if hauler is None:
+                    return moved
+                units:int = min(remaining, hauler.cargo.capacity - hauler.cargo.units)
+                if self.debug:
+                    print(f"Transfer {units} {decision.symbol} from {miner.symbol} to {hauler.symbol}")
+                if miner.transfer_cargo(hauler, decision.symbol, units) is None:
+                    return moved
+                remaining -= units
+                moved += units
+        return moved
+
+    def best_market(self, hauler:Ship, keep:dict[str, int]={}) -> str|None:
+        """ Market of the hauler's system paying the most for everything in the hold, apart from what we keep """
+        system:str = hauler.nav.route.destination.system
+        totals:dict[str, int] = {}
+        for item in hauler.cargo.inventory:
+            units:int = item.units - keep.get(item.symbol, 0)
+            if units <= 0:
+                continue
+            for market, price in self.markets.sell_prices_by_good.get(item.symbol, {}).items():
+                if system_of(market) == system:
+                    totals[market] = totals.get(market, 0) + units * price
+        if len(totals) == 0:
+            return None
+        return max(totals, key=totals.get)
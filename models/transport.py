@@ -0,0 +1,261 @@
+from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
+from threading import Lock, local
+from time import perf_counter
+from typing import Iterator
+from urllib.parse import urlsplit
+import http.client
+
+try:
+    import httpx
+except ImportError:
+    # optional, install the http2 extra for the HTTP/2 transport
+    httpx = None
+
+API_URL:str = "https://api.spacetraders.io/v2"
+
+@dataclass
+class TransportResponse:
+    """ Status, headers with lower case names and the body as it came off the wire """
+    status:int
+    reason:str
+    headers:dict[str, str]
+    body:bytes
+
+    def header(self, name:str) -> str|None:
+        return self.headers.get(name.lower(), None)
+
+    def charset(self) -> str:
+        for part in self.headers.get("content-type", "").split(";")[1:]:
+            key, _, value = part.strip().partition("=")
+            if key.lower() == "charset" and value:
+                return value.strip('"')
+        return "utf8"
+
+class StreamingResponse:
+    """ Like TransportResponse, the body is read in chunks instead """
+    def __init__(self, status:int, reason:str, headers:dict[str, str], chunks:Iterator[bytes]) -> None:
+        self.status:int = status
+        self.reason:str = reason
+        self.headers:dict[str, str] = headers
+        self.chunks:Iterator[bytes] = chunks
+
+    def header(self, name:str) -> str|None:
+        return self.headers.get(name.lower(), None)
+
+@dataclass
+class StreamStats:
+    """ Requests (HTTP/2 streams) a transport carried """
+    streams:int = 0
+    errors:int = 0
+    timeouts:int = 0
+    seconds:float = 0.0
+    slowest:float = 0.0
+    in_flight:int = 0
+    max_in_flight:int = 0
+
+    def average(self) -> float:
+        return self.seconds / self.streams if self.streams > 0 else 0.0
+
+class Transport(ABC):
+    """
+    Carries requests to the API. Paths are relative to base_url, bodies are
+    bytes and responses are not decoded, Spacetrader does the rest.
+    """
+    name:str = "transport"
+
+    def __init__(self, base_url:str=API_URL, timeout:float=30.0) -> None:
+        parts = urlsplit(base_url)
+        self.base_url:str = base_url.rstrip("/")
+        self.scheme:str = parts.scheme
+        self.host:str = parts.hostname or ""
+        self.port:int|None = parts.port
+        self.prefix:str = parts.path.rstrip("/")
+        self.timeout:float = timeout
+        self.stats:StreamStats = StreamStats()
+        self._stats_lock:Lock = Lock()
+
+    def __str__(self) -> str:
+        return f"{type(self).__name__}(base_url: {self.base_url}, streams: {self.stats.streams}, max in flight: {self.stats.max_in_flight})"
+
+    @abstractmethod
+    def request(self, method:str, path:str, body:bytes|None, headers:dict[str, str]) -> TransportResponse:
+        """ Send a request and read the whole response """
+
+    @abstractmethod
+    def stream(self, method:str, path:str, headers:dict[str, str], chunk_size:int=1 << 16) -> AbstractContextManager[StreamingResponse]:
+        """ Send a request and hand out the response to read chunk by chunk """
+
+    def close(self) -> None:
+        pass
+
+    # Helper Methods
+
+    def _begin(self) -> float:
+        with self._stats_lock:
+            self.stats.in_flight += 1
+            self.stats.max_in_flight = max(self.stats.max_in_flight, self.stats.in_flight)
+        return perf_counter()
+
+    def _end(self, started:float, error:Exception|None=None) -> None:
+        seconds:float = perf_counter() - started
+        with self._stats_lock:
+            self.stats.in_flight -= 1
+            self.stats.streams += 1
+            self.stats.seconds += seconds
+            self.stats.slowest = max(self.stats.slowest, seconds)
+            if error is not None:
+                self.stats.errors += 1
+                if isinstance(error, TimeoutError) or (httpx is not None and isinstance(error, httpx.TimeoutException)):
+                    self.stats.timeouts += 1
+
+class _NotSent(ConnectionError):
+    """ The connection broke before the request went out, safe to send again """
+    pass
+
+class Http1Transport(Transport):
+    """
+    http.client, one kept alive connection per thread so requests from one
+    thread reuse their socket, and a fresh one when the server dropped it.
+    Requests are only sent again when they never left, or are idempotent.
+    """
+    name:str = "http1"
+    IDEMPOTENT:frozenset[str] = frozenset({"GET", "HEAD", "OPTIONS"})
+
+    def __init__(self, base_url:str=API_URL, timeout:float=30.0) -> None:
+        super().__init__(base_url, timeout)
+        self._local = local()
+
+    def request(self, method:str, path:str, body:bytes|None, headers:dict[str, str]) -> TransportResponse:
+        started:float = self._begin()
+        try:
+            try:
+                response = self._send(self._connection(), method, path, body, headers)
+            except _NotSent:
+                # kept alive connection closed by the server meanwhile, nothing reached it
+                response = self._send(self._connection(True), method, path, body, headers)
+            except (http.client.RemoteDisconnected, ConnectionResetError):
+                # the server may have carried out the request before dropping us,
+                # sending a purchase or a sale again could do it twice
+                if method not in Http1Transport.IDEMPOTENT:
+                    raise
+                response = self._send(self._connection(True), method, path, body, headers)
+            result:TransportResponse = TransportResponse(response.status, response.reason, self._headers(response), response.read())
+            if response.will_close:
+                self._connection().close()
+        except Exception as e:
+            self._connection().close()
+            self._end(started, e)
+            raise
+        self._end(started)
+        return result
+
+    @contextmanager
+    def stream(self, method:str, path:str, headers:dict[str, str], chunk_size:int=1 << 16) -> Iterator[StreamingResponse]:
+        # a connection of its own, a long download should not hold the thread's one
+        started:float = self._begin()
+        connection = self._new_connection()
+        error:Exception|None = None
+        try:
+            response = self._send(connection, method, path, None, headers)
+            yield StreamingResponse(response.status, response.reason, self._headers(response), iter(lambda: response.read(chunk_size), b""))
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            connection.close()
+            self._end(started, error)
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+
+    # Helper Methods
+
+    def _connection(self, fresh:bool=False) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or fresh:
+            if connection is not None:
+                connection.close()
+            connection = self._new_connection()
+            self._local.connection = connection
+        return connection
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        if self.scheme == "http":
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+
+    def _send(self, connection:http.client.HTTPConnection, method:str, path:str, body:bytes|None, headers:dict[str, str]) -> http.client.HTTPResponse:
+        try:
+            connection.request(method, f"{self.prefix}/{path}", body, headers=headers)
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise _NotSent() from e
+        return connection.getresponse()
+
+    def _headers(self, response:http.client.HTTPResponse) -> dict[str, str]:
+        return {name.lower(): value for name, value in response.getheaders()}
+
+class Http2Transport(Transport):
+    """
+    httpx with HTTP/2, every request from every thread is a stream over one
+    connection instead of a socket each. Timeouts apply to each stream.
+    Plain http base urls talk HTTP/2 straight away (prior knowledge), handy
+    for a local stand-in server.
+    """
+    name:str = "http2"
+
+    def __init__(self, base_url:str=API_URL, timeout:float=30.0) -> None:
+        super().__init__(base_url, timeout)
+        if httpx is None:
+            raise RuntimeError("The HTTP/2 transport needs httpx, install the http2 extra")
+        self.client = httpx.Client(http2=True, http1=self.scheme != "http", timeout=httpx.Timeout(timeout))
+        self.http_versions:dict[str, int] = {}  # version -> responses, to see HTTP/2 was really used
+
+    def request(self, method:str, path:str, body:bytes|None, headers:dict[str, str]) -> TransportResponse:
+        started:float = self._begin()
+        try:
+            with self.client.stream(method, f"{self.base_url}/{path}", content=body, headers=headers) as response:
+                # raw bytes, decompression is left to the caller like with http.client
+                result:TransportResponse = TransportResponse(response.status_code, response.reason_phrase, dict(response.headers), b"".join(response.iter_raw()))
+                self._count_version(response.http_version)
+        except Exception as e:
+            self._end(started, e)
+            raise
+        self._end(started)
+        return result
+
+    @contextmanager
+    def stream(self, method:str, path:str, headers:dict[str, str], chunk_size:int=1 << 16) -> Iterator[StreamingResponse]:
+        started:float = self._begin()
+        error:Exception|None = None
+        try:
+            with self.client.stream(method, f"{self.base_url}/{path}", headers=headers) as response:
+                self._count_version(response.http_version)
+                yield StreamingResponse(response.status_code, response.reason_phrase, dict(response.headers), response.iter_raw(chunk_size))
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._end(started, error)
+
+    def close(self) -> None:
+        self.client.close()
+
+    # Helper Methods
+
+    def _count_version(self, version:str) -> None:
+        with self._stats_lock:
+            self.http_versions[version] = self.http_versions.get(version, 0) + 1
+
+def make_transport(name:str="http1", base_url:str=API_URL, timeout:float=30.0) -> Transport:
+    """ Transport by name, http2 falls back to http1 when httpx is missing """
+    if name == "http2":
+        if httpx is not None:
+            return Http2Transport(base_url, timeout)
+        print("httpx is not installed, using http1")
+    elif name != "http1":
+        print(f"Unknown transport {name}, using http1")
+    return Http1Transport(base_url, timeout)
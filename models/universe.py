@@ -0,0 +1,98 @@
+from math import dist
+from models.system import System
+from models.waypoint import Waypoint
+from models.trait_index import TraitIndex, TraitQuery
+from models.universe_store import UniverseStore
+
+class Universe:
+    """ Everything we have seen of systems and waypoints, so positions don't need asking again """
+    def __init__(self) -> None:
+        self.systems_by_symbol:dict[str, System] = {}
+        self.waypoints_by_symbol:dict[str, Waypoint] = {}
+        self.traits:TraitIndex = TraitIndex()
+        # waypoints of the universe store get indexed on the first query touching them
+        self.store_filename:str|None = None
+        self.stored_systems:set[str] = set()
+        self.stored_all:bool = False
+
+    def __str__(self) -> str:
+        return f"Universe(systems: {len(self.systems_by_symbol)}, waypoints: {len(self.waypoints_by_symbol)})"
+
+    def add_system(self, system:System) -> None:
+        """ Remember a system and its waypoints """
+        self.systems_by_symbol[system.symbol] = system
+        self.add_waypoints(system.waypoints)
+
+    def add_waypoints(self, waypoints:list[Waypoint]) -> None:
+        """ Remember waypoints, a detailed one never gets replaced by a summary without traits """
+        for waypoint in waypoints:
+            known:Waypoint|None = self.waypoints_by_symbol.get(waypoint.waypoint, None)
+            if known is None or len(waypoint.traits) > 0 or len(known.traits) == 0:
+                self.waypoints_by_symbol[waypoint.waypoint] = waypoint
+                self.traits.add(waypoint.waypoint, waypoint.type, [t.symbol for t in waypoint.traits])
+
+    def attach_store(self, filename:str) -> None:
+        """ Let trait queries find what was crawled or imported into the universe store, indexed again if attached again """
+        self.store_filename = filename
+        self.stored_systems = set()
+        self.stored_all = False
+
+    def find(self, query:TraitQuery) -> list[Waypoint]:
+        """ Known waypoints matching a trait query """
+        self._index_stored(query.system)
+        symbols:list[str] = self.traits.search(query)
+        missing:list[str] = [s for s in symbols if s not in self.waypoints_by_symbol]
+        if len(missing) > 0:
+            self._load_stored(missing)
+        return [self.waypoints_by_symbol[s] for s in symbols if s in self.waypoints_by_symbol]
+
+    def get_waypoint(self, symbol:str) -> Waypoint|None:
+        return self.waypoints_by_symbol.get(symbol, None)
+
+    def coordinates(self, symbol:str) -> tuple[int, int]|None:
+        """ x, y of a waypoint, None if never seen """
+        waypoint:Waypoint|None = self.waypoints_by_symbol.get(symbol, None)
+        if waypoint is None:
+            return None
+        return (waypoint.x, waypoint.y)
+
+    def distance(self, from_symbol:str, to_symbol:str) -> float|None:
+        """ Distance between two waypoints of the same system, None if either is unknown """
+        start:tuple[int, int]|None = self.coordinates(from_symbol)
+        end:tuple[int, int]|None = self.coordinates(to_symbol)
+        if start is None or end is None:
+            return None
+        return dist(start, end)
+
+    # Helper Methods
+
+    def _index_stored(self, system:str|None) -> None:
+        """ Index the stored waypoints of a system, or all of them, from their traits column """
+        if self.store_filename is None or self.stored_all or (system is not None and system in self.stored_systems):
+            return
+        store:UniverseStore = UniverseStore(self.store_filename)
+        try:
+            rows:list[tuple[str, str, list[str]]] = store.waypoint_traits(system)
+        finally:
+            store.close()
+        for symbol, waypoint_type, traits in rows:
+            # what we saw this session is at least as fresh, a summary never hides known traits
+            known:Waypoint|None = self.waypoints_by_symbol.get(symbol, None)
+            if known is None or (len(known.traits) == 0 and len(traits) > 0):
+                self.waypoints_by_symbol.pop(symbol, None)
+                self.traits.add(symbol, waypoint_type, traits)
+        if system is None:
+            self.stored_all = True
+        else:
+            self.stored_systems.add(system)
+
+    def _load_stored(self, symbols:list[str]) -> None:
+        """ Waypoints found by a query but only indexed so far """
+        store:UniverseStore = UniverseStore(self.store_filename)
+        try:
+            for symbol in symbols:
+                waypoint:Waypoint|None = store.get_waypoint(symbol)
+                if waypoint is not None:
+                    self.waypoints_by_symbol[symbol] = waypoint
+        finally:
+            store.close()
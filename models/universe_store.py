@@ -0,0 +1,160 @@
+import sqlite3
+from json import dumps, loads
+from threading import Lock
+from models.system import System
+from models.waypoint import Waypoint
+
+class UniverseStore:
+    """
+    Local sqlite copy of the galaxy: systems, waypoints, and the last
+    market and shipyard listings we fetched, stored raw as the API sent them.
+    Also keeps checkpoints so long crawls pick up where they stopped.
+    """
+    SCHEMA:str = """
+        CREATE TABLE IF NOT EXISTS systems (
+            symbol TEXT PRIMARY KEY, sector TEXT, type TEXT, x INTEGER, y INTEGER, raw TEXT);
+        CREATE TABLE IF NOT EXISTS waypoints (
+            symbol TEXT PRIMARY KEY, system TEXT, type TEXT, x INTEGER, y INTEGER, traits TEXT, raw TEXT);
+        CREATE INDEX IF NOT EXISTS waypoints_by_system ON waypoints (system);
+        CREATE TABLE IF NOT EXISTS markets (symbol TEXT PRIMARY KEY, raw TEXT, updated_at TEXT);
+        CREATE TABLE IF NOT EXISTS shipyards (symbol TEXT PRIMARY KEY, raw TEXT, updated_at TEXT);
+        CREATE TABLE IF NOT EXISTS jump_gates (symbol TEXT PRIMARY KEY, connections TEXT);
+        CREATE TABLE IF NOT EXISTS checkpoints (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    def __init__(self, filename:str="universe.db") -> None:
+        self.filename:str = filename
+        # the crawler writes from several threads, the lock keeps it to one at a time
+        self.connection:sqlite3.Connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.executescript(UniverseStore.SCHEMA)
+        # write ahead log, commits don't wait on a full sync of the database
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self._lock:Lock = Lock()
+
+    def __str__(self) -> str:
+        return f"UniverseStore(filename: {self.filename}, systems: {self.count('systems')}, waypoints: {self.count('waypoints')})"
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def count(self, table:str) -> int:
+        with self._lock:
+            return self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def add_systems(self, raw_systems:list[dict]) -> None:
+        """ Insert or replace systems, waypoints listed in them are kept as summaries """
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO systems VALUES (?, ?, ?, ?, ?, ?)",
+                # waypoints live in their own table, no need to store them twice
+                [(s["symbol"], s["sectorSymbol"], s["type"], s["x"], s["y"], dumps(dict(s, waypoints=[]))) for s in raw_systems])
+            self._add_waypoints([dict(w, systemSymbol=s["symbol"]) for s in raw_systems for w in s.get("waypoints", [])], replace_detailed=False)
+
+    def add_waypoints(self, raw_waypoints:list[dict]) -> None:
+        """ Insert or replace waypoints """
+        with self._lock, self.connection:
+            self._add_waypoints(raw_waypoints, replace_detailed=True)
+
+    def add_market(self, symbol:str, raw:dict, updated_at:str="") -> None:
+        with self._lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO markets VALUES (?, ?, ?)", (symbol, dumps(raw), updated_at))
+
+    def add_shipyard(self, symbol:str, raw:dict, updated_at:str="") -> None:
+        with self._lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO shipyards VALUES (?, ?, ?)", (symbol, dumps(raw), updated_at))
+
+    def add_jump_gate(self, symbol:str, connections:list[str]) -> None:
+        with self._lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO jump_gates VALUES (?, ?)", (symbol, dumps(connections)))
+
+    def jump_gates(self) -> dict[str, list[str]]:
+        """ Every jump gate we looked at and the gates it connects to """
+        with self._lock:
+            rows = self.connection.execute("SELECT symbol, connections FROM jump_gates").fetchall()
+        return {r[0]: loads(r[1]) for r in rows}
+
+    def system_coordinates(self) -> dict[str, tuple[int, int]]:
+        with self._lock:
+            return {r[0]: (r[1], r[2]) for r in self.connection.execute("SELECT symbol, x, y FROM systems")}
+
+    def landing_waypoints(self) -> dict[str, str]:
+        """ One waypoint of every system, somewhere a warp can arrive at """
+        with self._lock:
+            return {r[0]: r[1] for r in self.connection.execute("SELECT system, MIN(symbol) FROM waypoints GROUP BY system")}
+
+    def get_checkpoint(self, key:str, default:str|None=None) -> str|None:
+        with self._lock:
+            row = self.connection.execute("SELECT value FROM checkpoints WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else default
+
+    def set_checkpoint(self, key:str, value:str="done") -> None:
+        with self._lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?)", (key, value))
+
+    def checkpoints(self, prefix:str) -> set[str]:
+        """ Keys of every checkpoint starting with prefix """
+        with self._lock:
+            rows = self.connection.execute("SELECT key FROM checkpoints WHERE key LIKE ?", (prefix + "%",)).fetchall()
+        return {r[0] for r in rows}
+
+    def system_symbols(self) -> list[str]:
+        with self._lock:
+            return [r[0] for r in self.connection.execute("SELECT symbol FROM systems ORDER BY symbol")]
+
+    def get_system(self, symbol:str) -> System|None:
+        with self._lock:
+            row = self.connection.execute("SELECT raw FROM systems WHERE symbol = ?", (symbol,)).fetchone()
+        if row is None:
+            return None
+        system:System = System(loads(row[0]))
+        system.waypoints = self.waypoints_of(symbol)
+        return system
+
+    def get_waypoint(self, symbol:str) -> Waypoint|None:
+        with self._lock:
+            row = self.connection.execute("SELECT raw FROM waypoints WHERE symbol = ?", (symbol,)).fetchone()
+        return Waypoint(loads(row[0])) if row is not None else None
+
+    def waypoints_of(self, system:str) -> list[Waypoint]:
+        with self._lock:
+            rows = self.connection.execute("SELECT raw FROM waypoints WHERE system = ? ORDER BY symbol", (system,)).fetchall()
+        return [Waypoint(loads(r[0])) for r in rows]
+
+    def waypoints_of_type(self, waypoint_type:str) -> list[str]:
+        """ Symbols of waypoints of a type """
+        with self._lock:
+            rows = self.connection.execute("SELECT symbol FROM waypoints WHERE type = ? ORDER BY symbol", (waypoint_type,)).fetchall()
+        return [r[0] for r in rows]
+
+    def waypoints_with_trait(self, trait:str) -> list[str]:
+        """ Symbols of waypoints known to have the trait """
+        with self._lock:
+            rows = self.connection.execute("SELECT symbol FROM waypoints WHERE traits LIKE ? ORDER BY symbol", (f'%"{trait}"%',)).fetchall()
+        return [r[0] for r in rows]
+
+    def waypoint_traits(self, system:str|None=None) -> list[tuple[str, str, list[str]]]:
+        """ Symbol, type and traits of every waypoint, or those of a system, without parsing the raw json """
+        with self._lock:
+            if system is None:
+                rows = self.connection.execute("SELECT symbol, type, traits FROM waypoints ORDER BY symbol").fetchall()
+            else:
+                rows = self.connection.execute("SELECT symbol, type, traits FROM waypoints WHERE system = ? ORDER BY symbol", (system,)).fetchall()
+        return [(r[0], r[1], loads(r[2])) for r in rows]
+
+    def raw_rows(self, table:str) -> list[dict]:
+        """ Everything in systems or waypoints as the API sent it, ordered by symbol """
+        with self._lock:
+            rows = self.connection.execute(f"SELECT raw FROM {table} ORDER BY symbol").fetchall()
+        return [loads(r[0]) for r in rows]
+
+    # Helper Methods
+
+    def _add_waypoints(self, raw_waypoints:list[dict], replace_detailed:bool) -> None:
+        """ Waypoints with traits are detailed, a summary never replaces them """
+        rows:list[tuple] = [(w["symbol"], w["systemSymbol"], w["type"], w["x"], w["y"],
+                             dumps([t["symbol"] for t in w["traits"]]) if "traits" in w else "[]", dumps(w)) for w in raw_waypoints]
+        if replace_detailed:
+            self.connection.executemany("INSERT OR REPLACE INTO waypoints VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        else:
+            self.connection.executemany("INSERT OR IGNORE INTO waypoints VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
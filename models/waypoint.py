@@ -12,6 +12,7 @@ class Waypoint(Location):
     """ Waypoint, like a location but with way more data """
     def __init__(self, loc:dict) -> None:
         super().__init__(loc["symbol"])
+        self.raw:dict = loc
         self.type:str = loc["type"]
         self.x:int = loc["x"]
         self.y:int = loc["y"]
@@ -0,0 +1,52 @@
+import asyncio
+from models.multi_agent import MultiAgentRunner
+from models.sharding import ShardCoordinator
+from models.printer import Printer
+from pyfiglet import Figlet
+from argparse import ArgumentParser
+
+def print_ascii_text(figlet:Figlet, text:str) -> None:
+    """ Print ascii text """
+    print(figlet.renderText(text))
+
+def main(agents:str, debug:bool) -> None:
+    """ Main function, puts the fleets of every agent to work """
+    runner:MultiAgentRunner = MultiAgentRunner(debug=debug)
+    runner.load(agents)
+
+    f:Figlet = Figlet()
+    print_ascii_text(f, f"{len(runner.heroes)} Agents")
+
+    try:
+        asyncio.run(runner.run(start=lambda hero: print(f"{hero.callsign}: {hero.assign_fleet()}")))
+    except KeyboardInterrupt:
+        print("Thank You!")
+
+def main_sharded(agents:str, shards:int, by:str, debug:bool) -> None:
+    """ Same, with the ships spread over worker processes """
+    coordinator:ShardCoordinator = ShardCoordinator(shards, by, debug=debug)
+    coordinator.load(agents)
+
+    f:Figlet = Figlet()
+    print_ascii_text(f, f"{len(coordinator.heroes)} Agents")
+
+    coordinator.start()
+    print(coordinator)
+    coordinator.run()
+    Printer(debug).print_shard_metrics(list(coordinator.metrics.values()))
+    print("Thank You!")
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+                    prog='Multiagent',
+                    description='Runs several agents at once',
+                    epilog='')
+    parser.add_argument("-a", "--agents", type=str, default="agents.yaml", help="File listing the agents (default: agents.yaml)")
+    parser.add_argument("-s", "--shards", type=int, default=None, help="Run the ships in this many processes, 0 for one per core")
+    parser.add_argument("-b", "--by", type=str, choices=["ship", "agent"], default="ship", help="What moves between shards (default: ship)")
+    parser.add_argument("-d", "--debug", action="store_true", help="Print what the runner does")
+    args = parser.parse_args()
+    if args.shards is None:
+        main(args.agents, args.debug)
+    else:
+        main_sharded(args.agents, args.shards, args.by, args.debug)
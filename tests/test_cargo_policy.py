@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from models.cargo_policy import CargoPolicy, CargoAction
+from models.market_cache import MarketCache
+from models.ship import Ship, Market
+from models.universe import Universe
+from models.waypoint import Waypoint
+
+def ship(inventory:list[tuple[str, int]], capacity:int=30) -> Ship:
+    now:str = datetime.now(timezone.utc).isoformat()
+    here:dict = {"symbol": "X1-A1-B1", "type": "ASTEROID", "systemSymbol": "X1-A1", "x": 0, "y": 0}
+    requirements:dict = {"power": 1, "crew": 0}
+    return Ship(None, {
+        "symbol": "MINER-1",
+        "registration": {"name": "MINER-1", "factionSymbol": "COSMIC", "role": "EXCAVATOR"},
+        "nav": {"systemSymbol": "X1-A1", "waypointSymbol": "X1-A1-B1", "status": "IN_ORBIT", "flightMode": "CRUISE",
+                "route": {"origin": here, "destination": here, "arrival": now, "departureTime": now}},
+        "crew": {"current": 0, "capacity": 0, "required": 0, "rotation": "STRICT", "morale": 100, "wages": 0},
+        "cargo": {"capacity": capacity, "units": sum(u for _, u in inventory),
+                  "inventory": [{"symbol": s, "name": s, "description": "", "units": u} for s, u in inventory]},
+        "fuel": {"current": 100, "capacity": 100, "consumed": {"amount": 0, "timestamp": now}},
+        "cooldown": {"shipSymbol": "MINER-1", "totalSeconds": 0, "remainingSeconds": 0},
+        "frame": {"symbol": "FRAME_DRONE", "name": "Frame", "description": "", "moduleSlots": 0, "mountingPoints": 1, "fuelCapacity": 100, "condition": 100, "requirements": requirements},
+        "reactor": {"symbol": "R", "name": "R", "description": "", "condition": 100, "powerOutput": 10, "requirements": requirements},
+        "engine": {"symbol": "E", "name": "E", "description": "", "condition": 100, "speed": 10, "requirements": requirements},
+        "modules": [],
+        "mounts": [],
+    })
+
+def market(symbol:str, sell_prices:dict[str, int]) -> Market:
+    return Market().parse_market({"symbol": symbol, "exports": [], "imports": [], "exchange": [], "transactions": [],
+                                  "tradeGoods": [{"symbol": g, "type": "EXCHANGE", "tradeVolume": 10, "supply": "MODERATE", "purchasePrice": p + 5, "sellPrice": p}
+                                                 for g, p in sell_prices.items()]})
+
+def test_unknown_prices_are_hauled_not_jettisoned() -> None:
+    policy:CargoPolicy = CargoPolicy(MarketCache(), Universe())
+    decisions = policy.decide(ship([("IRON_ORE", 20), ("PRECIOUS_STONES", 10)]))
+    assert [(d.symbol, d.action, d.market) for d in decisions] == [("IRON_ORE", CargoAction.HAUL, None), ("PRECIOUS_STONES", CargoAction.HAUL, None)]
+
+def test_known_prices_pay_fuel_by_the_market_unit() -> None:
+    markets:MarketCache = MarketCache()
+    markets.update(market("X1-A1-M1", {"IRON_ORE": 45, "ICE_WATER": 2}))
+    universe:Universe = Universe()
+    universe.add_waypoints([Waypoint({"symbol": "X1-A1-M1", "type": "PLANET", "x": 50, "y": 0, "orbitals": []})])
+    decisions = {d.symbol: d for d in CargoPolicy(markets, universe).decide(ship([("IRON_ORE", 20), ("ICE_WATER", 10)]))}
+    # 100 tank units for the round trip is one market unit of fuel at 72, spread over a hold of 30
+    assert decisions["IRON_ORE"].action == CargoAction.HAUL
+    assert decisions["IRON_ORE"].market == "X1-A1-M1"
+    assert abs(decisions["IRON_ORE"].value_per_unit - (45 - 72 / 30)) < 1e-9
+    assert decisions["ICE_WATER"].action == CargoAction.JETTISON
+
+def test_markets_of_other_systems_are_left_out() -> None:
+    markets:MarketCache = MarketCache()
+    markets.update(market("X1-A1-M1", {"IRON_ORE": 45}))
+    markets.update(market("X1-Z9-M1", {"IRON_ORE": 90, "GOLD_ORE": 200}))
+    universe:Universe = Universe()
+    # close by the numbers, but those are another system's
+    universe.add_waypoints([Waypoint({"symbol": "X1-A1-M1", "type": "PLANET", "x": 50, "y": 0, "orbitals": []}),
+                            Waypoint({"symbol": "X1-Z9-M1", "type": "PLANET", "x": 0, "y": 0, "orbitals": []})])
+    decisions = {d.symbol: d for d in CargoPolicy(markets, universe).decide(ship([("IRON_ORE", 20), ("GOLD_ORE", 10)]))}
+    assert decisions["IRON_ORE"].market == "X1-A1-M1"
+    assert (decisions["GOLD_ORE"].action, decisions["GOLD_ORE"].market) == (CargoAction.HAUL, None)
@@ -0,0 +1,92 @@
+import gzip
+import json
+import socket
+import threading
+from typing import Callable
+import pytest
+
+httpx = pytest.importorskip("httpx")
+h2 = pytest.importorskip("h2")
+import h2.config
+import h2.connection
+import h2.events
+from models.spacetrader import Spacetrader
+from models.transport import Http2Transport
+
+# (method, path, body) -> (status, headers, body), None drops the connection without answering
+Handler = Callable[[str, str, bytes], tuple[int, list[tuple[str, str]], bytes]|None]
+
+class StandIn:
+    """ Local HTTP/2 server with prior knowledge, answering each request through a handler """
+    def __init__(self, handler:Handler) -> None:
+        self.handler:Handler = handler
+        self.requests:list[tuple[str, str]] = []
+        self.listener:socket.socket = socket.create_server(("127.0.0.1", 0))
+        self.url:str = f"http://127.0.0.1:{self.listener.getsockname()[1]}"
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def __enter__(self) -> StandIn:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.listener.close()
+
+    # Helper Methods
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client:socket.socket) -> None:
+        connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        connection.initiate_connection()
+        client.sendall(connection.data_to_send())
+        headers:dict[int, dict[str, str]] = {}
+        bodies:dict[int, bytes] = {}
+        with client:
+            while data := client.recv(65535):
+                for event in connection.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        headers[event.stream_id] = dict(event.headers)
+                        bodies[event.stream_id] = b""
+                    elif isinstance(event, h2.events.DataReceived):
+                        bodies[event.stream_id] += event.data
+                        connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded):
+                        method:str = headers[event.stream_id][":method"]
+                        path:str = headers[event.stream_id][":path"]
+                        self.requests.append((method, path))
+                        answer = self.handler(method, path, bodies[event.stream_id])
+                        if answer is None:
+                            return
+                        status, extra, body = answer
+                        connection.send_headers(event.stream_id, [(":status", str(status)), ("content-length", str(len(body))), *extra])
+                        connection.send_data(event.stream_id, body, end_stream=True)
+                client.sendall(connection.data_to_send())
+
+def api(url:str) -> Spacetrader:
+    return Spacetrader("token", "", transport=Http2Transport(url, timeout=5.0))
+
+def test_gzip_response_is_decoded() -> None:
+    body:bytes = gzip.compress(json.dumps({"data": {"symbol": "AGENT"}}).encode("utf8"))
+    with StandIn(lambda method, path, data: (200, [("content-type", "application/json"), ("content-encoding", "gzip")], body)) as server:
+        agent:Spacetrader = api(server.url)
+        assert agent.get_auth("my/agent") == {"data": {"symbol": "AGENT"}}
+    assert server.requests == [("GET", "/my/agent")]
+    assert agent.transport.http_versions == {"HTTP/2": 1}
+
+def test_rate_limited_request_is_retried() -> None:
+    answers:list[dict] = [{"error": {"code": 429, "data": {"retryAfter": 0.01}}}, {"data": {"ok": True}}]
+    with StandIn(lambda method, path, data: (200 if len(answers) == 1 else 429, [], json.dumps(answers.pop(0)).encode("utf8"))) as server:
+        assert api(server.url).get_auth("my/ships") == {"data": {"ok": True}}
+    assert server.requests == [("GET", "/my/ships"), ("GET", "/my/ships")]
+
+def test_post_is_not_resent_when_the_connection_drops() -> None:
+    with StandIn(lambda method, path, data: None) as server:
+        with pytest.raises(httpx.TransportError):
+            api(server.url).post_auth("my/ships/MINER-1/extract", {"survey": "S"})
+    assert server.requests == [("POST", "/my/ships/MINER-1/extract")]
@@ -0,0 +1,32 @@
+from argparse import ArgumentParser
+from time import perf_counter
+from models.timer_wheel import TimerWheel, Timer
+
+def benchmark(count:int=100_000) -> None:
+    """ Schedule, cancel and fire a large number of timers on a simulated clock """
+    now:list[float] = [0.0]
+    wheel:TimerWheel = TimerWheel(clock=lambda: now[0])
+    fired:list[int] = [0]
+    def fire() -> None:
+        fired[0] += 1
+
+    start:float = perf_counter()
+    timers:list[Timer] = [wheel.schedule((i * 7919) % 3600 + 0.5, fire) for i in range(count)]
+    scheduled:float = perf_counter()
+    for timer in timers[::2]:
+        wheel.cancel(timer)
+    cancelled:float = perf_counter()
+    while len(wheel) > 0:
+        now[0] = wheel.next_deadline()
+        wheel.advance()
+    finished:float = perf_counter()
+
+    print(f"schedule: {count / (scheduled - start):,.0f} timers/s")
+    print(f"cancel:   {(count // 2) / (cancelled - scheduled):,.0f} timers/s")
+    print(f"fire:     {fired[0] / (finished - cancelled):,.0f} timers/s ({fired[0]} fired)")
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Timer wheel benchmark")
+    parser.add_argument("-n", "--count", type=int, default=100_000, help="Timers to schedule")
+    args = parser.parse_args()
+    benchmark(args.count)